@@ -890,7 +890,7 @@ function parseOffsets(text) {
 }
 
 //////////////////////////////////////////////////////////////
-// Run the Python scheduler (scheduler/run_scheduler.py) once at
+// Run the Python scheduler (via scheduler/service.py) once at
 // startup and return its raw stdout. Modeled on execAstrometry:
 // shell out via WScript.Shell.Exec, poll p.Status, accumulate
 // stdout, and enforce a timeout.
@@ -899,15 +899,21 @@ function parseOffsets(text) {
 // scheduler repo lives under the user's GitHub checkout. We build
 // an absolute path the same way colibriGrabPath is built at the
 // top of this file (line ~218): %USERPROFILE%\Documents\GitHub\
-// ColibriObservatory\scheduler\run_scheduler.py. If the repo is
+// ColibriObservatory\scheduler\service.py. If the repo is
 // laid out differently on a given telescope, adjust this path.
+//
+// We call the thin client scheduler/service.py, which forwards the
+// same arguments to a warm `run_scheduler.py --serve` process if one
+// is listening on localhost and otherwise runs run_scheduler.py
+// in-process. Either way it prints exactly what run_scheduler.py
+// prints.
 //////////////////////////////////////////////////////////////
 
 function getScheduleFromPython(sunsetJD, sunriseJD) {
     var sh = new ActiveXObject("WScript.Shell");
     var userProfile = sh.ExpandEnvironmentStrings("%USERPROFILE%");
     var scriptPath = userProfile +
-        "\\Documents\\GitHub\\ColibriObservatory\\scheduler\\run_scheduler.py";
+        "\\Documents\\GitHub\\ColibriObservatory\\scheduler\\service.py";
 
     var timeoutMs = 120000; // 2 minutes
 
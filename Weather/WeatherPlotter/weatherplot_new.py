@@ -23,6 +23,23 @@ from time import sleep
 from logging.handlers import TimedRotatingFileHandler
 import logging
 
+# Sun/Moon ephemerides come from the scheduler's on-disk table when one covers
+# the requested times (see scheduler/ephemeris.py); astropy is the fallback.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+try:
+    from scheduler import ephemeris
+except ImportError:
+    ephemeris = None
+
+def body_altaz(body, times, location, table):
+    # (alt, az) in degrees of 'sun' or 'moon' at times, from the table if it covers them
+    if table is not None and table.covers(times):
+        return table.interpolate(body + '_alt', times), table.interpolate(body + '_az', times)
+    altaz = get_body(body, times, location=location).transform_to(AltAz(obstime=times, location=location))
+    return altaz.alt.deg, altaz.az.deg
+
 def label(xy, text):
     y = xy[1] - 0.15  # shift y-value for label so that it's below the artist
     plt.text(xy[0], y, text, ha="center", family='sans-serif', size=14)
@@ -121,6 +138,9 @@ def main():
     logger.addHandler(handler)
     start_time = time.time()
 
+    elginfield = EarthLocation(lat=43.192*u.deg, lon=-81.318*u.deg, height=586*u.m)
+    eph_table = ephemeris.load_table(ephemeris.DEFAULT_TABLE_PATH, elginfield) if ephemeris is not None else None
+
     while(1):
         
         req_data = b'READ\n'
@@ -249,11 +269,13 @@ def main():
             timenow = now.strftime("%H:%M:%S")
             wnddir = np.radians(d_wnd)
 
-            elginfield = EarthLocation(lat=43.192*u.deg, lon=-81.318*u.deg, height=586*u.m)
-            moonaz = "{:.1f}".format((get_body("moon", Time.now()).transform_to(AltAz(obstime=Time.now(), location=elginfield)).az*u.deg).value)
-            moonalt = "{:.1f}".format((get_body("moon", Time.now()).transform_to(AltAz(obstime=Time.now(), location=elginfield)).alt*u.deg).value)
-            sunaz = "{:.1f}".format((get_body("sun", Time.now()).transform_to(AltAz(obstime=Time.now(), location=elginfield)).az*u.deg).value)
-            sunalt = "{:.1f}".format((get_body("sun", Time.now()).transform_to(AltAz(obstime=Time.now(), location=elginfield)).alt*u.deg).value)
+            time_now = Time.now()
+            moon_alt_now, moon_az_now = body_altaz("moon", time_now, elginfield, eph_table)
+            sun_alt_now, sun_az_now = body_altaz("sun", time_now, elginfield, eph_table)
+            moonaz = "{:.1f}".format(float(moon_az_now))
+            moonalt = "{:.1f}".format(float(moon_alt_now))
+            sunaz = "{:.1f}".format(float(sun_az_now))
+            sunalt = "{:.1f}".format(float(sun_alt_now))
 
 
             log_path = 'd:/Logs/Weather/'
@@ -313,11 +335,8 @@ def main():
 
             delta_midnight = np.linspace(-12, 12, 1000)*u.hour
             current_times = midnight + delta_midnight
-            current_frame = AltAz(obstime=current_times, location=elginfield)
-            sunaltazs_current = get_sun(current_times).transform_to(current_frame)
-
-            moon_current = get_body("moon", current_times)
-            moonaltazs_current = moon_current.transform_to(current_frame)
+            sun_alt_current = body_altaz("sun", current_times, elginfield, eph_table)[0]*u.deg
+            moon_alt_current = body_altaz("moon", current_times, elginfield, eph_table)[0]*u.deg
             #t = Time(Time.now(),format='iso')
             t = dt.now()
             # print("Moon...")
@@ -483,18 +502,18 @@ def main():
             # ax_t2 = fig.add_subplot(3,3,6)
 
             ax_cld = fig.add_subplot(3,1,3)
-            minmoonalt = np.min(moonaltazs_current.alt*u.deg).value
+            minmoonalt = np.min(moon_alt_current).value
 
-            ax_cld.plot(delta_midnight, sunaltazs_current.alt, color='r', label='Sun')
-            ax_cld.plot(delta_midnight, moonaltazs_current.alt, color=[0.75]*3, ls='--', label='Moon')
+            ax_cld.plot(delta_midnight, sun_alt_current, color='r', label='Sun')
+            ax_cld.plot(delta_midnight, moon_alt_current, color=[0.75]*3, ls='--', label='Moon')
             # plt.scatter(delta_midnight, m33altazs_current.alt,
             #             c=m33altazs_current.az, label='M33', lw=0, s=8,
             #             cmap='viridis')
             ax_cld.fill_between([-12,12],-18,0, hatch='x', color='green', alpha=0.8)
             ax_cld.fill_between(delta_midnight, 0, 90,
-                             sunaltazs_current.alt < -0*u.deg, color='0.5', zorder=0)
+                             sun_alt_current < -0*u.deg, color='0.5', zorder=0)
             ax_cld.fill_between(delta_midnight, 0, 90,
-                             sunaltazs_current.alt < -18*u.deg, color='k', zorder=0)
+                             sun_alt_current < -18*u.deg, color='k', zorder=0)
             # plt.colorbar().set_label('Azimuth [deg]')
 
             plt.axvline(toff, color='orange')
@@ -0,0 +1,179 @@
+"""Joint scheduling of the three-telescope array (REDBIRD, GREENBIRD, BLUEBIRD).
+
+Each telescope's RunColibri.js used to run `run_scheduler` on its own, so the
+array computed identical ephemerides and scores three times and nothing kept
+the three schedules on the same field, which `simultaneous_occults` in the
+pipeline needs. `TelescopeArray` schedules all of them in one pass:
+
+- telescopes whose scheduling config is identical (the default: same site,
+  optics and noise model) share one `Observatory`, so the visibility grid and
+  the per-block scores are computed once for all of them;
+- per-telescope overrides (``--array-config``, a JSON object of
+  `SchedulerConfig` attributes per telescope, e.g. another
+  ``radius_extinctions`` or ``altitude_threshold``) get their own
+  `Observatory` and scores;
+- every block goes to one field for the whole array: the field maximising
+  the array score, the smallest of the telescopes' scores (a simultaneous
+  event is only caught if every telescope can detect it), over fields
+  eligible for all telescopes.
+
+With no overrides each telescope's schedule is the single-telescope
+`run_scheduler` schedule. The result is written as one JSON file
+(`write_schedule`) that every telescope reads back with `read_schedule`
+(stdlib only, so reading it costs no astropy import).
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# Telescope names as used by PipelineAutomation/pipeline_automation.py.
+TELESCOPE_NAMES = ('REDBIRD', 'GREENBIRD', 'BLUEBIRD')
+
+# `SchedulerConfig` attributes a telescope may override.
+OVERRIDABLE = (
+    'latitude', 'longitude', 'height', 'altitude_threshold', 'radius_extinctions',
+    'sensitivity_model_loc', 'ephemeris_path', 'coordinate_backend',
+)
+
+_FORMAT_VERSION = 1
+
+
+def load_overrides(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Read per-telescope config overrides from a JSON object keyed by telescope name."""
+    if not path:
+        return {}
+    with open(path) as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path}: expected a JSON object keyed by telescope name.")
+    for name, values in overrides.items():
+        if name not in TELESCOPE_NAMES:
+            raise ValueError(f"{path}: unknown telescope {name!r} (expected one of {TELESCOPE_NAMES}).")
+        unknown = sorted(set(values) - set(OVERRIDABLE))
+        if unknown:
+            raise ValueError(f"{path}: {name} overrides unsupported settings {unknown} (allowed: {OVERRIDABLE}).")
+    return overrides
+
+
+class TelescopeArray:
+    """One `Observatory` per distinct telescope config, shared by the telescopes that have it."""
+
+    def __init__(self, base_config, telescopes: Sequence[str] = TELESCOPE_NAMES,
+                 overrides: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        from .scheduler import Observatory
+
+        if not telescopes:
+            raise ValueError("an array needs at least one telescope.")
+        overrides = overrides or {}
+        self.telescopes = list(telescopes)
+        self.observatories: List[Any] = []
+        self.member: Dict[str, int] = {}
+
+        signatures: Dict[tuple, int] = {}
+        for name in self.telescopes:
+            values = {key: getattr(base_config, key) for key in OVERRIDABLE}
+            values.update(overrides.get(name, {}))
+            signature = tuple(
+                (key, tuple(value) if isinstance(value, (list, tuple)) else value) for key, value in sorted(values.items())
+            )
+            if signature not in signatures:
+                config = _copy_config(base_config, values)
+                signatures[signature] = len(self.observatories)
+                self.observatories.append(Observatory(config))
+            self.member[name] = signatures[signature]
+
+    def schedule(self, sky, blocks, extinction: float, framerate: float, log=None) -> Dict[str, List[dict]]:
+        """Co-pointed per-block records for every telescope (see the module docstring).
+
+        Blocks with no field eligible for the whole array are reported on `log`
+        and skipped. Records have the `run_scheduler.schedule_blocks` shape.
+        """
+        import numpy as np
+        from astropy.time import Time
+
+        from .optimizer import score_matrix
+
+        records: Dict[str, List[dict]] = {name: [] for name in self.telescopes}
+        if not blocks:
+            return records
+        boundaries = Time([start for (start, _end) in blocks] + [blocks[-1][1]])
+        matrices = [score_matrix(obs, sky, boundaries, extinction, framerate) for obs in self.observatories]
+        array_score = np.min([matrix.score for matrix in matrices], axis=0)
+
+        catalog = self.observatories[0]._field_catalog(sky)
+        for step, (start, _end) in enumerate(blocks):
+            if not np.any(array_score[step] > 0.0):
+                if log is not None:
+                    print(f"WARNING: skipping block starting JD {start.jd:.6f}: no field is eligible for every telescope", file=log)
+                continue
+            position = int(np.argmax(array_score[step]))
+            field_id = catalog.field_keys[position]
+            ra_deg, dec_deg = sky.centroids[field_id]
+            for name in self.telescopes:
+                obs, matrix = self.observatories[self.member[name]], matrices[self.member[name]]
+                records[name].append({
+                    'name': "field" + str(field_id + 1),
+                    'field_id': field_id,
+                    'ra_deg': float(ra_deg),
+                    'dec_deg': float(dec_deg),
+                    'start_jd': float(start.jd),
+                    'alt': float(matrix.altitude[step, position]),
+                    'az': float(matrix.grid.az[matrix.grid.row(start), position]),
+                    'ha': obs._field_hour_angle(
+                        start, float(catalog.elon[position]), float(catalog.elat[position]),
+                        catalog=catalog, field_position=position,
+                    ),
+                    'airmass': float(matrix.airmass[step, position]),
+                    'score': float(matrix.score[step, position]),
+                    'nstars': int(matrix.nstars[step, position]),
+                })
+        return records
+
+
+def _copy_config(base_config, values: Mapping[str, Any]):
+    config = type(base_config).__new__(type(base_config))
+    config.__dict__.update(base_config.__dict__)
+    for key, value in values.items():
+        setattr(config, key, list(value) if key == 'radius_extinctions' else value)
+    return config
+
+
+def write_schedule(path: str, segments: Mapping[str, List[dict]], night: Mapping[str, Any]) -> None:
+    """Write the array's per-telescope segments and the night they are for to `path` (atomically)."""
+    document = {
+        'format_version': _FORMAT_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'night': dict(night),
+        'telescopes': {name: list(rows) for name, rows in segments.items()},
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(document, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def read_schedule(path: str, telescope: str, sunset_jd: Optional[float] = None,
+                  sunrise_jd: Optional[float] = None) -> List[dict]:
+    """Return `telescope`'s segments from an array schedule file.
+
+    Raises ValueError if the file is for another night (when `sunset_jd` /
+    `sunrise_jd` are given) or does not list `telescope`.
+    """
+    with open(path) as f:
+        document = json.load(f)
+    if document.get('format_version') != _FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported array schedule format {document.get('format_version')!r}.")
+    night = document.get('night', {})
+    for key, expected in (('sunset_jd', sunset_jd), ('sunrise_jd', sunrise_jd)):
+        if expected is not None and not abs(float(night.get(key, float('nan'))) - expected) <= 1e-6:
+            raise ValueError(f"{path}: array schedule is for {key} {night.get(key)}, not {expected}.")
+    telescopes = document.get('telescopes', {})
+    if telescope not in telescopes:
+        raise ValueError(f"{path}: no schedule for telescope {telescope!r} (has {sorted(telescopes)}).")
+    return telescopes[telescope]
@@ -0,0 +1,542 @@
+"""Precomputed field-ranking atlas over a season, and its query API.
+
+Questions such as "which field is best at JD X?" or "when is field 57
+observable this month?" otherwise take a full scheduler run each. The atlas
+answers them by lookup:
+
+- `build_atlas` scores every field with `optimizer.score_matrix` (the
+  scheduler's own score) on a regular grid of `step_minutes` slots starting at
+  local noon before the first evening, at a few extinction levels. Only slots
+  wholly inside twilight darkness are scored; no field is eligible in the
+  others. Nights are independent and are scored in worker processes.
+- The result is one ``.npz``. The score cube (dark slot x field x
+  extinction, float32) is split into one compressed member per night, so a
+  query decompresses at most one night. Next to it are the top-K fields of
+  every (dark slot, extinction) slice and a window index: every field's runs
+  of eligible (positive-score) slots, per extinction level.
+- `Atlas` loads the indexes when opened and night chunks on demand, keeping
+  the last few. `Atlas.ranking` answers a slice by lookup in the top-K index.
+  Between slot centres and extinction levels it interpolates linearly among
+  the bracketing slices' top-K fields. `Atlas.windows` lists a field's
+  eligible windows in a JD range from the window index.
+
+A slot's score is the scheduler's score for a visit over that slot (mean
+altitude over the slot, Moon and elongation at its start), so rankings match a
+`--optimizer dp` run on the same grid and extinction.
+
+Build (offline, once) and query from the command line::
+
+    python -m scheduler.atlas build --start 2026-10-17 --days 365 --out atlas.npz
+    python -m scheduler.atlas rank atlas.npz --jd 2461331.6 --extinction 0.1
+    python -m scheduler.atlas windows atlas.npz --field-id 56 --start-jd 2461331.5 --end-jd 2461361.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import math
+import os
+import sys
+import zipfile
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ["Atlas", "build_atlas"]
+
+_FORMAT_VERSION = 1
+
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_FIELDS = os.path.join(_THIS_DIR, "fields", "fields_13.3mag.json")
+_DEFAULT_MODELS = os.path.join(_THIS_DIR, "sensitivity_models")
+_DEFAULT_EXTINCTIONS = (0.0, 0.2, 0.5)
+
+# Night chunks an `Atlas` keeps decompressed.
+_NIGHT_CACHE_SIZE = 4
+
+# Worker state of an atlas build (one Observatory and catalog per process).
+_BUILD_STATE: Optional[SimpleNamespace] = None
+
+
+def _night_member(night: int) -> str:
+    return f"night_{night:05d}"
+
+
+def _slots_per_day(step_minutes: float) -> int:
+    if step_minutes <= 0:
+        raise ValueError(f"step_minutes must be positive, got {step_minutes}.")
+    slots = 1440.0 / step_minutes
+    if abs(slots - round(slots)) > 1e-9:
+        raise ValueError(f"step_minutes must divide a day (1440 min) evenly, got {step_minutes}.")
+    return int(round(slots))
+
+
+def _init_build_worker(fields_loc, models_loc, framerate, config_options, start_jd, step_days, extinctions):
+    """Load the Observatory and catalog once per build worker."""
+    global _BUILD_STATE
+    from .config import SchedulerConfig
+    from .scheduler import Observatory
+    from . import sky
+
+    config = SchedulerConfig(fps=framerate, sensitivity_model_loc=models_loc, **(config_options or {}))
+    _BUILD_STATE = SimpleNamespace(
+        obs=Observatory(config),
+        sky=sky.load_fields(fields_loc),
+        framerate=framerate,
+        start_jd=start_jd,
+        step_days=step_days,
+        extinctions=tuple(extinctions),
+    )
+
+
+def _score_night(task: Tuple[int, int, int]):
+    """(night, first slot, stop slot, cube) with the (slot, field, extinction) scores of slots [first, stop)."""
+    from astropy.time import Time
+    from . import optimizer
+
+    night, first, stop = task
+    state = _BUILD_STATE
+    catalog = state.obs._field_catalog(state.sky)
+    cube = np.zeros((stop - first, catalog.nfields, len(state.extinctions)), dtype=np.float32)
+    if stop > first:
+        boundaries = Time(state.start_jd + np.arange(first, stop + 1) * state.step_days, format='jd')
+        for level, extinction in enumerate(state.extinctions):
+            matrix = optimizer.score_matrix(state.obs, state.sky, boundaries, extinction, state.framerate)
+            cube[:, :, level] = matrix.score
+    return night, first, stop, cube
+
+
+def _top_fields(cube: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(index, score) of the `top_k` best eligible fields of every (slot, extinction); -1 pads."""
+    nslots, nfields, nlevels = cube.shape
+    k = min(top_k, nfields)
+    # Stable sort on the negated scores: ties go to the lower catalog position.
+    order = np.argsort(-cube, axis=1, kind='stable')[:, :k, :]
+    scores = np.take_along_axis(cube, order, axis=1)
+    index = np.full((nslots, nlevels, top_k), -1, dtype=np.int32)
+    top_score = np.zeros((nslots, nlevels, top_k), dtype=np.float32)
+    index[:, :, :k] = np.where(scores > 0.0, order, -1).transpose(0, 2, 1)
+    top_score[:, :, :k] = np.where(scores > 0.0, scores, 0.0).transpose(0, 2, 1)
+    return index, top_score
+
+
+def _eligible_runs(cube: np.ndarray, first_slot: int) -> np.ndarray:
+    """(field, level, start slot, stop slot) of every run of positive scores in a night's cube."""
+    eligible = np.pad(cube > 0.0, ((1, 1), (0, 0), (0, 0))).astype(np.int8)
+    change = np.diff(eligible, axis=0)
+    starts = np.argwhere(change == 1)
+    stops = np.argwhere(change == -1)
+    # argwhere orders by slot; reorder both by (field, level, slot) so they pair up.
+    starts = starts[np.lexsort((starts[:, 0], starts[:, 2], starts[:, 1]))]
+    stops = stops[np.lexsort((stops[:, 0], stops[:, 2], stops[:, 1]))]
+    return np.column_stack([starts[:, 1], starts[:, 2], starts[:, 0] + first_slot, stops[:, 0] + first_slot]).astype(np.int64)
+
+
+def _write_member(zf: zipfile.ZipFile, name: str, array: np.ndarray) -> None:
+    with zf.open(name + ".npy", "w", force_zip64=True) as member:
+        np.lib.format.write_array(member, np.asarray(array), allow_pickle=False)
+
+
+def build_atlas(
+    out_path: str,
+    start_date: str,
+    days: int = 365,
+    step_minutes: float = 10.0,
+    extinctions: Sequence[float] = _DEFAULT_EXTINCTIONS,
+    top_k: int = 20,
+    fields_loc: str = _DEFAULT_FIELDS,
+    models_loc: str = _DEFAULT_MODELS,
+    framerate: int = 40,
+    config_options: Optional[Dict] = None,
+    workers: int = 1,
+    log=None,
+) -> SimpleNamespace:
+    """Score `days` nights from the evening of `start_date` and write the atlas to `out_path`.
+
+    Returns a summary namespace (`path`, `nights`, `dark_slots`, `windows`,
+    `bytes`). Nights are scored by `workers` processes; the file is written
+    night by night, so only the indexes are held for the whole season.
+    """
+    from astropy.time import Time
+
+    if not out_path.endswith(".npz"):
+        raise ValueError(f"Atlas path must end in .npz: {out_path}")
+    if days < 1:
+        raise ValueError(f"days must be at least 1, got {days}.")
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}.")
+    levels = sorted({float(extinction) for extinction in extinctions})
+    if not levels:
+        raise ValueError("at least one extinction level is required.")
+    slots_per_day = _slots_per_day(step_minutes)
+    step_days = 1.0 / slots_per_day
+    first_night = datetime.date.fromisoformat(start_date)
+    nights = [(first_night + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+
+    # This process scores the nights itself when workers == 1; the grid start
+    # is filled in once the first evening's local noon is known.
+    _init_build_worker(fields_loc, models_loc, framerate, config_options, None, step_days, levels)
+    obs, catalog = _BUILD_STATE.obs, _BUILD_STATE.obs._field_catalog(_BUILD_STATE.sky)
+    framerate_value = obs._validate_scheduling_framerate(framerate)
+
+    # Slot 0 starts at local noon before the first evening; night d spans slots
+    # [d, d + 1) x slots_per_day and is scored on its slots inside darkness.
+    start_jd = float((Time(nights[0]) - obs.utc_offset).utc.jd) + 0.5
+    sunset_jd, sunrise_jd = obs.twilight_bounds(Time(nights))
+    tasks = []
+    for night in range(days):
+        first = stop = night * slots_per_day
+        if np.isfinite(sunset_jd[night]):
+            first = max(first, math.ceil((sunset_jd[night] - start_jd) / step_days - 1e-6))
+            stop = min((night + 1) * slots_per_day, math.floor((sunrise_jd[night] - start_jd) / step_days + 1e-6))
+            stop = max(stop, first)
+        tasks.append((night, first, stop))
+    _BUILD_STATE.start_jd = start_jd
+    initargs = (fields_loc, models_loc, framerate, config_options, start_jd, step_days, levels)
+
+    night_first = np.array([task[1] for task in tasks], dtype=np.int64)
+    night_stop = np.array([task[2] for task in tasks], dtype=np.int64)
+    night_row = np.concatenate([[0], np.cumsum(night_stop - night_first)])
+    nrows = int(night_row[-1])
+    top_index = np.full((nrows, len(levels), top_k), -1, dtype=np.int32)
+    top_score = np.zeros((nrows, len(levels), top_k), dtype=np.float32)
+    runs: List[np.ndarray] = []
+
+    directory = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{out_path}.tmp{os.getpid()}"
+    workers = max(1, min(int(workers), days))
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+            if workers == 1:
+                results = map(_score_night, tasks)
+                pool = None
+            else:
+                from concurrent.futures import ProcessPoolExecutor
+
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_build_worker, initargs=initargs)
+                results = pool.map(_score_night, tasks)
+            try:
+                for night, first, stop, cube in results:
+                    _write_member(zf, _night_member(night), cube)
+                    rows = slice(night_row[night], night_row[night + 1])
+                    top_index[rows], top_score[rows] = _top_fields(cube, top_k)
+                    runs.append(_eligible_runs(cube, first))
+                    if log is not None:
+                        print(f"night {nights[night]}: {stop - first} dark slots", file=log)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+            runs_all = np.concatenate(runs) if runs else np.empty((0, 4), dtype=np.int64)
+            runs_all = runs_all[np.lexsort((runs_all[:, 2], runs_all[:, 1], runs_all[:, 0]))]
+            keys = runs_all[:, 0] * len(levels) + runs_all[:, 1]
+            window_offsets = np.searchsorted(keys, np.arange(catalog.nfields * len(levels) + 1))
+            meta = {
+                'format_version': _FORMAT_VERSION,
+                'start_date': nights[0],
+                'start_jd': start_jd,
+                'step_minutes': float(step_minutes),
+                'slots_per_day': slots_per_day,
+                'days': days,
+                'top_k': top_k,
+                'framerate': framerate_value,
+                'twilight_alt': float(obs.config.twilight_alt),
+                'score_backend': str(getattr(obs.config, 'score_backend', "count")),
+                'coordinate_backend': str(getattr(obs.config, 'coordinate_backend', "astropy")),
+                'fields_source': os.path.basename(fields_loc),
+            }
+            arrays = {
+                'meta': np.asarray(json.dumps(meta)),
+                'field_keys': np.asarray(catalog.field_keys, dtype=np.int64),
+                'extinctions': np.asarray(levels, dtype=float),
+                'night_first': night_first,
+                'night_stop': night_stop,
+                'top_index': top_index,
+                'top_score': top_score,
+                'window_offsets': window_offsets.astype(np.int64),
+                'window_slots': runs_all[:, 2:].astype(np.int64),
+            }
+            for name, array in arrays.items():
+                _write_member(zf, name, array)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return SimpleNamespace(
+        path=out_path,
+        nights=days,
+        dark_slots=nrows,
+        windows=len(runs_all),
+        bytes=os.path.getsize(out_path),
+    )
+
+
+class Atlas:
+    """Read-only view of an atlas written by `build_atlas`.
+
+    Field ids are the catalog's field keys (a schedule's ``fieldN`` is id
+    ``N - 1``). Raises ValueError for JDs outside the atlas and extinctions
+    outside its levels.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._npz = np.load(path, allow_pickle=False)
+        try:
+            meta = json.loads(str(self._npz['meta'][()]))
+            if meta.get('format_version') != _FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported atlas version {meta.get('format_version')} in {path} "
+                    f"(expected {_FORMAT_VERSION}); rebuild it with `python -m scheduler.atlas build`."
+                )
+            self.meta = meta
+            self.start_jd = float(meta['start_jd'])
+            self.step_days = 1.0 / int(meta['slots_per_day'])
+            self.slots_per_day = int(meta['slots_per_day'])
+            self.top_k = int(meta['top_k'])
+            self.field_keys = self._npz['field_keys']
+            self.extinctions = self._npz['extinctions']
+            self.night_first = self._npz['night_first']
+            self.night_stop = self._npz['night_stop']
+            self.top_index = self._npz['top_index']
+            self.top_score = self._npz['top_score']
+            self.window_offsets = self._npz['window_offsets']
+            self.window_slots = self._npz['window_slots']
+        except Exception:
+            self._npz.close()
+            raise
+        self.night_row = np.concatenate([[0], np.cumsum(self.night_stop - self.night_first)])
+        self.nslots = len(self.night_first) * self.slots_per_day
+        self._positions = {int(key): position for position, key in enumerate(self.field_keys)}
+        self._nights: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def close(self) -> None:
+        self._npz.close()
+
+    def __enter__(self) -> "Atlas":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def end_jd(self) -> float:
+        return self.start_jd + self.nslots * self.step_days
+
+    def slot_jd(self, slot) -> np.ndarray:
+        """Start JD of grid slot(s) `slot`."""
+        return self.start_jd + np.asarray(slot) * self.step_days
+
+    def _slot(self, jd: float) -> Tuple[int, float]:
+        """(slot holding `jd`, offset of `jd` from that slot's centre in slots)."""
+        if not self.start_jd <= jd < self.end_jd:
+            raise ValueError(f"JD {jd} is outside the atlas ({self.start_jd:.6f} to {self.end_jd:.6f}).")
+        position = (jd - self.start_jd) / self.step_days
+        slot = min(int(math.floor(position)), self.nslots - 1)
+        return slot, position - slot - 0.5
+
+    def _dark_row(self, slot: int) -> Optional[Tuple[int, int]]:
+        """(night, row within the night's chunk) of a dark slot, or None."""
+        night = slot // self.slots_per_day
+        if not self.night_first[night] <= slot < self.night_stop[night]:
+            return None
+        return night, slot - int(self.night_first[night])
+
+    def _night(self, night: int) -> np.ndarray:
+        cube = self._nights.get(night)
+        if cube is None:
+            cube = self._npz[_night_member(night)]
+            self._nights[night] = cube
+            while len(self._nights) > _NIGHT_CACHE_SIZE:
+                self._nights.popitem(last=False)
+        else:
+            self._nights.move_to_end(night)
+        return cube
+
+    def _levels(self, extinction: float) -> Tuple[int, int, float]:
+        """(lower level, upper level, weight of the upper) bracketing `extinction`."""
+        levels = self.extinctions
+        if not levels[0] - 1e-9 <= extinction <= levels[-1] + 1e-9:
+            raise ValueError(f"extinction {extinction} is outside the atlas levels {levels.tolist()}.")
+        upper = int(np.clip(np.searchsorted(levels, extinction - 1e-9), 0, len(levels) - 1))
+        if upper == 0 or abs(levels[upper] - extinction) <= 1e-9:
+            return upper, upper, 0.0
+        lower = upper - 1
+        return lower, upper, float((extinction - levels[lower]) / (levels[upper] - levels[lower]))
+
+    def _position(self, field_id: int) -> int:
+        try:
+            return self._positions[int(field_id)]
+        except KeyError:
+            raise ValueError(f"field {field_id} is not in the atlas.") from None
+
+    def _interpolated(self, jd: float, extinction: float, positions: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, scores) at (`jd`, `extinction`); all fields when `positions` is None.
+
+        A field scores 0 unless eligible in the slot holding `jd`. Scores are
+        linear in extinction between levels, and in time between the centres
+        of this slot and its neighbour when the field is eligible in both.
+        """
+        slot, offset = self._slot(jd)
+        lower, upper, upper_weight = self._levels(extinction)
+        here = self._dark_row(slot)
+        if here is None:
+            empty = np.empty(0, dtype=np.int64)
+            return (empty, np.empty(0)) if positions is None else (positions, np.zeros(len(positions)))
+        night, row = here
+        neighbour = slot + (1 if offset > 0 else -1)
+        there = self._dark_row(neighbour) if 0 <= neighbour < self.nslots and offset != 0 else None
+        if positions is None:
+            positions = self._top_candidates([(night, row)] + ([there] if there else []), lower, upper)
+
+        def at(location):
+            values = self._night(location[0])[location[1]][positions]
+            return (1.0 - upper_weight) * values[:, lower].astype(float) + upper_weight * values[:, upper]
+
+        scores = at(here)
+        eligible = self._night(night)[row][positions][:, lower] > 0.0
+        if there is not None:
+            other = at(there)
+            weight = abs(offset)
+            scores = np.where(other > 0.0, (1.0 - weight) * scores + weight * other, scores)
+        return positions, np.where(eligible, scores, 0.0)
+
+    def _top_candidates(self, locations, lower: int, upper: int) -> np.ndarray:
+        rows = [int(self.night_row[night]) + row for night, row in locations]
+        candidates = self.top_index[rows][:, [lower, upper], :].ravel()
+        return np.unique(candidates[candidates >= 0]).astype(np.int64)
+
+    def ranking(self, jd: float, extinction: float = 0.0, k: int = 10) -> SimpleNamespace:
+        """The `k` best eligible fields at `jd`, best first: `field_ids`, `scores` (plus `jd`, `extinction`).
+
+        On a slot centre at an extinction level this is a lookup in the top-K
+        index; elsewhere the bracketing slices' top-K fields are interpolated
+        (see `score`) and re-ranked. `k` is at most the atlas's `top_k`.
+        """
+        if not 1 <= k <= self.top_k:
+            raise ValueError(f"k must be between 1 and the atlas top_k ({self.top_k}), got {k}.")
+        jd, extinction = float(jd), float(extinction)
+        slot, offset = self._slot(jd)
+        lower, upper, upper_weight = self._levels(extinction)
+        here = self._dark_row(slot)
+        if here is None:
+            positions, scores = np.empty(0, dtype=np.int64), np.empty(0)
+        elif offset == 0.0 and upper_weight == 0.0:
+            row = int(self.night_row[here[0]]) + here[1]
+            positions = self.top_index[row, lower, :k].astype(np.int64)
+            scores = self.top_score[row, lower, :k].astype(float)
+        else:
+            positions, scores = self._interpolated(jd, extinction, None)
+            order = np.lexsort((positions, -scores))[:k]
+            positions, scores = positions[order], scores[order]
+        keep = (positions >= 0) & (scores > 0.0)
+        positions, scores = positions[keep], scores[keep]
+        return SimpleNamespace(jd=jd, extinction=extinction, field_ids=self.field_keys[positions], scores=scores)
+
+    def score(self, field_id: int, jd: float, extinction: float = 0.0) -> float:
+        """Interpolated score of one field at `jd` (0 where it is not eligible)."""
+        position = np.array([self._position(field_id)])
+        return float(self._interpolated(float(jd), float(extinction), position)[1][0])
+
+    def windows(self, field_id: int, start_jd: float, end_jd: float, extinction: float = 0.0) -> List[Tuple[float, float]]:
+        """(start, end) JDs of the field's eligible windows overlapping [`start_jd`, `end_jd`], clipped to it.
+
+        Windows are runs of grid slots with a positive score at the smallest
+        atlas level at or above `extinction` (a subset of the eligible time
+        at `extinction` itself).
+        """
+        if end_jd < start_jd:
+            raise ValueError(f"end_jd ({end_jd}) must not precede start_jd ({start_jd}).")
+        levels = self.extinctions
+        if extinction > levels[-1] + 1e-9:
+            raise ValueError(f"extinction {extinction} is above the atlas levels {levels.tolist()}.")
+        level = int(np.searchsorted(levels, extinction - 1e-9))
+        key = self._position(field_id) * len(levels) + level
+        slots = self.window_slots[self.window_offsets[key]:self.window_offsets[key + 1]]
+        bounds = self.slot_jd(slots)
+        first = int(np.searchsorted(bounds[:, 1], start_jd, side='right'))
+        last = int(np.searchsorted(bounds[:, 0], end_jd, side='left'))
+        return [(max(float(lo), start_jd), min(float(hi), end_jd)) for lo, hi in bounds[first:last]]
+
+
+def _field_name(field_id: int) -> str:
+    return "field" + str(int(field_id) + 1)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query a precomputed field-ranking atlas.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Score every field over a season and write the atlas.")
+    build.add_argument("--start", required=True, help="Local date of the first evening (YYYY-MM-DD).")
+    build.add_argument("--days", type=int, default=365, help="Number of nights (default 365).")
+    build.add_argument("--step-minutes", type=float, default=10.0, help="Grid step in minutes; must divide a day (default 10).")
+    build.add_argument(
+        "--extinction", type=float, nargs="+", default=list(_DEFAULT_EXTINCTIONS),
+        help="Extinction levels in mag/airmass (default 0 0.2 0.5).",
+    )
+    build.add_argument("--top-k", type=int, default=20, help="Fields kept per slice in the ranking index (default 20).")
+    build.add_argument("--framerate", type=int, default=40, help="Camera framerate in Hz (default 40).")
+    build.add_argument("--fields", default=_DEFAULT_FIELDS, help="Path to the fields JSON or a compiled .npz catalog.")
+    build.add_argument("--models", default=_DEFAULT_MODELS, help="Path to the sensitivity_models folder.")
+    build.add_argument("--coordinate-backend", choices=("astropy", "fast"), default="astropy", help="Field alt/az backend.")
+    build.add_argument("--score-backend", choices=("count", "event_rate"), default="count", help="Field score backend.")
+    build.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    build.add_argument("--out", required=True, help="Output .npz path.")
+
+    rank = commands.add_parser("rank", help="Print the best fields at a JD.")
+    rank.add_argument("atlas", help="Atlas .npz path.")
+    rank.add_argument("--jd", type=float, required=True, help="UTC Julian date.")
+    rank.add_argument("--extinction", type=float, default=0.0, help="Extinction in mag/airmass (default 0).")
+    rank.add_argument("-k", type=int, default=10, help="Number of fields (default 10).")
+
+    windows = commands.add_parser("windows", help="Print a field's eligible windows in a JD range.")
+    windows.add_argument("atlas", help="Atlas .npz path.")
+    windows.add_argument("--field-id", type=int, required=True, help="Field id (schedule name fieldN is id N-1).")
+    windows.add_argument("--start-jd", type=float, required=True, help="Start of the range (UTC JD).")
+    windows.add_argument("--end-jd", type=float, required=True, help="End of the range (UTC JD).")
+    windows.add_argument("--extinction", type=float, default=0.0, help="Extinction in mag/airmass (default 0).")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        try:
+            summary = build_atlas(
+                args.out, args.start, days=args.days, step_minutes=args.step_minutes, extinctions=args.extinction,
+                top_k=args.top_k, fields_loc=args.fields, models_loc=args.models, framerate=args.framerate,
+                config_options={'coordinate_backend': args.coordinate_backend, 'score_backend': args.score_backend},
+                workers=args.workers or os.cpu_count() or 1, log=sys.stderr,
+            )
+        except Exception as exc:
+            print(f"ERROR: atlas build failed: {exc}", file=sys.stderr)
+            return 1
+        print(
+            f"Wrote atlas {summary.path}: {summary.nights} nights, {summary.dark_slots} dark slots, "
+            f"{summary.windows} windows, {summary.bytes / 1e6:.1f} MB"
+        )
+        return 0
+
+    try:
+        with Atlas(args.atlas) as atlas:
+            if args.command == "rank":
+                result = atlas.ranking(args.jd, args.extinction, args.k)
+                print("rank,name,field_id,score")
+                for rank_index, (field_id, score) in enumerate(zip(result.field_ids, result.scores), start=1):
+                    print(f"{rank_index},{_field_name(field_id)},{int(field_id)},{score:.2f}")
+            else:
+                print("start_jd,end_jd,hours")
+                for start, end in atlas.windows(args.field_id, args.start_jd, args.end_jd, args.extinction):
+                    print(f"{start:.6f},{end:.6f},{(end - start) * 24.0:.3f}")
+    except (OSError, KeyError, ValueError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Performance checks for the standalone scheduler (run as ``python -m scheduler.benchmarks.<name>``)."""
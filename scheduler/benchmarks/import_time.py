@@ -0,0 +1,124 @@
+"""Import-time benchmark for the scheduler package, checked against a budget.
+
+Each module in `IMPORT_BUDGETS_MS` is imported in a fresh interpreter under
+``python -X importtime``; its cumulative import time (best of `--repeat` runs)
+must stay within budget. Modules in `LAZY_IMPORTS` must additionally not pull
+in the listed heavy dependencies at import time, which is what keeps argument
+errors and the service client off the numpy/astropy cold-start path::
+
+    python -m scheduler.benchmarks.import_time            # report + check
+    python -m scheduler.benchmarks.import_time --top 15   # also list the slowest imports
+
+Exits 1 if any budget or laziness check fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Cumulative import-time budgets (ms) per module, measured in a fresh interpreter.
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    'scheduler.service': 100.0,
+    'scheduler.run_scheduler': 150.0,
+    'scheduler.sky': 400.0,
+    'scheduler.scheduler': 2500.0,
+}
+
+# Heavy dependencies that must not be imported as a side effect of importing a module.
+LAZY_IMPORTS: Dict[str, Tuple[str, ...]] = {
+    'scheduler.service': ('numpy', 'astropy', 'h5py'),
+    'scheduler.run_scheduler': ('numpy', 'astropy', 'h5py'),
+    'scheduler.sky': ('astropy', 'h5py'),
+    'scheduler.noise_model': ('astropy', 'h5py'),
+    'scheduler.ephemeris': ('astropy.coordinates', 'h5py'),
+}
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = _REPO_ROOT + os.pathsep + env.get('PYTHONPATH', "")
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, env=env, cwd=_REPO_ROOT)
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """Import `module` in a fresh interpreter; return (cumulative ms, [(self ms, name), ...])."""
+    proc = _run_python(["-X", "importtime", "-c", f"import {module}"])
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr}")
+
+    total_ms = None
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, _indent, name = match.groups()
+        entries.append((int(self_us) / 1000.0, name))
+        if name == module:
+            total_ms = int(cumulative_us) / 1000.0
+    if total_ms is None:
+        raise RuntimeError(f"no -X importtime entry for {module} (already imported by site?)")
+    return total_ms, entries
+
+
+def eager_imports(module: str, heavy: Sequence[str]) -> List[str]:
+    """Return the entries of `heavy` that importing `module` loads."""
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([name for name in {list(heavy)!r} if name in sys.modules]))\n"
+    )
+    proc = _run_python(["-c", code])
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check scheduler import times against their budgets.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs per module; the best is kept.")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports (self time) per module.")
+    parser.add_argument("--json", default=None, help="Write the measurements to this JSON file.")
+    args = parser.parse_args(argv)
+
+    failures = []
+    results = {}
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        runs = [measure_import(module) for _ in range(max(1, args.repeat))]
+        best_ms, entries = min(runs, key=lambda run: run[0])
+        ok = best_ms <= budget_ms
+        results[module] = {'import_ms': best_ms, 'budget_ms': budget_ms, 'ok': ok}
+        print(f"{module:<28} {best_ms:8.1f} ms  (budget {budget_ms:.0f} ms)  {'ok' if ok else 'OVER BUDGET'}")
+        if not ok:
+            failures.append(f"{module} imports in {best_ms:.1f} ms > {budget_ms:.0f} ms")
+        for self_ms, name in sorted(entries, reverse=True)[:args.top]:
+            print(f"    {self_ms:8.1f} ms  {name}")
+
+    for module, heavy in LAZY_IMPORTS.items():
+        eager = eager_imports(module, heavy)
+        results.setdefault(module, {})['eager_imports'] = eager
+        if eager:
+            print(f"{module:<28} imports {', '.join(eager)} eagerly")
+            failures.append(f"{module} imports {', '.join(eager)} at module load")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,401 @@
+"""Scheduler benchmark suite on synthetic catalogs, with a reference-output check.
+
+Generates a synthetic catalog (`synthetic.make_fields`) and times the hot
+paths of the scheduler on it:
+
+- `sky.load_fields` (JSON and compiled catalog),
+- `ColibriNoiseModel.predict` per field and `predict_many` for the whole sky,
+- `Observatory.correct_field` over every field,
+- `Observatory._visible_field_mask` (on-the-fly and grid lookup),
+- the closed-form `horizon.HorizonModel` alt/az and hour angles on the block
+  grid (also checked against astropy to `horizon.MAX_ERROR_DEG`, and its Moon
+  to `horizon.MAX_MOON_ERROR_DEG`), and a whole fast-backend grid build,
+- `twilight.night_bounds` over a year of nights (checked against astropy's
+  Sun to `twilight.MAX_ERROR_SECONDS`),
+- `Observatory.schedule_observation` per block,
+- a full `run_scheduler.main` night.
+
+Repeated requests to a warm `run_scheduler --serve` process are also checked
+against a fresh CLI run of that night: exit status, stdout and stderr.
+
+Results are written as JSON (`--out`) so runs can be compared across commits.
+The selections (per-block fields and the CLI schedule) are checked two ways:
+
+- against the per-field reference path (`correct_field` + `_score_field` with
+  per-block astropy transforms, i.e. the scheduler before vectorization), and
+- against a stored reference run (`--reference`, written with
+  `--write-reference`) from another commit.
+
+Either mismatch makes the suite exit 1::
+
+    python -m scheduler.benchmarks.suite --fields 1000 --stars 400 --out bench.json
+    python -m scheduler.benchmarks.suite --write-reference ref.json     # on a known-good commit
+    python -m scheduler.benchmarks.suite --reference ref.json           # after a change
+
+The Observatory is built without an ephemeris table unless `--ephemeris` is
+given, because interpolated Moon/Sun positions may legitimately move
+near-tie selections away from the astropy reference.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import synthetic
+
+# Night used by default: one of the long November nights at Elginfield.
+_DEFAULT_SUNSET_JD = 2461331.4725
+_DEFAULT_SUNRISE_JD = 2461331.97
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    runs = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {'best_s': min(runs), 'median_s': statistics.median(runs), 'runs': len(runs)}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=_REPO_ROOT, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def _versions() -> Dict[str, str]:
+    import astropy
+
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'astropy': astropy.__version__}
+
+
+def reference_selection(obs, sky, observation_start, observation_end, weather, framerate):
+    """Best field for a block via the per-field reference path; (key, score) or (None, 0.0).
+
+    Mirrors the original `schedule_observation`: per-block AltAz transforms of
+    the field centres and the Moon, then `correct_field` + `_score_field` for
+    each visible field, picking the first field with the highest score > 0.
+    """
+    from astropy.coordinates import AltAz, get_body
+
+    fields_altaz_start = obs.get_field_altaz(observation_start, sky)
+    fields_altaz_end = obs.get_field_altaz(observation_end, sky)
+    altitudes_start = fields_altaz_start.alt.deg
+    altitudes_end = fields_altaz_end.alt.deg
+    mean_altitudes = (altitudes_start + altitudes_end) / 2.0
+
+    moon = get_body('moon', observation_start, location=obs.location)
+    moon_altaz = moon.transform_to(AltAz(obstime=observation_start, location=obs.location))
+    moon_sep = fields_altaz_start.separation(moon_altaz).deg
+
+    threshold = obs.config.altitude_threshold
+    visible = (altitudes_start > threshold) & (altitudes_end > threshold) & (moon_sep > obs._MOON_EXCLUSION_DEG)
+
+    best_key, best_score = None, 0.0
+    for position, key in enumerate(sky.fields):
+        if not visible[position]:
+            continue
+        field = obs.correct_field(sky.fields[key], weather, mean_altitudes[position])
+        obs._score_field(field, observation_start=observation_start, framerate=framerate)
+        score = float(field.get('OBSERVATION_SCORE', 0.0))
+        if score > 0.0 and (best_key is None or score > best_score):
+            best_key, best_score = key, score
+    return best_key, best_score
+
+
+def service_round_trip(argv: Sequence[str], serve_argv: Sequence[str], requests: int = 2) -> Dict[str, Any]:
+    """Compare `requests` repeated warm-service answers for `argv` with a fresh CLI run.
+
+    The CLI and the server (`run_scheduler --serve` with `serve_argv`, on a
+    free port) run in their own processes, as clients would use them. Each
+    answer must match the CLI's exit status, stdout and stderr, so warnings
+    and diagnostics are shown to every request, not only the first.
+    """
+    from .. import service
+
+    command = [sys.executable, "-m", "scheduler.run_scheduler"]
+    cli = subprocess.run(command + list(argv), capture_output=True, text=True, cwd=_REPO_ROOT)
+    expected = {'exit_code': cli.returncode, 'stdout': cli.stdout, 'stderr': cli.stderr}
+
+    server = subprocess.Popen(
+        command + ["--serve", "--port", "0"] + list(serve_argv),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, cwd=_REPO_ROOT,
+    )
+    try:
+        address = None
+        for line in server.stderr:
+            if "listening on" in line:
+                address = line.rsplit(" ", 1)[-1].strip()
+                break
+        if address is None:
+            return {'requests': 0, 'mismatches': [], 'ok': False, 'error': "scheduler service did not start"}
+        host, port = address.rsplit(":", 1)
+        mismatches = []
+        for number in range(1, requests + 1):
+            response = service.request(argv, host, int(port))
+            differing = [name for name in ('exit_code', 'stdout', 'stderr') if response.get(name) != expected[name]]
+            if differing:
+                mismatches.append({'request': number, 'differs': differing})
+    finally:
+        server.terminate()
+        server.wait()
+    return {'requests': requests, 'mismatches': mismatches, 'ok': not mismatches}
+
+
+def run_suite(args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    import astropy.units as u
+    from astropy.time import Time
+
+    from .. import constants, run_scheduler, twilight
+    from .. import sky as sky_module
+    from ..config import SchedulerConfig
+    from ..horizon import MAX_ERROR_DEG, MAX_MOON_ERROR_DEG, HorizonModel
+    from ..scheduler import Observatory
+    from ..visibility import VisibilityGrid
+
+    fields_path = os.path.join(workdir, "fields.json")
+    counts = synthetic.write_fields(fields_path, **synthetic.catalog_kwargs(args))
+    timings: Dict[str, Dict[str, Any]] = {}
+
+    # Catalog loading: JSON parse (no compiled catalog or ecliptic cache), then compiled.
+    timings['load_fields.json'] = _timed(
+        lambda: sky_module._load_fields_json(fields_path, use_cache=False), args.repeat
+    )
+    compiled_path = sky_module.compile_fields(fields_path)
+    timings['load_fields.compiled'] = _timed(lambda: sky_module.load_fields(compiled_path), args.repeat)
+    sky = sky_module.load_fields(fields_path, prefer_compiled=False)
+    catalog = sky.catalog
+
+    config = SchedulerConfig(
+        fps=args.framerate, sensitivity_model_loc=args.models, ephemeris_path=args.ephemeris or ""
+    )
+    obs = Observatory(config)
+    noise_model = obs.telescope._noise_model
+    cadence_ms = obs.telescope._cadence_ms(framerate=args.framerate)
+    field_list = list(sky.fields.values())
+    mag_key = constants.GaiaDR3Keys.MAG
+
+    timings['noise_model.predict'] = _timed(
+        lambda: [noise_model.predict(field[mag_key], 1.3, cadence_ms) for field in field_list], args.repeat
+    )
+    all_mags = catalog.columns[mag_key]
+    timings['noise_model.predict_many'] = _timed(
+        lambda: noise_model.predict_many(all_mags, np.full(catalog.nfields, 1.3), cadence_ms, star_field=catalog.star_field),
+        args.repeat,
+    )
+    timings['correct_field'] = _timed(
+        lambda: [obs.correct_field(field, args.extinction, 50.0) for field in field_list], args.repeat
+    )
+
+    sunset = Time(args.sunset_jd, format='jd')
+    sunrise = Time(args.sunrise_jd, format='jd')
+    blocks = run_scheduler._build_blocks(sunset, sunrise)[:args.blocks]
+    if not blocks:
+        raise ValueError("empty observing window; no blocks to benchmark.")
+    first_start, first_end = blocks[0]
+    off_grid_start, off_grid_end = first_start + 1 * u.min, first_end + 1 * u.min
+
+    def visible_mask_on_the_fly():
+        obs._visibility_grid = None
+        obs._visible_field_mask(off_grid_start, off_grid_end, sky)
+
+    timings['visible_field_mask.on_the_fly'] = _timed(visible_mask_on_the_fly, args.repeat)
+    boundaries = [start for start, _end in blocks] + [blocks[-1][1]]
+
+    def fresh_visibility_grid():
+        obs._visibility_grid = None
+        obs.visibility_grid(sky, boundaries)
+
+    timings['visibility_grid'] = _timed(fresh_visibility_grid, args.repeat)
+
+    # Closed-form coordinate backend: the field kernel alone, then a whole grid
+    # (fields and Moon) built end to end as the fast backend builds it.
+    fast_horizon = HorizonModel(obs.location)
+    grid_times = Time(boundaries)
+    fast_horizon.places(catalog, float(grid_times.jd[len(grid_times) // 2]))
+    fast_horizon.fk5_ra_hours(catalog)
+    timings['horizon.fast'] = _timed(
+        lambda: (fast_horizon.altaz(catalog, grid_times), fast_horizon.hour_angle(catalog, grid_times)), args.repeat
+    )
+    timings['visibility_grid.fast'] = _timed(
+        lambda: VisibilityGrid.compute(obs.location, catalog, grid_times, ephemeris=obs.ephemeris, horizon=fast_horizon),
+        args.repeat,
+    )
+    season_midnights = 0.5 * (args.sunset_jd + args.sunrise_jd) + np.arange(0.0, 365.0, 7.0)
+    timings['twilight.night_bounds'] = _timed(
+        lambda: twilight._solve(
+            season_midnights, np.full(season_midnights.shape, obs.location.lat.deg),
+            np.full(season_midnights.shape, obs.location.lon.deg), float(config.twilight_alt),
+        ),
+        args.repeat,
+    )
+    timings['visible_field_mask.grid'] = _timed(
+        lambda: obs._visible_field_mask(first_start, first_end, sky), args.repeat
+    )
+
+    # Per-block selection on the grid, as run_scheduler does it.
+    selections: List[Dict[str, Any]] = []
+    block_times = []
+    for start, end in blocks:
+        began = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                _top, stats = obs.schedule_observation(
+                    sky, start, end, weather=args.extinction, framerate=args.framerate
+                )
+            field, score = int(stats['Field']), float(stats['Observation Score'])
+        except ValueError:
+            field, score = None, 0.0
+        block_times.append(time.perf_counter() - began)
+        selections.append({'start_jd': float(start.jd), 'field': field, 'score': score})
+    timings['schedule_observation'] = {
+        'best_s': min(block_times), 'median_s': statistics.median(block_times), 'runs': len(block_times),
+    }
+
+    # Full CLI night (fresh process state aside from warm imports).
+    cli_argv = [
+        "--sunset-jd", str(args.sunset_jd), "--sunrise-jd", str(args.sunrise_jd),
+        "--framerate", str(args.framerate), "--extinction", str(args.extinction),
+        "--fields", fields_path, "--models", args.models,
+    ]
+    cli_out = io.StringIO()
+    began = time.perf_counter()
+    with contextlib.redirect_stdout(cli_out), contextlib.redirect_stderr(io.StringIO()):
+        cli_status = run_scheduler.main(cli_argv)
+    timings['run_scheduler.main'] = {'best_s': time.perf_counter() - began, 'median_s': None, 'runs': 1}
+
+    checks: Dict[str, Any] = {}
+    horizon_errors = fast_horizon.compare_to_astropy(catalog, grid_times)
+    moon_error = max(horizon_errors['moon_alt'], horizon_errors['moon_az'])
+    field_error = max(error for name, error in horizon_errors.items() if not name.startswith('moon_'))
+    checks['horizon_fast'] = dict(
+        horizon_errors, tolerance_deg=MAX_ERROR_DEG, moon_tolerance_deg=MAX_MOON_ERROR_DEG,
+        ok=field_error <= MAX_ERROR_DEG and moon_error <= MAX_MOON_ERROR_DEG,
+    )
+    twilight_errors = twilight.compare_to_astropy(
+        season_midnights, obs.location.lat.deg, obs.location.lon.deg, float(config.twilight_alt)
+    )
+    checks['twilight'] = dict(
+        twilight_errors, tolerance_s=twilight.MAX_ERROR_SECONDS,
+        ok=max(twilight_errors.values()) <= twilight.MAX_ERROR_SECONDS,
+    )
+    if not args.skip_reference_path:
+        mismatches = []
+        for (start, end), selection in zip(blocks, selections):
+            with contextlib.redirect_stdout(io.StringIO()):
+                key, score = reference_selection(obs, sky, start, end, args.extinction, args.framerate)
+            if key != selection['field']:
+                mismatches.append({'start_jd': selection['start_jd'], 'optimized': selection['field'], 'reference': key})
+        checks['reference_path'] = {'blocks': len(blocks), 'mismatches': mismatches, 'ok': not mismatches}
+    if not args.skip_service_check:
+        checks['service_round_trip'] = service_round_trip(
+            cli_argv, ["--fields", fields_path, "--models", args.models]
+        )
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'versions': _versions(),
+            'catalog': dict(synthetic.catalog_kwargs(args), **counts),
+            'night': {'sunset_jd': args.sunset_jd, 'sunrise_jd': args.sunrise_jd, 'blocks': len(blocks)},
+            'framerate': args.framerate,
+            'extinction': args.extinction,
+            'ephemeris': args.ephemeris,
+        },
+        'timings': timings,
+        'selections': {'blocks': selections, 'cli_status': cli_status, 'cli_stdout': cli_out.getvalue()},
+        'checks': checks,
+    }
+
+
+def compare_to_reference(results: Dict[str, Any], reference: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare selections with a stored run; catalogs and nights must match to be comparable."""
+    if reference['meta']['catalog'] != results['meta']['catalog'] or reference['meta']['night'] != results['meta']['night']:
+        return {'ok': False, 'error': "reference was recorded for a different catalog or night"}
+    ours = [block['field'] for block in results['selections']['blocks']]
+    theirs = [block['field'] for block in reference['selections']['blocks']]
+    mismatched_blocks = [
+        {'start_jd': block['start_jd'], 'current': a, 'reference': b}
+        for block, a, b in zip(results['selections']['blocks'], ours, theirs) if a != b
+    ]
+    cli_equal = results['selections']['cli_stdout'] == reference['selections']['cli_stdout']
+    return {
+        'ok': not mismatched_blocks and cli_equal and len(ours) == len(theirs),
+        'mismatched_blocks': mismatched_blocks,
+        'cli_equal': cli_equal,
+        'reference_commit': reference['meta'].get('commit'),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on a synthetic catalog.")
+    synthetic.add_arguments(parser)
+    parser.add_argument("--sunset-jd", type=float, default=_DEFAULT_SUNSET_JD, help="Benchmark night start (JD).")
+    parser.add_argument("--sunrise-jd", type=float, default=_DEFAULT_SUNRISE_JD, help="Benchmark night end (JD).")
+    parser.add_argument("--blocks", type=int, default=6, help="Blocks timed/checked with schedule_observation.")
+    parser.add_argument("--framerate", type=int, default=40, help="Camera framerate in Hz (default 40).")
+    parser.add_argument("--extinction", type=float, default=0.2, help="Nominal extinction (mag/airmass).")
+    parser.add_argument("--models", default=os.path.join(_REPO_ROOT, "scheduler", "sensitivity_models"),
+                        help="Path to the sensitivity_models folder.")
+    parser.add_argument("--ephemeris", default=None, help="Ephemeris table to use (default: none, pure astropy).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per micro-benchmark; best and median kept.")
+    parser.add_argument("--skip-reference-path", action="store_true", help="Skip the slow per-field reference check.")
+    parser.add_argument(
+        "--skip-service-check", action="store_true", help="Skip comparing repeated warm-service answers with the CLI."
+    )
+    parser.add_argument("--reference", default=None, help="Stored run to compare selections against.")
+    parser.add_argument("--write-reference", default=None, help="Also write this run as a reference file.")
+    parser.add_argument("--out", default=None, help="Write results JSON here (default: stdout).")
+    parser.add_argument("--workdir", default=None, help="Directory for the synthetic catalog (default: temporary).")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix="scheduler-bench-"))
+        os.makedirs(workdir, exist_ok=True)
+        results = run_suite(args, workdir)
+
+    if args.reference:
+        with open(args.reference) as f:
+            results['checks']['reference_file'] = compare_to_reference(results, json.load(f))
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.write_reference:
+        with open(args.write_reference, "w") as f:
+            f.write(text + "\n")
+
+    for name, timing in results['timings'].items():
+        print(f"{name:<32} {timing['best_s'] * 1000:10.1f} ms", file=sys.stderr)
+    failed = [name for name, check in results['checks'].items() if not check.get('ok', False)]
+    for name in failed:
+        print(f"FAIL: {name}: {json.dumps(results['checks'][name])}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+"""Synthetic field catalogs in the `sky.load_fields` JSON shape.
+
+Field centres are spread quasi-uniformly over the sky north of `dec_min`
+(a Fibonacci lattice), and each field gets a random star count around
+`stars_per_field`, with star positions scattered over the camera field of
+view. Magnitudes follow either a power law truncated at `mag_limit`
+(counts rising by `slope` dex per magnitude, like a real magnitude-limited
+catalog) or a uniform distribution over the `mag_range` magnitudes above the
+limit::
+
+    python -m scheduler.benchmarks.synthetic out.json --fields 2000 --stars 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .. import constants
+from ..sky import _icrs_to_geocentric_ecliptic_many
+
+MAG_DISTRIBUTIONS = ("powerlaw", "uniform")
+
+# Half-width (deg) of the square patch stars are scattered over around a field centre.
+_FIELD_HALF_WIDTH_DEG = 0.7
+
+
+def _magnitudes(rng: np.random.Generator, n: int, distribution: str, mag_limit: float, mag_range: float,
+                slope: float) -> np.ndarray:
+    if distribution == "uniform":
+        return rng.uniform(mag_limit - mag_range, mag_limit, n)
+    if distribution == "powerlaw":
+        # Inverse CDF of p(m) ~ 10**(slope * m) on [mag_limit - mag_range, mag_limit].
+        floor = 10.0 ** (-slope * mag_range)
+        return mag_limit + np.log10(floor + (1.0 - floor) * rng.uniform(0.0, 1.0, n)) / slope
+    raise ValueError(f"Unknown magnitude distribution {distribution!r} (expected one of {MAG_DISTRIBUTIONS}).")
+
+
+def make_fields(
+    nfields: int = 300,
+    stars_per_field: int = 300,
+    mag_distribution: str = "powerlaw",
+    mag_limit: float = 13.3,
+    mag_range: float = 7.0,
+    slope: float = 0.35,
+    star_spread: float = 0.5,
+    dec_min: float = -40.0,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """Return a synthetic fields table (CENTROID + STARS) ready for `json.dump`.
+
+    Star counts are drawn uniformly from
+    `stars_per_field * (1 -/+ star_spread)`. Fields south of `dec_min` are
+    dropped from the lattice, so the result may hold slightly fewer than
+    `nfields` fields (as `nfields` over the whole sphere would give).
+    """
+    if nfields <= 0 or stars_per_field <= 0:
+        raise ValueError("nfields and stars_per_field must be positive.")
+    rng = np.random.default_rng(seed)
+
+    lattice = np.arange(nfields) + 0.5
+    dec = np.degrees(np.arcsin(1.0 - 2.0 * lattice / nfields))
+    ra = np.degrees(np.pi * (1.0 + 5.0 ** 0.5) * lattice) % 360.0
+    keep = dec > dec_min
+    ra, dec = ra[keep], dec[keep]
+    elon, elat = _icrs_to_geocentric_ecliptic_many(ra, dec)
+
+    low = max(1, int(round(stars_per_field * (1.0 - star_spread))))
+    high = max(low + 1, int(round(stars_per_field * (1.0 + star_spread))) + 1)
+
+    stars: Dict[str, Dict[str, list]] = {}
+    for field_id in range(len(ra)):
+        n = int(rng.integers(low, high))
+        lon_scale = 1.0 / max(np.cos(np.radians(elat[field_id])), 0.2)
+        stars[str(field_id)] = {
+            constants.GaiaDR3Keys.LON: (elon[field_id] + rng.uniform(-1, 1, n) * _FIELD_HALF_WIDTH_DEG * lon_scale).tolist(),
+            constants.GaiaDR3Keys.LAT: (elat[field_id] + rng.uniform(-1, 1, n) * _FIELD_HALF_WIDTH_DEG).tolist(),
+            constants.GaiaDR3Keys.MAG: _magnitudes(rng, n, mag_distribution, mag_limit, mag_range, slope).tolist(),
+            constants.FieldDataKeys.ANGSIZE: rng.lognormal(np.log(2e-5), 0.6, n).tolist(),
+            constants.GaiaDR3Keys.GID: rng.integers(1, 2 ** 62, n).tolist(),
+        }
+
+    return {
+        constants.FieldDataKeys.COORD_STR_REG: [[float(a), float(d)] for a, d in zip(ra, dec)],
+        constants.FieldDataKeys.STAR_STR_REG: stars,
+    }
+
+
+def write_fields(path: str, **kwargs: Any) -> Dict[str, int]:
+    """Write `make_fields(**kwargs)` to `path`; return its field and star counts."""
+    table = make_fields(**kwargs)
+    with open(path, "w") as f:
+        json.dump(table, f)
+    stars = table[constants.FieldDataKeys.STAR_STR_REG]
+    return {
+        'nfields': len(stars),
+        'nstars': sum(len(field[constants.GaiaDR3Keys.MAG]) for field in stars.values()),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the catalog-shape options shared with the benchmark suite."""
+    parser.add_argument("--fields", type=int, default=300, help="Fields on the full-sphere lattice (default 300).")
+    parser.add_argument("--stars", type=int, default=300, help="Mean stars per field (default 300).")
+    parser.add_argument("--star-spread", type=float, default=0.5, help="Relative spread of per-field star counts.")
+    parser.add_argument("--mag-dist", choices=MAG_DISTRIBUTIONS, default="powerlaw", help="Magnitude distribution.")
+    parser.add_argument("--mag-limit", type=float, default=13.3, help="Faint magnitude limit (default 13.3).")
+    parser.add_argument("--mag-range", type=float, default=7.0, help="Magnitudes above the limit covered (default 7).")
+    parser.add_argument("--slope", type=float, default=0.35, help="Power-law slope in dex/mag (default 0.35).")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default 1).")
+
+
+def catalog_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    """`make_fields` keyword arguments from options registered by `add_arguments`."""
+    return {
+        'nfields': args.fields,
+        'stars_per_field': args.stars,
+        'star_spread': args.star_spread,
+        'mag_distribution': args.mag_dist,
+        'mag_limit': args.mag_limit,
+        'mag_range': args.mag_range,
+        'slope': args.slope,
+        'seed': args.seed,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic fields JSON for scheduler benchmarks.")
+    parser.add_argument("out", help="Output JSON path.")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    counts = write_fields(args.out, **catalog_kwargs(args))
+    print(f"Wrote {counts['nfields']} fields / {counts['nstars']} stars to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
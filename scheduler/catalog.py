@@ -0,0 +1,316 @@
+"""Struct-of-arrays field catalog for the vectorized scheduler.
+
+`sky.load_fields` hands the scheduler a `Dict[int, dict]` of per-field star
+tables. That shape is convenient for inspecting one field, but scoring a whole
+sky through it means a Python-level loop over fields every block. This module
+packs the same table into flat, concatenated star columns plus per-field
+offsets so the per-block work in `scoring.ScoringEngine` runs as a handful of
+NumPy passes whose cost scales with the total star count.
+
+The catalog is the single owner of star data: `sky.load_fields` rebinds each
+field's star arrays to read-only views into the flat columns (`bind`), so the
+base catalog is never copied. Per-block corrected magnitudes and SNRs live in
+the scoring engine's reusable scratch buffers instead.
+
+Field order is the iteration order of `sky.fields`, which is also the order
+`Observatory.get_field_altaz` uses for its coordinate arrays; `field_keys`
+maps a catalog position back to its `sky.fields` key.
+"""
+
+from __future__ import annotations
+
+import mmap
+import zipfile
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional
+
+import numpy as np
+
+from . import constants
+
+# Prefix of the star-column members in a saved catalog (`FieldCatalog.to_arrays`).
+_STAR_MEMBER_PREFIX = "star."
+
+# Per-star float columns packed into the catalog (the GID column is optional).
+STAR_COLUMNS = (
+    constants.GaiaDR3Keys.LON,
+    constants.GaiaDR3Keys.LAT,
+    constants.GaiaDR3Keys.MAG,
+    constants.FieldDataKeys.ANGSIZE,
+)
+OPTIONAL_STAR_COLUMNS = (constants.GaiaDR3Keys.GID,)
+
+
+class FieldCatalog:
+    """Flat per-star columns plus per-field offsets for a `sky.fields` table.
+
+    Stars of catalog position `i` occupy `offsets[i]:offsets[i + 1]` in every
+    column of `columns`.
+    """
+
+    def __init__(
+        self,
+        field_keys: List[Any],
+        offsets: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        elon: np.ndarray,
+        elat: np.ndarray,
+        source: Optional[Mapping[Any, Any]] = None,
+    ):
+        self.field_keys = list(field_keys)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.columns = dict(columns)
+        self.elon = np.asarray(elon, dtype=float)
+        self.elat = np.asarray(elat, dtype=float)
+        self._source = source
+
+        if self.offsets.shape != (len(self.field_keys) + 1,):
+            raise ValueError(
+                f"offsets must have length nfields + 1 = {len(self.field_keys) + 1}, "
+                f"got shape {self.offsets.shape}."
+            )
+        for key, column in self.columns.items():
+            if len(column) != self.nstars:
+                raise ValueError(f"Star column {key!r} has {len(column)} rows, expected {self.nstars}.")
+
+        self.counts = np.diff(self.offsets)
+        self._star_field: Optional[np.ndarray] = None
+        self._positions = {key: i for i, key in enumerate(self.field_keys)}
+        self._star_radius: Optional[np.ndarray] = None
+        self._zones: Dict[float, np.ndarray] = {}
+        self._spatial_index = None
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[Any, Mapping[Any, Any]]) -> "FieldCatalog":
+        """Pack a `sky.fields`-shaped table into a `FieldCatalog`."""
+        field_keys = list(fields)
+        counts = np.array([len(fields[key][constants.GaiaDR3Keys.MAG]) for key in field_keys], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        column_keys = list(STAR_COLUMNS)
+        column_keys += [
+            key for key in OPTIONAL_STAR_COLUMNS
+            if field_keys and all(key in fields[field_key] for field_key in field_keys)
+        ]
+
+        columns: Dict[str, np.ndarray] = {}
+        for key in column_keys:
+            dtype = float if key in STAR_COLUMNS else None
+            parts = [np.asarray(fields[field_key][key], dtype=dtype) for field_key in field_keys]
+            columns[key] = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        elon = np.array([fields[key][constants.FieldDataKeys.ELON_REG] for key in field_keys], dtype=float)
+        elat = np.array([fields[key][constants.FieldDataKeys.ELAT_REG] for key in field_keys], dtype=float)
+        return cls(field_keys, offsets, columns, elon, elat, source=fields)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Return the catalog as named arrays, e.g. for `np.savez` (see `from_arrays`)."""
+        arrays = {
+            'field_keys': np.asarray(self.field_keys, dtype=np.int64),
+            'offsets': self.offsets,
+            'elon': self.elon,
+            'elat': self.elat,
+        }
+        for key, column in self.columns.items():
+            arrays[_STAR_MEMBER_PREFIX + key] = column
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "FieldCatalog":
+        """Rebuild a catalog from `to_arrays` output; star columns are used as-is (e.g. memmaps)."""
+        columns = {
+            name[len(_STAR_MEMBER_PREFIX):]: arrays[name]
+            for name in arrays if name.startswith(_STAR_MEMBER_PREFIX)
+        }
+        field_keys = [int(key) for key in np.asarray(arrays['field_keys'])]
+        return cls(field_keys, np.asarray(arrays['offsets']), columns, np.asarray(arrays['elon']), np.asarray(arrays['elat']))
+
+    @property
+    def nfields(self) -> int:
+        return len(self.field_keys)
+
+    @property
+    def nstars(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def star_field(self) -> np.ndarray:
+        """Catalog position of every star, computed on first use."""
+        if self._star_field is None:
+            self._star_field = np.repeat(np.arange(self.nfields), self.counts)
+        return self._star_field
+
+    @property
+    def star_radius(self) -> np.ndarray:
+        """Per-star distance (deg) from its field centroid, computed on first use.
+
+        Same arithmetic as the distortion step of `Observatory.correct_field`:
+        the longitude offset is scaled by the cosine of the centroid latitude.
+        None of it depends on time, so it is evaluated once per catalog.
+        """
+        if self._star_radius is None:
+            self._star_radius = self._radius(slice(None), self.star_field)
+            self._star_radius.setflags(write=False)
+        return self._star_radius
+
+    def _radius(self, stars, star_field: np.ndarray) -> np.ndarray:
+        lat_offset = self.columns[constants.GaiaDR3Keys.LAT][stars] - self.elat[star_field]
+        lon_offset = self.columns[constants.GaiaDR3Keys.LON][stars] - self.elon[star_field]
+        lon_offset *= np.cos(np.radians(self.elat))[star_field]
+        return np.sqrt(lat_offset ** 2 + lon_offset ** 2)
+
+    def radial_zones(self, max_radius: float) -> np.ndarray:
+        """Per-star distortion zone (0-9) for a camera of diagonal half-FoV `max_radius` (deg).
+
+        Zone `k` holds stars beyond `k` of the first nine of ten evenly spaced
+        radii out to `max_radius`; cached per `max_radius`.
+        """
+        key = float(max_radius)
+        if key not in self._zones:
+            zones = self._zones_of_radius(self.star_radius, key)
+            zones.setflags(write=False)
+            self._zones[key] = zones
+        return self._zones[key]
+
+    def radial_zones_of(self, star_index: np.ndarray, star_field: np.ndarray, max_radius: float) -> np.ndarray:
+        """`radial_zones` of the stars at `star_index` (of fields `star_field`), without the per-catalog cache.
+
+        Chunked scoring uses it so that no per-star array spans the whole catalog.
+        """
+        return self._zones_of_radius(self._radius(star_index, star_field), float(max_radius))
+
+    @staticmethod
+    def _zones_of_radius(radius: np.ndarray, max_radius: float) -> np.ndarray:
+        radii = np.linspace(0, max_radius, 11)[1:-1]
+        return np.searchsorted(radii, radius, side='left').astype(np.int8)
+
+    def release_pages(self) -> None:
+        """Drop the resident pages of memory-mapped star columns (re-read from the file on access).
+
+        A no-op for in-memory columns or where ``madvise`` is unavailable.
+        """
+        for column in self.columns.values():
+            mapping = getattr(column, '_mmap', None)
+            if mapping is not None and hasattr(mapping, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+                mapping.madvise(mmap.MADV_DONTNEED)
+
+    @property
+    def memory_mapped(self) -> bool:
+        """True if the star columns are memory-mapped (e.g. a compiled catalog)."""
+        return bool(self.columns) and all(isinstance(column, np.memmap) for column in self.columns.values())
+
+    def spatial_index(self):
+        """The `spatial.FieldIndex` of the field centroids, built on first use."""
+        if self._spatial_index is None:
+            from .spatial import FieldIndex
+
+            self._spatial_index = FieldIndex(self.elon, self.elat)
+        return self._spatial_index
+
+    def freeze(self) -> "FieldCatalog":
+        """Mark every star column read-only so the base catalog cannot be mutated in place.
+
+        Call before `bind`: views taken earlier keep their own write flag.
+        """
+        for column in self.columns.values():
+            column.setflags(write=False)
+        return self
+
+    def field_columns(self, position: int) -> Dict[str, np.ndarray]:
+        """Return views (not copies) of the star columns for the field at `position`."""
+        stars = self.field_slice(position)
+        return {key: column[stars] for key, column in self.columns.items()}
+
+    def bind(self, fields: MutableMapping[Any, MutableMapping[Any, Any]]) -> None:
+        """Point the star arrays of `fields` at views into this catalog's columns.
+
+        `fields` must be the table this catalog was packed from. Afterwards the
+        per-field dicts share memory with the catalog instead of holding their
+        own copies, and `describes(fields)` holds.
+        """
+        if list(fields) != self.field_keys:
+            raise ValueError("Cannot bind a catalog to a field table with different keys.")
+        for position, field_key in enumerate(self.field_keys):
+            fields[field_key].update(self.field_columns(position))
+        self._source = fields
+
+    def describes(self, fields: Mapping[Any, Any]) -> bool:
+        """Return True if this catalog was packed from `fields` (same object and size)."""
+        return self._source is fields and len(fields) == self.nfields
+
+    def position(self, field_key: Any) -> int:
+        """Return the catalog position of a `sky.fields` key."""
+        return self._positions[field_key]
+
+    def field_slice(self, position: int) -> slice:
+        """Return the star slice of the field at catalog `position`."""
+        return slice(int(self.offsets[position]), int(self.offsets[position + 1]))
+
+    def star_indices(self, positions: np.ndarray) -> np.ndarray:
+        """Return the indices of every star belonging to the fields at `positions`.
+
+        Stars come out grouped by field, in the order of `positions`.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        counts = self.counts[positions]
+        if counts.sum() == 0:
+            return np.empty(0, dtype=np.int64)
+        starts = np.repeat(self.offsets[positions], counts)
+        within = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        return starts + within
+
+
+def segment_sums(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Sum a per-star array over the segments delimited by `offsets`.
+
+    Boolean input yields exact integer counts; unlike `np.add.reduceat`, empty
+    segments sum to zero.
+    """
+    values = np.asarray(values)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if values.dtype == bool:
+        cumulative = np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(values, dtype=np.int64)])
+        return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+    counts = np.diff(offsets)
+    segments = np.repeat(np.arange(len(counts)), counts)
+    return np.bincount(segments, weights=values, minlength=len(counts))
+
+
+def load_npz(path: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Load every member of an uncompressed ``.npz`` (as written by `np.savez`).
+
+    With `mmap=True` each array is a read-only `np.memmap` onto its bytes inside
+    the zip, so opening a large catalog costs no reads beyond the headers.
+    Compressed members (`np.savez_compressed`) are read into memory instead.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as raw:
+        for info in zf.infolist():
+            name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # Local file header: 30 fixed bytes, then file name and extra field.
+            raw.seek(info.header_offset)
+            header = raw.read(30)
+            name_len = int.from_bytes(header[26:28], "little")
+            extra_len = int.from_bytes(header[28:30], "little")
+            raw.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(raw)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(raw)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(raw)
+            if dtype.hasobject:
+                raise ValueError(f"Refusing to load object array {name!r} from {path}.")
+
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode='r', offset=raw.tell(), shape=shape,
+                    order='F' if fortran_order else 'C',
+                )
+    return arrays
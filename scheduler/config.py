@@ -30,6 +30,13 @@ class SchedulerConfig:
         fps: int = 40,
         sensitivity_model_loc: str | None = None,
         radius_extinctions=_DEFAULT_RADIUS_EXTINCTIONS,
+        ephemeris_path: str | None = None,
+        coordinate_backend: str = "astropy",
+        score_backend: str = "count",
+        score_cache_size: int = 0,
+        score_cache_airmass_step: float = 0.0,
+        score_cache_path: str = "",
+        scoring_memory_mb: float = 0.0,
     ):
         # Observatory parameters (Elginfield)
         self.latitude = 43.192954   # degrees
@@ -57,3 +64,29 @@ class SchedulerConfig:
                 os.path.dirname(os.path.abspath(__file__)), "sensitivity_models"
             )
         self.sensitivity_model_loc = str(sensitivity_model_loc)
+
+        # Sun/Moon ephemeris table (see ephemeris.py), opt-in: "" (the
+        # default) computes the Sun and Moon with astropy. A table is used for
+        # the times it covers when it matches the site.
+        self.ephemeris_path = str(ephemeris_path or "")
+
+        # Field alt/az and hour-angle backend: "astropy" (frame transforms, the
+        # reference) or "fast" (closed form, see horizon.py).
+        self.coordinate_backend = str(coordinate_backend)
+
+        # Field score: "count" (stars above the SNR threshold x velocity factor,
+        # the reference) or "event_rate" (per-star occultation rates, see event_rate.py).
+        self.score_backend = str(score_backend)
+
+        # Per-field count cache (see score_cache.py): maximum entries (0 disables
+        # it), airmass quantization step (0 keys on the exact airmass) and an
+        # optional .npz the entries persist to between runs.
+        self.score_cache_size = int(score_cache_size)
+        self.score_cache_airmass_step = float(score_cache_airmass_step)
+        self.score_cache_path = str(score_cache_path)
+
+        # Ceiling (MB) on the per-block scoring working set (see scoring.py):
+        # blocks with more visible stars are scored in chunks that fit it, with
+        # a memory-mapped catalog's pages released after each chunk. 0 scores
+        # every block in one pass.
+        self.scoring_memory_mb = float(scoring_memory_mb)
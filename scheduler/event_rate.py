@@ -0,0 +1,91 @@
+"""Per-star occultation event-rate score (``SchedulerConfig(score_backend="event_rate")``).
+
+The default ``"count"`` score (`Observatory._consolidated_scheduling_score`)
+approximates a field's yield as N★ × v(e) × min(1, (v0 / v)²): every star
+above the SNR threshold counts the same, whatever its brightness or angular
+size. This backend instead sums, over every star of a field, the rate at
+which a star sweeps up detectable occultations by objects at
+`KBO_DISTANCE_AU`:
+
+    rate = v × W × ε
+
+- ``v`` is the field's transverse velocity (`helpers.get_transverse_velocities`,
+  at the effective elongation the count score uses);
+- ``W = 2 √(3 F² + R★²)`` is the width of the diffraction shadow, with ``F``
+  the Fresnel scale and ``R★`` the star's radius projected to the object's
+  distance (from `FieldDataKeys.ANGSIZE`, the angular diameter in degrees);
+- ``ε`` is the detection efficiency Φ(SNR_event - threshold). The event
+  SNR is the star's per-frame SNR (from the noise model at the framerate's
+  cadence) times the fractional dip depth ``√3 F / √(3 F² + R★²)``. Over
+  the ``n = (W / v) × framerate`` frames the event spans, it grows as √n,
+  or is diluted by ``n`` when the event is shorter than a frame.
+
+Scores are relative rates (km²/s of sky swept, summed over stars). They rank
+fields against each other but are not comparable to the count score. Each
+term is one NumPy pass over the stars of every visible field.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from . import constants
+from .catalog import segment_sums
+from .helpers import get_transverse_velocities, normal_cdf
+
+BACKENDS = ("count", "event_rate")
+
+# Distance (AU) of the occulting population, as in the count score's velocity.
+KBO_DISTANCE_AU = 40.0
+
+# Effective wavelength (m) of the unfiltered CMOS band.
+WAVELENGTH_M = 500e-9
+
+
+def fresnel_scale_km(distance_au: float = KBO_DISTANCE_AU, wavelength_m: float = WAVELENGTH_M) -> float:
+    """Fresnel scale sqrt(lambda D / 2) in km at `distance_au`."""
+    return math.sqrt(wavelength_m * distance_au * constants.AU / 2.0) / 1000.0
+
+
+def star_rates(
+    angular_size_deg: np.ndarray,
+    snr: np.ndarray,
+    velocity_kms: np.ndarray,
+    framerate: float,
+    detection_threshold: float,
+) -> np.ndarray:
+    """Detectable-occultation rate (km²/s) of each star; see the module docstring.
+
+    `velocity_kms` is the per-star transverse velocity (km/s); stars with a
+    non-positive velocity get rate 0.
+    """
+    fresnel = fresnel_scale_km()
+    distance_km = KBO_DISTANCE_AU * constants.AU / 1000.0
+    diffraction = 3.0 * fresnel ** 2
+    stellar_radius = 0.5 * np.radians(angular_size_deg) * distance_km
+
+    half_width = np.sqrt(diffraction + stellar_radius ** 2)
+    moving = velocity_kms > 0.0
+    velocity = np.where(moving, velocity_kms, 1.0)
+    frames = (2.0 * half_width / velocity) * float(framerate)
+
+    event_snr = snr * (math.sqrt(diffraction) / half_width)
+    event_snr *= np.where(frames < 1.0, frames, np.sqrt(frames))
+    efficiency = normal_cdf(event_snr - detection_threshold)
+    return np.where(moving, velocity * 2.0 * half_width * efficiency, 0.0)
+
+
+def field_scores(observatory, catalog, block, framerate: float) -> np.ndarray:
+    """Summed star rates of every field of a scored `ScoringEngine` block (needs its per-star arrays)."""
+    opposition_distance = np.abs(np.asarray(block.solar_elongation, dtype=float) - 180.0)
+    velocity_kms = np.abs(get_transverse_velocities(KBO_DISTANCE_AU, 180.0 - opposition_distance)) / 1000.0
+    rates = star_rates(
+        catalog.columns[constants.FieldDataKeys.ANGSIZE][block.star_index],
+        block.snr,
+        velocity_kms[block.star_field],
+        framerate,
+        float(observatory.config.snr_threshold),
+    )
+    return segment_sums(rates, block.offsets)
@@ -1,6 +1,9 @@
 """Scheduling helpers vendored from Colibri_Simulations/src/support/helpers.py.
 
-Only `get_transverse_velocity` is needed by the standalone scheduler.
+Only `get_transverse_velocity` is needed by the standalone scheduler;
+`get_transverse_velocities` is its array counterpart for the vectorized
+scoring engine. `normal_cdf` serves the probabilistic scores (robustness,
+event rates) without a SciPy dependency.
 """
 
 import math
@@ -19,3 +22,26 @@ def get_transverse_velocity(dist, elongation_deg):
                                    math.cos(elongation))  # m/s, found in richards paper Eq11
 
     return relative_velocity  # m/s
+
+
+def get_transverse_velocities(dist, elongation_deg):
+    '''Array version of `get_transverse_velocity`: elementwise over `elongation_deg`.'''
+
+    elongation = np.radians(np.asarray(elongation_deg, dtype=float))
+    v_earth = 29747  # m/s
+    dist_ratio = 1. / dist
+
+    relative_velocity = v_earth * (np.sqrt(dist_ratio*(1-((dist_ratio**2)*(np.sin(elongation)**2)))) +
+                                   np.cos(elongation))  # m/s, found in richards paper Eq11
+
+    return relative_velocity  # m/s
+
+
+def normal_cdf(z):
+    '''Standard normal CDF, elementwise, to ~1e-7 (Abramowitz & Stegun 7.1.26).'''
+
+    x = np.abs(z) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    tail = 0.5 * poly * np.exp(-x * x)
+    return np.where(np.asarray(z) >= 0, 1.0 - tail, tail)
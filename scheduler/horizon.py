@@ -0,0 +1,247 @@
+"""Closed-form horizon coordinates: a fast backend for field alt/az and hour angles.
+
+`VisibilityGrid.compute` and `Observatory._field_hour_angle` go through full
+astropy frame transforms (precession/nutation, aberration, IERS lookups) for
+every time. At scheduling precision none of that needs to be redone per time:
+a field's apparent place moves by well under an arcsecond over a night.
+`HorizonModel` therefore transforms the field centres once per night to CIRS
+(the apparent equatorial frame astropy itself goes through on the way to
+AltAz) and once per catalog to FK5 J2000, and then evaluates, for any number
+of times, in plain NumPy:
+
+- the hour angle from the Earth rotation angle (a linear function of UT1,
+  taken as UTC here) and the CIRS right ascension;
+- altitude and azimuth from the spherical-astronomy identities for hour
+  angle, declination and site latitude;
+- the legacy `Observatory._field_hour_angle` value (mean local sidereal time
+  minus the FK5 J2000 right ascension), with the IAU 2006 GMST polynomial;
+- the Moon's topocentric alt/az from the Astronomical Almanac's low-precision
+  lunar theory and the same sidereal time, within `MAX_MOON_ERROR_DEG`
+  (measured < 0.4 deg over 2025-2029), far inside the 15 deg Moon exclusion.
+
+Alt/az are geometric (no refraction), as in the astropy path. Against astropy
+the differences are a few arcseconds (UT1 - UTC < 0.9 s, diurnal aberration,
+polar motion, the apparent place held for the night), far below the stated
+`MAX_ERROR_DEG`; `compare_to_astropy` measures them for a catalog and times.
+Select the backend with ``SchedulerConfig(coordinate_backend="fast")``; astropy
+stays the default and the reference.
+"""
+
+from __future__ import annotations
+
+import math
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import CIRS, FK5, AltAz, SkyCoord, get_body
+from astropy.time import Time
+
+from .catalog import FieldCatalog
+
+BACKENDS = ("astropy", "fast")
+
+# Stated bound on |fast - astropy| for altitude, azimuth (on the sky) and hour angle.
+MAX_ERROR_DEG = 0.05
+
+_J2000_JD = 2451545.0
+
+# Nights of apparent places kept per model.
+_MAX_CACHED_NIGHTS = 8
+
+# Stated bound on |fast - astropy| for the Moon's altitude and on-sky azimuth;
+# the scheduler's Moon exclusion radius is 15 deg.
+MAX_MOON_ERROR_DEG = 0.5
+
+# Mean obliquity of the ecliptic (deg) used with the low-precision Moon.
+_OBLIQUITY_DEG = 23.4393
+
+# Low-precision lunar theory (Astronomical Almanac): (amplitude deg, phase deg,
+# rate deg per Julian century) of the periodic terms.
+_MOON_LONGITUDE_TERMS = (
+    (6.29, 135.0, 477198.87), (-1.27, 259.3, -413335.36), (0.66, 235.7, 890534.22),
+    (0.21, 269.9, 954397.74), (-0.19, 357.5, 35999.05), (-0.11, 186.5, 966404.03),
+)
+_MOON_LATITUDE_TERMS = (
+    (5.13, 93.3, 483202.02), (0.28, 228.2, 960400.89), (-0.28, 318.3, 6003.15), (-0.17, 217.6, -407332.21),
+)
+_MOON_PARALLAX_TERMS = (
+    (0.0518, 135.0, 477198.87), (0.0095, 259.3, -413335.36), (0.0078, 235.7, 890534.22), (0.0028, 269.9, 954397.74),
+)
+
+
+def earth_rotation_angle(jd_ut1: np.ndarray) -> np.ndarray:
+    """Earth rotation angle (deg, in [0, 360)) at UT1 Julian dates (IERS 2010)."""
+    days = np.asarray(jd_ut1, dtype=float) - _J2000_JD
+    # Split off whole days first so the fractional rotation keeps its precision.
+    turns = 0.7790572732640 + 0.00273781191135448 * days + np.mod(days, 1.0)
+    return 360.0 * np.mod(turns, 1.0)
+
+
+def mean_sidereal_time(jd_ut1: np.ndarray, lon_deg: float) -> np.ndarray:
+    """Local mean sidereal time (hours, in [0, 24)) at UT1 Julian dates (IAU 2006 GMST)."""
+    centuries = (np.asarray(jd_ut1, dtype=float) - _J2000_JD) / 36525.0
+    arcsec = 0.014506 + (4612.156534 + (1.3915817 + (-0.00000044 - 0.000029956 * centuries) * centuries) * centuries) * centuries
+    gmst = earth_rotation_angle(jd_ut1) + arcsec / 3600.0
+    return np.mod((gmst + lon_deg) / 15.0, 24.0)
+
+
+def moon_ecliptic(jd: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Geocentric ecliptic (lon, lat) of date and horizontal parallax of the Moon, in deg.
+
+    The Astronomical Almanac's low-precision formulae: about 0.3 deg in
+    longitude, 0.2 deg in latitude and 0.003 deg in parallax.
+    """
+    centuries = (np.asarray(jd, dtype=float) - _J2000_JD) / 36525.0
+
+    def terms(coefficients, trig):
+        return sum(amplitude * trig(np.radians(phase + rate * centuries)) for amplitude, phase, rate in coefficients)
+
+    lon = 218.32 + 481267.881 * centuries + terms(_MOON_LONGITUDE_TERMS, np.sin)
+    lat = terms(_MOON_LATITUDE_TERMS, np.sin)
+    parallax = 0.9508 + terms(_MOON_PARALLAX_TERMS, np.cos)
+    return np.mod(lon, 360.0), lat, parallax
+
+
+def _utc_jd(times: Time) -> np.ndarray:
+    utc = times if times.scale == 'utc' else times.utc
+    return np.atleast_1d(utc.jd1 + utc.jd2)
+
+
+class HorizonModel:
+    """Closed-form alt/az and hour angles of a catalog's field centres at one site."""
+
+    def __init__(self, location):
+        self.location = location
+        self.lat_deg = float(location.lat.to_value(u.deg))
+        self.lon_deg = float(location.lon.to_value(u.deg))
+        self._fk5_ra_hours: Dict[int, Tuple[FieldCatalog, np.ndarray]] = {}
+        self._nights: Dict[Tuple[int, int], SimpleNamespace] = {}
+
+    def _night(self, jd: float) -> int:
+        # Nights run from local noon to local noon (longitude east-positive).
+        return int(math.floor(jd + self.lon_deg / 360.0))
+
+    def places(self, catalog: FieldCatalog, jd: float) -> SimpleNamespace:
+        """CIRS `ra`/`dec` (deg) of the field centres, computed once per night at local midnight."""
+        night = self._night(jd)
+        key = (id(catalog), night)
+        place = self._nights.get(key)
+        if place is None or place.catalog is not catalog:
+            if len(self._nights) >= _MAX_CACHED_NIGHTS:
+                self._nights.clear()
+            epoch = Time(night + 0.5 - self.lon_deg / 360.0, format='jd', scale='utc')
+            coords = SkyCoord(catalog.elon, catalog.elat, frame='geocentrictrueecliptic', unit=(u.deg, u.deg))
+            cirs = coords.transform_to(CIRS(obstime=epoch))
+            ra, dec = cirs.ra.radian, cirs.dec.radian
+            place = SimpleNamespace(
+                catalog=catalog, ra=np.degrees(ra), dec=np.degrees(dec),
+                sin_ra=np.sin(ra), cos_ra=np.cos(ra), sin_dec=np.sin(dec), cos_dec=np.cos(dec),
+            )
+            self._nights[key] = place
+        return place
+
+    def fk5_ra_hours(self, catalog: FieldCatalog) -> np.ndarray:
+        """FK5 J2000 right ascension (hours) of the field centres, computed once per catalog."""
+        cached = self._fk5_ra_hours.get(id(catalog))
+        if cached is None or cached[0] is not catalog:
+            coords = SkyCoord(catalog.elon, catalog.elat, frame='geocentrictrueecliptic', unit=(u.deg, u.deg))
+            cached = (catalog, coords.transform_to(FK5).ra.deg / 15.0)
+            self._fk5_ra_hours[id(catalog)] = cached
+        return cached[1]
+
+    def altaz(self, catalog: FieldCatalog, times: Time, positions=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(alt, az) in degrees of every field at every time, each of shape (ntimes, nfields).
+
+        With `positions`, only those fields (columns in that order).
+        """
+        jd = _utc_jd(times)
+        place = self.places(catalog, float(jd[len(jd) // 2]))
+        if positions is not None:
+            place = SimpleNamespace(**{
+                name: value[positions] if isinstance(value, np.ndarray) else value for name, value in vars(place).items()
+            })
+        # The hour angle enters only through its sine and cosine, expanded by the
+        # angle-addition identities, so the only (time, field) trigonometry is
+        # arcsin/arctan2. Azimuth is measured east of north.
+        local_era = np.radians(earth_rotation_angle(jd) + self.lon_deg)[:, np.newaxis]
+        sin_era, cos_era = np.sin(local_era), np.cos(local_era)
+        cos_ha = cos_era * place.cos_ra + sin_era * place.sin_ra
+        sin_ha = sin_era * place.cos_ra - cos_era * place.sin_ra
+        sin_lat, cos_lat = math.sin(math.radians(self.lat_deg)), math.cos(math.radians(self.lat_deg))
+
+        cos_dec_cos_ha = place.cos_dec * cos_ha
+        sin_alt = place.sin_dec * sin_lat + cos_dec_cos_ha * cos_lat
+        alt = np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+        az = np.degrees(np.arctan2(-place.cos_dec * sin_ha, place.sin_dec * cos_lat - cos_dec_cos_ha * sin_lat))
+        return alt, np.mod(az, 360.0)
+
+    def moon_altaz(self, times: Time) -> Tuple[np.ndarray, np.ndarray]:
+        """Topocentric (alt, az) in degrees of the Moon at `times`, each of shape (ntimes,).
+
+        Low-precision lunar theory (see `moon_ecliptic`), with the parallax
+        from the site taken off the geocentric position.
+        """
+        jd = _utc_jd(times)
+        lon, lat, parallax = moon_ecliptic(jd)
+        lon, lat = np.radians(lon), np.radians(lat)
+        obliquity = math.radians(_OBLIQUITY_DEG)
+        # Geocentric unit vector, equatorial of date, scaled to Earth radii.
+        distance = 1.0 / np.sin(np.radians(parallax))
+        x = distance * np.cos(lat) * np.cos(lon)
+        y = distance * (math.cos(obliquity) * np.cos(lat) * np.sin(lon) - math.sin(obliquity) * np.sin(lat))
+        z = distance * (math.sin(obliquity) * np.cos(lat) * np.sin(lon) + math.cos(obliquity) * np.sin(lat))
+
+        lst = np.radians(mean_sidereal_time(jd, self.lon_deg) * 15.0)
+        site_lat = math.radians(self.lat_deg)
+        x = x - math.cos(site_lat) * np.cos(lst)
+        y = y - math.cos(site_lat) * np.sin(lst)
+        z = z - math.sin(site_lat)
+
+        ra = np.arctan2(y, x)
+        dec = np.arctan2(z, np.hypot(x, y))
+        hour_angle = lst - ra
+        sin_alt = np.sin(dec) * math.sin(site_lat) + np.cos(dec) * np.cos(hour_angle) * math.cos(site_lat)
+        alt = np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+        az = np.degrees(np.arctan2(
+            -np.cos(dec) * np.sin(hour_angle),
+            np.sin(dec) * math.cos(site_lat) - np.cos(dec) * np.cos(hour_angle) * math.sin(site_lat),
+        ))
+        return alt, np.mod(az, 360.0)
+
+    def hour_angle(self, catalog: FieldCatalog, times: Time, positions=None) -> np.ndarray:
+        """`Observatory._field_hour_angle` values (hours, unrounded), shape (ntimes, nfields).
+
+        With `positions`, only those fields (columns in that order).
+        """
+        lst_hours = mean_sidereal_time(_utc_jd(times), self.lon_deg)
+        ra_hours = self.fk5_ra_hours(catalog)
+        if positions is not None:
+            ra_hours = ra_hours[positions]
+        return lst_hours[:, np.newaxis] - ra_hours[np.newaxis, :]
+
+    def compare_to_astropy(self, catalog: FieldCatalog, times: Time) -> Dict[str, float]:
+        """Max |fast - astropy| (deg) of altitude, on-sky azimuth and hour angle over `times`."""
+        times = times.reshape(-1)
+        alt, az = self.altaz(catalog, times)
+        coords = SkyCoord(catalog.elon, catalog.elat, frame='geocentrictrueecliptic', unit=(u.deg, u.deg))
+        reference = coords[np.newaxis, :].transform_to(AltAz(obstime=times[:, np.newaxis], location=self.location))
+        ref_alt, ref_az = reference.alt.to_value(u.deg), reference.az.to_value(u.deg)
+
+        lst_hours = times.sidereal_time('mean', self.location.lon).value
+        ref_hour_angle = lst_hours[:, np.newaxis] - coords.transform_to(FK5).ra.deg[np.newaxis, :] / 15.0
+        hour_angle_error = np.mod(self.hour_angle(catalog, times) - ref_hour_angle + 12.0, 24.0) - 12.0
+
+        az_error = (np.mod(az - ref_az + 180.0, 360.0) - 180.0) * np.cos(np.radians(ref_alt))
+
+        moon_alt, moon_az = self.moon_altaz(times)
+        ref_moon = get_body('moon', times, location=self.location).transform_to(AltAz(obstime=times, location=self.location))
+        moon_az_error = (np.mod(moon_az - ref_moon.az.deg + 180.0, 360.0) - 180.0) * np.cos(ref_moon.alt.rad)
+        return {
+            'alt': float(np.max(np.abs(alt - ref_alt))),
+            'az': float(np.max(np.abs(az_error))),
+            'hour_angle': float(np.max(np.abs(hour_angle_error)) * 15.0),
+            'moon_alt': float(np.max(np.abs(moon_alt - ref_moon.alt.deg))),
+            'moon_az': float(np.max(np.abs(moon_az_error))),
+        }
@@ -4,18 +4,32 @@ Derived from Colibri_Simulations/src/sso_detection/noiseModel.py. This version
 loads ONLY the temporal-SNR HDF5 model (the only model shipped with the
 scheduler) and drops the skew/kurtosis/power-law loaders and the
 matplotlib-backed light-curve generator.
+
+Reading the HDF5 model needs h5py and a walk over every group, so the parsed
+model is cached in ``temporal_snr_models.cache.npz`` next to the ``.h5`` file.
+The cache records the HDF5 file's size, mtime and SHA-256; it is used when
+size and mtime match (or, failing that, the hash does) and is rebuilt
+automatically otherwise. h5py is imported only to rebuild it.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import warnings
 from typing import Any, Dict, Tuple
 
-import h5py
 import numpy as np
 
 __all__ = ["ColibriNoiseModel"]
 
+# Per-airmass parameters of the piecewise temporal-SNR model.
+_PARAM_NAMES = ('snr_flat', 'break_mag', 'slope', 'std_fraction', 'abs_std')
+
+# Layout version of the derived `.cache.npz` model cache.
+_CACHE_FORMAT_VERSION = 1
+
 
 def _cadence_key(cadence_ms: float) -> str:
     """Convert cadence in ms to the model key format (e.g. '25ms')."""
@@ -48,6 +62,98 @@ def _nearest_log_airmass(available_airmasses: list[float], target_airmass: float
     return available_airmasses[int(np.argmin(distances))]
 
 
+def _cache_path(input_file: str) -> str:
+    """Return the derived cache path for an HDF5 model file."""
+    return os.path.splitext(input_file)[0] + ".cache.npz"
+
+
+def _file_stamp(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {'size': int(stat.st_size), 'mtime_ns': int(stat.st_mtime_ns)}
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _from_cached(value: np.ndarray) -> Any:
+    """Undo `np.asarray` on a cached attribute (0-d arrays back to scalars, str back to str)."""
+    if value.ndim == 0:
+        value = value[()]
+        return str(value) if isinstance(value, np.str_) else value
+    return value
+
+
+def _write_model_cache(
+    cache_file: str, models_dict: Dict[str, Any], metadata_dict: Dict[str, Any], stamp: Dict[str, Any]
+) -> None:
+    """Write the parsed model as an `.npz` (no pickles); dict order is preserved via index lists."""
+    arrays: Dict[str, np.ndarray] = {}
+    metadata_keys = [key for key in metadata_dict if key != 'gmag_thresholds']
+    for key in metadata_keys:
+        arrays[f"metadata/{key}"] = np.asarray(metadata_dict[key])
+    thresholds = metadata_dict.get('gmag_thresholds', {})
+    for cadence, value in thresholds.items():
+        arrays[f"gmag_thresholds/{cadence}"] = np.asarray(value)
+    for cadence, models in models_dict.items():
+        arrays[f"models/{cadence}/airmass"] = np.asarray(list(models.keys()))
+        for name in _PARAM_NAMES:
+            arrays[f"models/{cadence}/{name}"] = np.asarray([models[am]['parameters'][name] for am in models])
+
+    index = {
+        'format_version': _CACHE_FORMAT_VERSION,
+        'source': stamp,
+        'metadata': metadata_keys,
+        'gmag_thresholds': list(thresholds),
+        'models': list(models_dict),
+    }
+    arrays['index'] = np.asarray(json.dumps(index))
+
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_file, cache_file)
+
+
+def _read_model_cache(
+    cache_file: str, input_file: str, stamp: Dict[str, Any]
+) -> tuple[Dict[str, Any], Dict[str, Any]] | None:
+    """Return (models, metadata) from `cache_file`, or None if it is missing or stale."""
+    try:
+        with np.load(cache_file, allow_pickle=False) as cache:
+            arrays = {name: cache[name] for name in cache.files}
+        index = json.loads(str(arrays['index'][()]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+    if index.get('format_version') != _CACHE_FORMAT_VERSION:
+        return None
+    source = index.get('source', {})
+    if (source.get('size'), source.get('mtime_ns')) != (stamp['size'], stamp['mtime_ns']):
+        if source.get('sha256') != _file_sha256(input_file):
+            return None
+
+    try:
+        metadata_dict: Dict[str, Any] = {key: _from_cached(arrays[f"metadata/{key}"]) for key in index['metadata']}
+        metadata_dict['gmag_thresholds'] = {
+            cadence: _from_cached(arrays[f"gmag_thresholds/{cadence}"]) for cadence in index['gmag_thresholds']
+        }
+        models_dict: Dict[str, Any] = {}
+        for cadence in index['models']:
+            airmasses = arrays[f"models/{cadence}/airmass"]
+            models_dict[cadence] = {
+                airmass: {'parameters': {name: arrays[f"models/{cadence}/{name}"][i] for name in _PARAM_NAMES}}
+                for i, airmass in enumerate(airmasses)
+            }
+    except KeyError:
+        return None
+    return models_dict, metadata_dict
+
+
 class ColibriNoiseModel:
     """Predictor for Colibri temporal-SNR noise properties.
 
@@ -64,7 +170,9 @@ class ColibriNoiseModel:
         self.model_folder = model_folder_path
 
         snr_file = f"{model_folder_path}/temporal_snr_models.h5"
+        self.snr_file = snr_file
         self.snr_models, self.snr_metadata = self._load_temporal_snr_models(snr_file)
+        self._parameter_tables = self._build_parameter_tables()
 
     def predict(
         self,
@@ -96,8 +204,97 @@ class ColibriNoiseModel:
 
         return results
 
+    def predict_many(
+        self,
+        gmag: np.ndarray,
+        airmass: float | np.ndarray,
+        cadence_ms: float,
+        star_field: np.ndarray | None = None,
+        return_uncertainty: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """Predict temporal SNR for many stars at many airmasses in one call.
+
+        Vectorized counterpart of `predict`: model parameters are interpolated
+        for every airmass at once and the piecewise SNR (and std) evaluated for
+        every star, matching `predict` element for element.
+
+        Args:
+            gmag: G magnitudes, one per star.
+            airmass: Airmass per star (broadcast against `gmag`), or per field
+                when `star_field` is given.
+            cadence_ms: Imaging cadence in milliseconds.
+            star_field: Optional index into `airmass` for each star.
+            return_uncertainty: If True, also return the standard deviation.
+
+        Returns:
+            Dictionary with array "temporal_snr" (and "temporal_snr_std" when
+            `return_uncertainty` is True). Stars above the modelled airmass
+            range get SNR=1 (std 0); one RuntimeWarning summarises them.
+        """
+        gmag = np.asarray(gmag, dtype=float)
+        airmass = np.asarray(airmass, dtype=float)
+        params, above_range = self._temporal_snr_parameters(airmass, cadence_ms)
+
+        if star_field is not None:
+            params = {name: values[star_field] for name, values in params.items()}
+            star_above_range = above_range[star_field]
+        else:
+            star_above_range = np.broadcast_to(above_range, np.broadcast(gmag, airmass).shape)
+
+        predicted_snr = np.asarray(self._calculate_piecewise_snr(gmag, params), dtype=float)
+        if return_uncertainty:
+            snr_std = np.asarray(self._calculate_std_values(predicted_snr, params), dtype=float)
+
+        if np.any(above_range):
+            max_modelled = float(self._parameter_tables[_cadence_key(cadence_ms)]['airmass'][-1])
+            warnings.warn(
+                f"{int(np.count_nonzero(above_range))} airmass value(s) exceed the maximum modelled airmass "
+                f"({max_modelled:.2f}; highest {float(np.max(airmass[above_range])):.2f}). Returning SNR=1 "
+                "(100% noise) for them to avoid overestimating sensitivity at high airmass.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            predicted_snr = np.where(star_above_range, 1.0, predicted_snr)
+            if return_uncertainty:
+                snr_std = np.where(star_above_range, 0.0, snr_std)
+
+        results: Dict[str, np.ndarray] = {'temporal_snr': predicted_snr}
+        if return_uncertainty:
+            results['temporal_snr_std'] = snr_std
+        return results
+
     # Internal methods
+    def _build_parameter_tables(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Sort each cadence's airmass grid once and stack its parameters into arrays."""
+        tables: Dict[str, Dict[str, np.ndarray]] = {}
+        for cadence, models in self.snr_models.items():
+            airmasses = sorted(models.keys())
+            table = {'airmass': np.asarray(airmasses, dtype=float), 'log_airmass': np.log(airmasses)}
+            for name in _PARAM_NAMES:
+                table[name] = np.asarray([models[am]['parameters'][name] for am in airmasses], dtype=float)
+            tables[cadence] = table
+        return tables
+
     def _load_temporal_snr_models(self, input_file: str) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Load the model from its `.cache.npz`, rebuilding the cache from `input_file` if stale."""
+        cache_file = _cache_path(input_file)
+        stamp = _file_stamp(input_file)
+
+        cached = _read_model_cache(cache_file, input_file, stamp)
+        if cached is not None:
+            return cached
+
+        models_dict, metadata_dict = self._read_hdf5_models(input_file)
+        stamp['sha256'] = _file_sha256(input_file)
+        try:
+            _write_model_cache(cache_file, models_dict, metadata_dict, stamp)
+        except OSError:
+            pass
+        return models_dict, metadata_dict
+
+    def _read_hdf5_models(self, input_file: str) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        import h5py
+
         models_dict: Dict[str, Any] = {}
         metadata_dict: Dict[str, Any] = {}
 
@@ -152,7 +349,8 @@ class ColibriNoiseModel:
                 f"(available cadences: {sorted(self.snr_models.keys())})."
             )
 
-        available_airmasses = sorted(list(self.snr_models[cadence].keys()))
+        table = self._parameter_tables[cadence]
+        available_airmasses = table['airmass']
 
         if len(available_airmasses) == 1:
             closest_airmass = available_airmasses[0]
@@ -190,21 +388,12 @@ class ColibriNoiseModel:
                 return _maybe_scalar(predicted_snr, scalar_input)
 
         else:
-            # Log-linear interpolation
-            log_airmasses = np.log(available_airmasses)
+            # Log-linear interpolation over the pre-sorted parameter table
             log_target_airmass = np.log(airmass)
 
-            param_names = ['snr_flat', 'break_mag', 'slope', 'std_fraction', 'abs_std']
-            param_values = {name: [] for name in param_names}
-
-            for am in available_airmasses:
-                params = self.snr_models[cadence][am]['parameters']
-                for name in param_names:
-                    param_values[name].append(params[name])
-
             interpolated_params = {}
-            for name in param_names:
-                interpolated_params[name] = np.interp(log_target_airmass, log_airmasses, param_values[name])
+            for name in _PARAM_NAMES:
+                interpolated_params[name] = np.interp(log_target_airmass, table['log_airmass'], table[name])
 
             predicted_snr = self._calculate_piecewise_snr(gmag_arr, interpolated_params)
 
@@ -214,6 +403,44 @@ class ColibriNoiseModel:
             else:
                 return _maybe_scalar(predicted_snr, scalar_input)
 
+    def _temporal_snr_parameters(
+        self,
+        airmass: np.ndarray,
+        cadence_ms: float,
+    ) -> tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Vectorized counterpart of the airmass branches in `_predict_temporal_snr`.
+
+        Returns (params, above_range): per-airmass model parameter arrays and a
+        mask of airmasses above the modelled range, for which
+        `_predict_temporal_snr` returns SNR=1. Values match the scalar path
+        element for element.
+        """
+        cadence = _cadence_key(cadence_ms)
+        airmass = np.asarray(airmass, dtype=float)
+
+        if cadence not in self._parameter_tables:
+            raise ValueError(
+                f"no temporal-SNR model for cadence {int(cadence_ms)} ms "
+                f"(available cadences: {sorted(self.snr_models.keys())})."
+            )
+
+        table = self._parameter_tables[cadence]
+        available_airmasses = table['airmass']
+
+        if len(available_airmasses) == 1:
+            params = {name: np.full(airmass.shape, table[name][0], dtype=float) for name in _PARAM_NAMES}
+            return params, np.zeros(airmass.shape, dtype=bool)
+
+        below_range = airmass <= available_airmasses[0]
+        log_target_airmass = np.log(np.where(below_range, available_airmasses[0], airmass))
+
+        params = {}
+        for name in _PARAM_NAMES:
+            interpolated = np.interp(log_target_airmass, table['log_airmass'], table[name])
+            params[name] = np.where(below_range, table[name][0], interpolated)
+
+        return params, airmass > available_airmasses[-1]
+
     # Helper functions
     def _calculate_piecewise_snr(self, gmag: np.ndarray, params: Dict[str, float]) -> np.ndarray:
         snr_flat = params['snr_flat']
@@ -0,0 +1,269 @@
+"""Slew-aware night planning by dynamic programming.
+
+The greedy pass in `run_scheduler` picks the best field per hour-long block and
+collapses repeats. It ignores the dead time of every field switch (slew,
+settle, astrometric correction and the ColibriGrab restart), and its
+resolution is fixed at one block. This planner instead:
+
+1. scores every field on a fine time grid (`score_matrix`), with the same model
+   as `Observatory.schedule_observation`. One `VisibilityGrid` covers all step
+   boundaries, the Sun is computed once for all steps, and each step is one
+   `ScoringEngine.score_block` pass;
+2. solves for the sequence of fields that maximises the total score over the
+   night (`plan`). Each step contributes its score times its duration. Every
+   switch to a new field loses `switch_minutes` of that field's observing
+   time, and every visit lasts at least `min_dwell_minutes`.
+
+The dynamic program runs in O(T * F) time for T steps and F fields. A visit is
+either continued for one more step or entered as a whole minimum-dwell run,
+using prefix sums over time and the best and second-best states of the step
+the run starts after. An idle state covers steps where no field is eligible.
+"""
+
+from __future__ import annotations
+
+import math
+from types import SimpleNamespace
+from typing import List, MutableMapping, Optional, Tuple
+
+import numpy as np
+import astropy.units as u
+from astropy.time import Time
+
+from . import service
+
+# Sentinel predecessor of a run that starts at the first step of the night.
+_START = -1
+
+
+def step_boundaries(sunset_time: Time, sunrise_time: Time, step_minutes: float) -> Time:
+    """Step boundaries from sunset to sunrise: whole `step_minutes` steps plus a partial last one."""
+    if step_minutes <= 0:
+        raise ValueError(f"step_minutes must be positive, got {step_minutes}.")
+    minutes = (sunrise_time - sunset_time).to_value(u.min)
+    if minutes <= 0:
+        raise ValueError("empty observing window; no steps to plan.")
+    offsets = np.arange(0.0, minutes, step_minutes)
+    offsets = np.append(offsets, minutes) if minutes - offsets[-1] > 1e-6 else np.append(offsets[:-1], minutes)
+    return sunset_time + offsets * u.min
+
+
+def score_matrix(obs, sky, boundaries: Time, weather: float, framerate: float,
+                 cache: Optional[MutableMapping] = None) -> SimpleNamespace:
+    """Score every field over every step between consecutive `boundaries`.
+
+    Returns a namespace of (nsteps, nfields) arrays in catalog order: `score`
+    (the `schedule_observation` score, 0 where a field is not visible or not
+    eligible), `altitude` (mean over the step), `airmass` and `nstars`
+    (predicted stars above SNR 5), plus `boundaries`, the `grid` and the
+    `step_hours` of each step.
+
+    Rows found in `cache` (keyed by step bounds, `weather` and `framerate`)
+    are reused; rows computed here are added to it.
+    """
+    catalog = obs._field_catalog(sky)
+    framerate = obs._validate_scheduling_framerate(framerate)
+    grid = obs.visibility_grid(sky, boundaries)
+    starts = boundaries[:-1]
+
+    nsteps, nfields = len(starts), catalog.nfields
+    result = SimpleNamespace(
+        boundaries=boundaries,
+        grid=grid,
+        step_hours=np.diff(boundaries.jd) * 24.0,
+        score=np.zeros((nsteps, nfields)),
+        altitude=np.full((nsteps, nfields), np.nan),
+        airmass=np.full((nsteps, nfields), np.nan),
+        nstars=np.zeros((nsteps, nfields), dtype=np.int64),
+    )
+    jd = boundaries.jd
+    keys = [('step', float(jd[step]), float(jd[step + 1]), float(weather), framerate) for step in range(nsteps)]
+    cache = {} if cache is None else cache
+    missing = [step for step in range(nsteps) if keys[step] not in cache]
+    if missing:
+        elongation = obs.engine.solar_elongation_grid(catalog, starts[missing])
+    for row, step in enumerate(missing):
+        # What scoring a step prints (e.g. noise-model warnings) is replayed below in
+        # step order, so steps reused from `cache` print it again.
+        transcript = service.Transcript()
+        with transcript.recording(echo=False):
+            entry = _score_step(obs, catalog, sky, boundaries, step, weather, framerate, elongation[row])
+        cache[keys[step]] = (entry, transcript)
+
+    for step in range(nsteps):
+        entry, transcript = cache[keys[step]]
+        transcript.replay()
+        if entry is None:
+            continue
+        positions, score, altitude, airmass, nstars = entry
+        result.score[step, positions] = score
+        result.altitude[step, positions] = altitude
+        result.airmass[step, positions] = airmass
+        result.nstars[step, positions] = nstars
+    return result
+
+
+def _score_step(obs, catalog, sky, boundaries, step, weather, framerate, elongation):
+    """`score_matrix`'s entry for one step: the visible fields' scores and stats, or None if none is visible."""
+    visible_mask, mean_altitudes = obs._visible_field_mask(boundaries[step], boundaries[step + 1], sky)
+    positions = np.flatnonzero(visible_mask)
+    if positions.size == 0:
+        return None
+    block = obs.engine.score_block(
+        catalog, positions, mean_altitudes[positions], weather, boundaries[step], framerate,
+        solar_elongation=elongation[positions],
+    )
+    return positions, block.score, mean_altitudes[positions], 1 / np.cos(np.radians(block.zenith)), block.predicted_count_above_5
+
+
+def _best_two(values: np.ndarray) -> Tuple[int, float, int, float]:
+    """(index, value) of the largest and second-largest entries of `values`."""
+    if values.size == 1:
+        return 0, float(values[0]), -1, -np.inf
+    top_two = np.argpartition(values, -2)[-2:]
+    first, second = sorted(top_two, key=lambda i: (-values[i], i))
+    return int(first), float(values[first]), int(second), float(values[second])
+
+
+def plan(score: np.ndarray, step_hours: np.ndarray, switch_hours: float = 0.0, min_dwell_steps: int = 1) -> List[Tuple[int, int, int]]:
+    """Maximum-total-score field sequence for a (nsteps, nfields) score matrix.
+
+    Step `t` observing field `f` earns `score[t, f] * step_hours[t]`. Fields
+    with score <= 0 at a step cannot be observed then. Entering a field
+    forfeits `switch_hours` of its first step's score. Each visit covers at
+    least `min_dwell_steps` steps. Steps may be left idle (earning nothing).
+
+    Returns the visits as (field, first_step, stop_step) with `stop_step`
+    exclusive, in time order; idle steps are not listed. Ties prefer fewer
+    switches.
+    """
+    score = np.asarray(score, dtype=float)
+    nsteps, nfields = score.shape
+    dwell = max(1, int(min_dwell_steps))
+    idle = nfields
+
+    eligible = score > 0.0
+    gain = np.where(eligible, score * np.asarray(step_hours, dtype=float)[:, np.newaxis], 0.0)
+    entry_cost = np.where(eligible, score * float(switch_hours), 0.0)
+    gain_sum = np.vstack([np.zeros((1, nfields)), np.cumsum(gain, axis=0)])
+    blocked_sum = np.vstack([np.zeros((1, nfields), dtype=np.int64), np.cumsum(~eligible, axis=0)])
+
+    # value[t, s]: best total up to and including step t, ending in state s
+    # (a field whose visit has lasted >= dwell steps, or idle).
+    value = np.full((nsteps, nfields + 1), -np.inf)
+    entered = np.zeros((nsteps, nfields), dtype=bool)
+    entered_from = np.full((nsteps, nfields), _START, dtype=np.int64)
+    idle_from = np.full(nsteps, _START, dtype=np.int64)
+    best = []  # per step: (first state, first value, second state, second value)
+
+    for t in range(nsteps):
+        # Continue the current visit.
+        if t > 0:
+            value[t, :nfields] = np.where(eligible[t], value[t - 1, :nfields] + gain[t], -np.inf)
+
+        # Enter a field as a whole minimum-dwell run covering steps before..t.
+        before = t - dwell  # the run starts after this step
+        if before >= -1:
+            first = before + 1
+            run_gain = gain_sum[t + 1] - gain_sum[first] - entry_cost[first]
+            run_ok = blocked_sum[t + 1] - blocked_sum[first] == 0
+            if before == _START:
+                prev_value = np.zeros(nfields)
+                prev_state = np.full(nfields, _START, dtype=np.int64)
+            else:
+                top, top_value, runner_up, runner_up_value = best[before]
+                # The best predecessor other than the field itself.
+                prev_value = np.full(nfields, top_value)
+                prev_state = np.full(nfields, top, dtype=np.int64)
+                if top < nfields:
+                    prev_value[top] = runner_up_value
+                    prev_state[top] = runner_up
+            entry_value = np.where(run_ok, prev_value + run_gain, -np.inf)
+            take = entry_value > value[t, :nfields]
+            value[t, :nfields] = np.where(take, entry_value, value[t, :nfields])
+            entered[t] = take
+            entered_from[t] = np.where(take, prev_state, entered_from[t])
+
+        # Idle this step.
+        if t == 0:
+            value[t, idle] = 0.0
+        else:
+            top = best[t - 1][0]
+            value[t, idle] = best[t - 1][1]
+            idle_from[t] = top
+
+        best.append(_best_two(value[t]))
+
+    # Backtrack from the best final state.
+    visits: List[Tuple[int, int, int]] = []
+    t, state = nsteps - 1, best[nsteps - 1][0]
+    while t >= 0 and state != _START:
+        if state == idle:
+            t, state = t - 1, int(idle_from[t])
+            continue
+        stop = t + 1
+        while t > 0 and not entered[t, state]:
+            t -= 1
+        first = t - dwell + 1
+        visits.append((state, first, stop))
+        t, state = first - 1, int(entered_from[t, state])
+    visits.reverse()
+    return visits
+
+
+def plan_night(obs, sky, sunset_time: Time, sunrise_time: Time, weather: float, framerate: float,
+               step_minutes: float = 10.0, switch_minutes: float = 5.0, min_dwell_minutes: float = 30.0,
+               resume_time: Optional[Time] = None, cache: Optional[MutableMapping] = None) -> List[dict]:
+    """Plan a night with `plan` and return one record per visit, shaped like `run_scheduler` records.
+
+    Each record describes the visit's first step: start time, mean altitude,
+    azimuth and hour angle at its start, airmass, score and predicted star
+    count.
+
+    With `resume_time`, only the rest of the night is planned: steps stay on
+    the full night's grid (so a cached grid and `cache` rows are reused), the
+    step holding `resume_time` counts only from then on, and a visit starting
+    in it starts at `resume_time`.
+    """
+    boundaries = step_boundaries(sunset_time, sunrise_time, step_minutes)
+    if resume_time is not None:
+        first_step = int(np.searchsorted(boundaries.jd, resume_time.jd, side='right')) - 1
+        if not 0 <= first_step < len(boundaries) - 1:
+            raise ValueError("resume time is outside the observing window.")
+        boundaries = boundaries[first_step:]
+    matrix = score_matrix(obs, sky, boundaries, weather, framerate, cache=cache)
+    step_hours = matrix.step_hours.copy()
+    if resume_time is not None:
+        step_hours[0] = (boundaries[1].jd - resume_time.jd) * 24.0
+    min_dwell_steps = max(1, math.ceil(min_dwell_minutes / step_minutes - 1e-9))
+    visits = plan(matrix.score, step_hours, switch_minutes / 60.0, min_dwell_steps)
+
+    catalog = obs._field_catalog(sky)
+    records = []
+    for position, first, _stop in visits:
+        field_id = catalog.field_keys[position]
+        start = boundaries[first]
+        ra_deg, dec_deg = sky.centroids[field_id]
+        record = {
+            'name': "field" + str(field_id + 1),
+            'field_id': field_id,
+            'ra_deg': float(ra_deg),
+            'dec_deg': float(dec_deg),
+            'start_jd': float(start.jd),
+            'alt': float(matrix.altitude[first, position]),
+            'az': float(matrix.grid.az[matrix.grid.row(start), position]),
+            'ha': obs._field_hour_angle(
+                start, float(catalog.elon[position]), float(catalog.elat[position]),
+                catalog=catalog, field_position=position,
+            ),
+            'airmass': float(matrix.airmass[first, position]),
+            'score': float(matrix.score[first, position]),
+            'nstars': int(matrix.nstars[first, position]),
+        }
+        if first == 0 and resume_time is not None:
+            # The visit starts at `resume_time`, part-way through the step:
+            # geometry for the rest of the step, score and count the step's.
+            record['start_jd'] = float(resume_time.jd)
+            record.update(obs.field_geometry(sky, field_id, resume_time, boundaries[1]))
+        records.append(record)
+    return records
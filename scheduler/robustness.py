@@ -0,0 +1,207 @@
+"""Monte-Carlo robustness of the per-block field choice.
+
+The scheduler ranks fields by the noise-free predicted SNR, while
+`Observatory.Telescope.calculate_SNR(add_noise=True)` describes what a night
+actually delivers: each star's SNR scattered by the noise model's standard
+deviation (and zeroed below the visibility floor). `block_robustness` scores
+a block under `realizations` draws of that noise, optionally with the
+extinction jittered per realization, and reports how often each field wins
+and the spread of its score. A top pick that wins only about half the
+realizations is a coin flip between fields.
+
+The ensemble costs a few deterministic passes, not one per realization. A
+star's noisy SNR clears the visibility threshold with a probability given by
+the noise model's predicted SNR and std, and draws are only needed for stars
+where that probability is neither 0 nor 1 at the sampled extinctions; all
+other stars are counted once for all realizations. The marginal stars are
+sampled by inverse transform, one uint16 per (realization, star) compared to
+the probability in units of 1/65536, which is far cheaper than a Gaussian
+draw per star. With extinction jitter the probabilities are evaluated
+exactly on a grid of extinction offsets and interpolated for each
+realization.
+"""
+
+from __future__ import annotations
+
+import warnings
+from types import SimpleNamespace
+from typing import List, Optional
+
+import numpy as np
+
+from .catalog import segment_sums
+from .helpers import normal_cdf
+
+# Detection probabilities are resolved to 1/_LEVELS: each (realization, star)
+# draw is one uint16, and a star whose probability rounds to 0 or 1 at every
+# sampled extinction is counted once for all realizations.
+_LEVELS = 1 << 16
+
+# Extinction jitter nodes at which the probabilities are evaluated exactly.
+_SHIFT_NODES = 64
+
+# Elements per (realizations x marginal stars) batch.
+_BATCH_ELEMENTS = 1 << 18
+
+# Win probability below which the top pick is reported as a coin flip.
+COIN_FLIP_PROBABILITY = 0.6
+
+
+def block_robustness(
+    obs,
+    sky,
+    observation_start,
+    observation_end,
+    weather: float,
+    framerate: float,
+    realizations: int,
+    extinction_sigma: float = 0.0,
+    rng: Optional[np.random.Generator] = None,
+) -> SimpleNamespace:
+    """Score one block under `realizations` noise draws (see the module docstring).
+
+    `extinction_sigma` (mag/airmass) jitters the extinction per realization
+    (total extinction clipped at 0). Returns a namespace with the visible
+    fields' catalog `positions`, their noise-free `nominal_score`, the index
+    of the nominal pick `top` (-1 if none), the (realizations, fields)
+    `scores`, each field's `win_probability`, the fraction of realizations
+    with no eligible field (`no_winner`) and the number of `marginal_stars`
+    that needed draws. Raises ValueError if no field is visible.
+    """
+    if realizations <= 0:
+        raise ValueError(f"realizations must be positive, got {realizations}.")
+    if extinction_sigma < 0:
+        raise ValueError(f"extinction_sigma must not be negative, got {extinction_sigma}.")
+    rng = np.random.default_rng() if rng is None else rng
+
+    catalog = obs._field_catalog(sky)
+    framerate = obs._validate_scheduling_framerate(framerate)
+    visible_mask, mean_altitudes = obs._visible_field_mask(observation_start, observation_end, sky)
+    positions = np.flatnonzero(visible_mask)
+    if positions.size == 0:
+        raise ValueError("No visible fields found for this time window (altitude cut + Moon exclusion).")
+
+    block = obs.engine.score_block(
+        catalog, positions, mean_altitudes[positions], weather, observation_start, framerate,
+        use_cache=False, chunked=False,
+    )
+    nominal_score = np.array(block.score, dtype=float)
+    shifts = np.maximum(extinction_sigma * rng.standard_normal(realizations), -float(weather))
+    counts, marginal_stars = _noisy_counts(obs, block, shifts, framerate, rng)
+    scores = obs._consolidated_scheduling_scores(counts, block.solar_elongation[np.newaxis, :], framerate)
+
+    eligible = scores > 0.0
+    has_winner = eligible.any(axis=1)
+    winner = np.argmax(np.where(eligible, scores, -np.inf), axis=1)
+    win_probability = np.bincount(winner[has_winner], minlength=positions.size) / realizations
+
+    nominal_eligible = nominal_score > 0.0
+    top = int(np.argmax(np.where(nominal_eligible, nominal_score, -np.inf))) if nominal_eligible.any() else -1
+    return SimpleNamespace(
+        positions=positions,
+        nominal_score=nominal_score,
+        top=top,
+        scores=scores,
+        win_probability=win_probability,
+        no_winner=float(1.0 - has_winner.mean()),
+        marginal_stars=marginal_stars,
+        realizations=int(realizations),
+    )
+
+
+def _noisy_counts(obs, block: SimpleNamespace, shifts: np.ndarray, framerate: float, rng: np.random.Generator):
+    """(realizations, fields) counts of stars whose noisy SNR clears the visibility threshold.
+
+    Also returns the number of marginal stars that needed draws.
+    """
+    telescope = obs.telescope
+    model = telescope._noise_model
+    if model is None:
+        raise RuntimeError('HDF5 noise-model backend not initialized')
+    cadence_ms = telescope._cadence_ms(framerate=framerate)
+    floor = float(getattr(obs.config, 'snr_visibility_floor', 5.0))
+    threshold = obs._SNR_VISIBILITY_THRESHOLD
+    star_airmass = block.airmass[block.star_field]
+
+    with warnings.catch_warnings():
+        # Airmasses above the modelled range were already reported by the nominal pass.
+        warnings.simplefilter('ignore', RuntimeWarning)
+        nodes = np.linspace(shifts.min(), shifts.max(), _SHIFT_NODES if shifts.min() < shifts.max() else 1)
+
+        # The SNR is monotone in magnitude, so the extreme extinctions bound every star's level.
+        extremes = nodes[[0, -1], np.newaxis]
+        edge = _detection_levels(model, block.mag + extremes * star_airmass, block, block.star_field, cadence_ms, floor, threshold)
+        always = np.all(edge == _LEVELS, axis=0)
+        never = np.all(edge == 0, axis=0)
+        counts = np.tile(segment_sums(always, block.offsets), (len(shifts), 1))
+        marginal = np.flatnonzero(~(always | never))
+        if marginal.size == 0:
+            return counts, 0
+
+        levels = _detection_levels(
+            model, block.mag[marginal] + nodes[:, np.newaxis] * star_airmass[marginal], block,
+            block.star_field[marginal], cadence_ms, floor, threshold,
+        ).astype(np.float32)
+
+    # Realizations between two extinction nodes interpolate the nodes' levels.
+    position = (shifts - nodes[0]) / (nodes[-1] - nodes[0]) * (len(nodes) - 1) if len(nodes) > 1 else np.zeros(len(shifts))
+    node = np.minimum(position.astype(np.int64), max(len(nodes) - 2, 0))
+    weight = (position - node).astype(np.float32)[:, np.newaxis]
+
+    # Per-field sums over the marginal stars (grouped by field), for fields that have any.
+    marginal_offsets = np.searchsorted(marginal, block.offsets)
+    has_marginal = np.flatnonzero(np.diff(marginal_offsets) > 0)
+    segment_starts = marginal_offsets[has_marginal]
+
+    batch = max(1, _BATCH_ELEMENTS // marginal.size)
+    for first in range(0, len(shifts), batch):
+        rows = slice(first, first + batch)
+        if len(nodes) > 1:
+            level = levels[node[rows]] * (1.0 - weight[rows]) + levels[node[rows] + 1] * weight[rows]
+        else:
+            level = levels
+        draws = rng.integers(0, _LEVELS, size=(len(node[rows]), marginal.size), dtype=np.uint16)
+        detected = (draws < level).view(np.uint8)
+        counts[rows, has_marginal] += np.add.reduceat(detected, segment_starts, axis=1, dtype=np.int64)
+    return counts, int(marginal.size)
+
+
+def _detection_levels(model, mag, block, star_field, cadence_ms, floor, threshold) -> np.ndarray:
+    """P(noisy SNR > `threshold`) of stars with magnitudes `mag`, in units of 1/`_LEVELS` (rounded).
+
+    Stars predicted below the visibility `floor` have level 0, as
+    `calculate_SNR` zeroes them. Its 0.01 floor on the noisy SNR cannot move
+    a star across the threshold.
+    """
+    out = model.predict_many(mag, block.airmass, cadence_ms, star_field=star_field, return_uncertainty=True)
+    predicted, std = out['temporal_snr'], out['temporal_snr_std']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probability = normal_cdf((predicted - threshold) / std)
+    return np.where(predicted >= floor, np.rint(probability * _LEVELS), 0.0)
+
+
+def candidates(result: SimpleNamespace, limit: int = 3) -> List[dict]:
+    """Summary rows for the block's leading fields: the nominal pick, then by win probability.
+
+    Each row has the field's index into `result.positions`, its
+    `win_probability`, `nominal_score` and the mean, std and 5/50/95th
+    percentiles of its score over the realizations.
+    """
+    order = np.lexsort((-result.nominal_score, -result.win_probability))
+    chosen = [result.top] if result.top >= 0 else []
+    chosen += [int(i) for i in order if result.win_probability[i] > 0.0 and int(i) != result.top]
+    rows = []
+    for index in chosen[:limit]:
+        scores = result.scores[:, index]
+        p05, p50, p95 = np.percentile(scores, [5.0, 50.0, 95.0])
+        rows.append({
+            'index': index,
+            'win_probability': float(result.win_probability[index]),
+            'nominal_score': float(result.nominal_score[index]),
+            'score_mean': float(scores.mean()),
+            'score_std': float(scores.std()),
+            'score_p05': float(p05),
+            'score_p50': float(p50),
+            'score_p95': float(p95),
+        })
+    return rows
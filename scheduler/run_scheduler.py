@@ -10,19 +10,75 @@ own location onto ``sys.path`` and imports the sibling modules via the
 scheduler.run_scheduler``).
 
 It divides the supplied [sunset, sunrise] JD window into hour-long blocks,
-schedules the best field per block, collapses contiguous identical fields into
+computes every field's alt/az over all block boundaries in one transform
+(`Observatory.visibility_grid`), schedules the best field per block, collapses contiguous identical fields into
 segments, and prints a machine-readable schedule between
 ``=== SCHEDULE BEGIN ===`` and ``=== SCHEDULE END ===`` markers. The CSV row
 format is a hard contract consumed by RunColibri.js; do not change it without
 updating the JS parser.
+
+Season batch mode (``--start-date``/``--end-date``) instead computes each
+night's twilight bounds itself (`Observatory.get_observable_hours`, local date
+of the evening; each worker solves the whole season's twilight analytically
+up front, see `scheduler.twilight`) and schedules every night of the range in
+one run, fanned out over a process pool whose workers each load the catalog,
+noise model and ephemeris once. It writes ``schedule_<date>.csv`` per night (the same columns
+as the CLI block, without the markers) and a ``summary.csv`` to ``--out-dir``.
+
+``--optimizer dp`` replaces the per-block greedy pick with the slew-aware
+planner in `scheduler.optimizer`: fields are scored on a ``--step-minutes``
+grid and the night's field sequence maximises the total score, with
+``--switch-minutes`` of dead time charged per field change and visits of at
+least ``--min-dwell-minutes``. Each visit is one row of the same CSV block.
+
+``--resume-from-jd`` re-plans only the rest of the night, e.g. after a weather
+hold (optionally with a new ``--extinction``). Blocks (or ``dp`` steps) stay
+on the full night's grid and those ending by the resume time are dropped; the
+first remaining row starts at the resume time. Through the warm service the
+night's visibility grid and per-block results are reused, so a re-plan with
+unchanged extinction is a lookup.
+
+Array mode (``--array``) schedules REDBIRD, GREENBIRD and BLUEBIRD together
+(`scheduler.array`): scores are computed once per distinct telescope config
+(``--array-config`` overrides), every block is given one field for the whole
+array, and the co-pointed schedules are written to ``--array-file``. Each
+telescope then prints its own schedule block from that file with
+``--telescope NAME --array-file FILE`` (or at once with ``--array --telescope``).
+
+``--robustness N`` also scores every block under N draws of the noise model's
+SNR scatter (optionally with ``--extinction-jitter``; see
+`scheduler.robustness`) and prints, after the schedule block, each block's
+leading fields with their win probability and score distribution between
+``=== ROBUSTNESS BEGIN ===`` and ``=== ROBUSTNESS END ===``. Blocks whose
+top pick is a coin flip are flagged with a WARNING on stderr.
+
+``--framerate-sweep`` picks the best (field, framerate) per block over every
+supported framerate (`Observatory.schedule_observation_sweep`), sharing the
+framerate-independent work between them. Contiguous blocks are one segment
+only if both the field and the framerate match. The default CSV contract is
+unchanged; ``--framerate-column`` appends each row's framerate as a last
+``framerate`` column.
+
+``--serve`` keeps the scheduler loaded and answers single-night and
+``--telescope`` requests from the thin client in `scheduler.service`, which
+prints exactly what this CLI prints. Requests may not name other files (``--fields``, ``--models``,
+``--ephemeris``, ``--score-cache-file``, ``--array-file``) than the server
+was started with, and edits to those files are picked up on the next request.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import csv
+import datetime
+import io
 import math
 import os
 import sys
+import time
+import warnings
+from types import SimpleNamespace
 
 # Make the `scheduler` package importable when run as a plain script.
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,16 +86,83 @@ _PARENT_DIR = os.path.dirname(_THIS_DIR)
 if _PARENT_DIR not in sys.path:
     sys.path.insert(0, _PARENT_DIR)
 
-import numpy as np  # noqa: E402
-import astropy.units as u  # noqa: E402
-from astropy.time import Time  # noqa: E402
-
-from scheduler import sky as sky_module  # noqa: E402
-from scheduler.config import SchedulerConfig  # noqa: E402
-from scheduler.scheduler import Observatory  # noqa: E402
+# Only the standard library is imported at module load: numpy, astropy and the
+# scheduler modules built on them are imported by the code paths that use them,
+# so argument errors and the service client never pay for them.
+from scheduler import service  # noqa: E402
 
 _DEFAULT_FIELDS = os.path.join(_THIS_DIR, "fields", "fields_13.3mag.json")
 _DEFAULT_MODELS = os.path.join(_THIS_DIR, "sensitivity_models")
+_DEFAULT_SEASON_DIR = "schedules"
+_DEFAULT_ARRAY_FILE = "array_schedule.json"
+
+SCHEDULE_BEGIN = "=== SCHEDULE BEGIN ==="
+SCHEDULE_END = "=== SCHEDULE END ==="
+SCHEDULE_HEADER = "name,ra_deg,dec_deg,start_jd,alt,az,ha,airmass,score,nstars"
+# Optional last column (``--framerate-column``).
+SCHEDULE_FRAMERATE_COLUMN = "framerate"
+
+ROBUSTNESS_BEGIN = "=== ROBUSTNESS BEGIN ==="
+ROBUSTNESS_END = "=== ROBUSTNESS END ==="
+ROBUSTNESS_HEADER = (
+    "start_jd,name,win_probability,nominal_score,score_mean,score_std,score_p05,score_p50,score_p95"
+)
+# Fields listed per block in the robustness report.
+_ROBUSTNESS_CANDIDATES = 3
+
+_SEASON_SUMMARY_COLUMNS = (
+    "night", "sunset_jd", "sunrise_jd", "hours", "blocks", "scheduled_blocks",
+    "segments", "unique_fields", "mean_score", "status", "schedule_file",
+)
+
+
+class SchedulingError(RuntimeError):
+    """Fatal (model/config) failure while scheduling; the CLI exits with status 1."""
+
+
+class _Timings:
+    """Wall-clock phase timings collected for ``--timings`` and reported on stderr."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.phases = []  # (name, seconds)
+        self.notes = []  # (name, text), e.g. cache statistics
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, err) -> None:
+        if not self.enabled:
+            return
+        # Repeated phases (e.g. several lazy imports) are summed under one name.
+        totals = {}
+        for name, seconds in self.phases:
+            totals[name] = totals.get(name, 0.0) + seconds
+        blocks = [seconds for name, seconds in totals.items() if name.startswith("block ")]
+        for name, seconds in totals.items():
+            print(f"TIMING {name}: {seconds * 1000:.1f} ms", file=err)
+        for name, text in self.notes:
+            print(f"TIMING {name}: {text}", file=err)
+        if blocks:
+            print(
+                f"TIMING blocks: {len(blocks)} in {sum(blocks) * 1000:.1f} ms "
+                f"(mean {sum(blocks) / len(blocks) * 1000:.1f} ms, max {max(blocks) * 1000:.1f} ms)",
+                file=err,
+            )
+
+
+def _scheduler_modules():
+    """Import and return the numpy/astropy-backed scheduler modules."""
+    from scheduler import sky as sky_module
+    from scheduler.config import SchedulerConfig
+    from scheduler.scheduler import Observatory
+
+    return SimpleNamespace(sky=sky_module, SchedulerConfig=SchedulerConfig, Observatory=Observatory)
 
 
 def _build_blocks(sunset_time, sunrise_time):
@@ -48,6 +171,8 @@ def _build_blocks(sunset_time, sunrise_time):
     Mirrors Observatory.get_observation_periods, but uses the SUPPLIED bounds
     rather than computing its own twilight times.
     """
+    import astropy.units as u
+
     hours = (sunrise_time - sunset_time).to(u.hour).value
     if hours <= 0:
         return []
@@ -75,86 +200,89 @@ def _airmass_from_alt(alt_deg):
     return 1.0 / cz
 
 
-def main(argv=None) -> int:
-    parser = argparse.ArgumentParser(description="Colibri full-night field scheduler.")
-    parser.add_argument("--sunset-jd", type=float, required=True, help="Sunset (start) time as Julian Date.")
-    parser.add_argument("--sunrise-jd", type=float, required=True, help="Sunrise (end) time as Julian Date.")
-    parser.add_argument("--framerate", type=int, default=40, help="Camera framerate in Hz (default 40).")
-    parser.add_argument("--extinction", type=float, default=0.0, help="Nominal atmospheric extinction (mag/airmass).")
-    parser.add_argument("--fields", default=_DEFAULT_FIELDS, help="Path to the fields JSON.")
-    parser.add_argument("--models", default=_DEFAULT_MODELS, help="Path to the sensitivity_models folder.")
-    args = parser.parse_args(argv)
-
-    if args.sunset_jd >= args.sunrise_jd:
-        print(f"ERROR: sunset-jd ({args.sunset_jd}) must be < sunrise-jd ({args.sunrise_jd}).", file=sys.stderr)
-        return 2
-
-    try:
-        sunset_time = Time(args.sunset_jd, format='jd')
-        sunrise_time = Time(args.sunrise_jd, format='jd')
-    except Exception as exc:
-        print(f"ERROR: could not parse JD values: {exc}", file=sys.stderr)
-        return 2
-
-    try:
-        config = SchedulerConfig(fps=args.framerate, sensitivity_model_loc=args.models)
-    except Exception as exc:
-        print(f"ERROR: could not build SchedulerConfig: {exc}", file=sys.stderr)
-        return 2
+def schedule_blocks(
+    obs, sky, blocks, extinction=0.0, framerate=40, log=None, timings=None, cache=None, framerates=None,
+):
+    """Pick the best field for every block; return one record per scheduled block.
 
-    try:
-        sky = sky_module.load_fields(args.fields)
-    except Exception as exc:
-        print(f"ERROR: could not load fields from {args.fields}: {exc}", file=sys.stderr)
-        return 2
+    Blocks with no eligible field are reported as WARNING lines on `log`
+    (stderr by default) and skipped. Raises `SchedulingError` on a fatal
+    model/config error. Phase times are recorded in `timings` if given.
+    Block outcomes found in `cache` (keyed by block bounds, extinction and
+    framerate) are reused, replaying what computing them printed; new ones
+    are added to it. With `framerates`, each
+    block's best (field, framerate) over those framerates is picked instead
+    (`Observatory.schedule_observation_sweep`). Every record carries the
+    framerate it was scored at.
+    """
+    log = sys.stderr if log is None else log
+    timings = _Timings() if timings is None else timings
+    if not blocks:
+        return []
 
+    # One broadcast AltAz transform for every block boundary; each block's
+    # visibility, hour angle and azimuth are then grid lookups.
+    boundaries = [start for (start, _end) in blocks] + [blocks[-1][1]]
     try:
-        obs = Observatory(config)
+        with timings.phase("visibility-grid"):
+            grid = obs.visibility_grid(sky, boundaries)
     except Exception as exc:
-        print(f"ERROR: could not initialize Observatory (missing model?): {exc}", file=sys.stderr)
-        return 2
-
-    blocks = _build_blocks(sunset_time, sunrise_time)
-    if not blocks:
-        print("ERROR: empty observing window; no blocks to schedule.", file=sys.stderr)
-        return 2
+        raise SchedulingError(f"could not compute field visibility grid: {exc}") from exc
 
     # Per-block selection.
-    selections = []  # list of (start_time, record-dict)
+    cache = {} if cache is None else cache
+    records = []
     for (start, end) in blocks:
+        rate_key = framerate if framerates is None else tuple(framerates)
+        key = ('block', float(start.jd), float(end.jd), float(extinction), rate_key)
+        if key in cache:
+            outcome, transcript = cache[key]
+            transcript.replay()
+            if isinstance(outcome, str):
+                print(outcome, file=log)
+            else:
+                records.append(dict(outcome))
+            continue
+
+        transcript = service.Transcript()
         try:
-            top_field, stats = obs.schedule_observation(
-                sky, start, end, weather=args.extinction, framerate=args.framerate
-            )
+            with timings.phase(f"block {start.jd:.6f}"), transcript.recording():
+                if framerates is None:
+                    top_field, stats = obs.schedule_observation(
+                        sky, start, end, weather=extinction, framerate=framerate
+                    )
+                else:
+                    top_field, stats = obs.schedule_observation_sweep(
+                        sky, start, end, weather=extinction, framerates=framerates
+                    )
         except ValueError as exc:
             # No eligible field for this block: non-fatal, skip it.
-            print(f"WARNING: skipping block starting JD {start.jd:.6f}: {exc}", file=sys.stderr)
+            cache[key] = (f"WARNING: skipping block starting JD {start.jd:.6f}: {exc}", transcript)
+            print(cache[key][0], file=log)
             continue
         except Exception as exc:
             # A model/config error is fatal; surface it clearly.
-            print(f"ERROR: scheduling failed for block JD {start.jd:.6f}: {exc}", file=sys.stderr)
-            return 1
+            raise SchedulingError(f"scheduling failed for block JD {start.jd:.6f}: {exc}") from exc
 
         field_id = int(stats['Field'])
         ra_deg, dec_deg = sky.centroids[field_id]
 
         # Azimuth from the field's AltAz at block start.
         try:
-            altaz = obs.get_field_altaz(start, sky)
-            az = float(altaz.az.deg[field_id])
+            az = float(grid.az[grid.row(start), sky.catalog.position(field_id)])
         except Exception:
             az = 0.0
 
         alt = float(stats['Altitude'])
         airmass = stats.get('AIRMASS')
-        if airmass is None or not np.isfinite(float(airmass)):
+        if airmass is None or not math.isfinite(float(airmass)):
             airmass = _airmass_from_alt(alt)
         else:
             airmass = float(airmass)
 
         nstars = stats.get('Predicted Nstars > 5', stats.get('Nstars > 5', 0))
 
-        record = {
+        records.append({
             'name': "field" + str(field_id + 1),
             'field_id': field_id,
             'ra_deg': float(ra_deg),
@@ -166,36 +294,797 @@ def main(argv=None) -> int:
             'airmass': float(airmass),
             'score': float(stats['Observation Score']),
             'nstars': int(nstars),
-        }
-        selections.append((start, record))
+            'framerate': int(stats.get('Framerate', framerate)),
+        })
+        cache[key] = (dict(records[-1]), transcript)
+
+    return records
+
+
+def remaining_blocks(blocks, resume_time):
+    """The blocks of `blocks` that end after `resume_time` (the block holding it is kept whole)."""
+    return [(start, end) for (start, end) in blocks if end.jd > resume_time.jd]
+
+
+def start_at(obs, sky, segments, resume_time, block_end):
+    """Return `segments` with the first one starting no earlier than `resume_time`.
+
+    A segment moved to `resume_time` gets its alt/az/ha/airmass recomputed for
+    the rest of its first block (to `block_end`); its score and star count
+    stay the block's.
+    """
+    if segments and segments[0]['start_jd'] < resume_time.jd:
+        first = dict(segments[0], start_jd=float(resume_time.jd))
+        first.update(obs.field_geometry(sky, first['field_id'], resume_time, block_end))
+        segments = [first] + segments[1:]
+    return segments
+
 
-    # Collapse contiguous identical fields into segments (keep earliest block's row).
+def plan_night_dp(obs, sky, sunset_time, sunrise_time, args, timings=None, resume_time=None, cache=None):
+    """`--optimizer dp`: one record per visit of the slew-aware plan (see `scheduler.optimizer`).
+
+    Raises `SchedulingError` if the night cannot be planned.
+    """
+    timings = _Timings() if timings is None else timings
+    with timings.phase("import"):
+        from scheduler import optimizer
+
+    try:
+        with timings.phase("plan"):
+            return optimizer.plan_night(
+                obs, sky, sunset_time, sunrise_time, weather=args.extinction, framerate=args.framerate,
+                step_minutes=args.step_minutes, switch_minutes=args.switch_minutes,
+                min_dwell_minutes=args.min_dwell_minutes, resume_time=resume_time, cache=cache,
+            )
+    except Exception as exc:
+        raise SchedulingError(f"dynamic-programming plan failed: {exc}") from exc
+
+
+def robustness_rows(obs, sky, blocks, args, log=None):
+    """`--robustness`: the leading fields of every block under noise (see `scheduler.robustness`).
+
+    Blocks without a visible field are skipped (the schedule already warned
+    about them); a top pick winning less than `COIN_FLIP_PROBABILITY` of the
+    realizations is reported as a WARNING on `log`. Raises `SchedulingError`
+    on a model/config error.
+    """
+    import numpy as np
+
+    from scheduler import robustness
+
+    log = sys.stderr if log is None else log
+    rng = np.random.default_rng(args.robustness_seed)
+    rows = []
+    for (start, end) in blocks:
+        try:
+            result = robustness.block_robustness(
+                obs, sky, start, end, args.extinction, args.framerate, args.robustness,
+                extinction_sigma=args.extinction_jitter, rng=rng,
+            )
+        except ValueError:
+            continue
+        except Exception as exc:
+            raise SchedulingError(f"robustness run failed for block JD {start.jd:.6f}: {exc}") from exc
+
+        leaders = robustness.candidates(result, _ROBUSTNESS_CANDIDATES)
+        for leader in leaders:
+            field_id = sky.catalog.field_keys[int(result.positions[leader['index']])]
+            leader.update(start_jd=float(start.jd), name="field" + str(field_id + 1))
+        rows += leaders
+        if result.top >= 0 and leaders[0]['win_probability'] < robustness.COIN_FLIP_PROBABILITY:
+            runner_up = f" (next: {leaders[1]['name']} {leaders[1]['win_probability']:.0%})" if len(leaders) > 1 else ""
+            print(
+                f"WARNING: block starting JD {start.jd:.6f}: {leaders[0]['name']} wins only "
+                f"{leaders[0]['win_probability']:.0%} of {result.realizations} noise realizations{runner_up}",
+                file=log,
+            )
+    return rows
+
+
+def format_robustness(rows) -> str:
+    """Return the delimited, CSV-formatted robustness block."""
+    lines = [ROBUSTNESS_BEGIN, ROBUSTNESS_HEADER]
+    lines += [
+        f"{row['start_jd']:.6f},{row['name']},{row['win_probability']:.3f},{row['nominal_score']:.2f},"
+        f"{row['score_mean']:.2f},{row['score_std']:.2f},{row['score_p05']:.2f},{row['score_p50']:.2f},"
+        f"{row['score_p95']:.2f}"
+        for row in rows
+    ]
+    lines.append(ROBUSTNESS_END)
+    return "\n".join(lines) + "\n"
+
+
+def collapse_segments(records):
+    """Collapse contiguous identical fields into segments (keep earliest block's row).
+
+    Records scored at different framerates stay separate segments.
+    """
     segments = []
-    for (_start, rec) in selections:
-        if segments and segments[-1]['field_id'] == rec['field_id']:
+    for rec in records:
+        if (
+            segments and segments[-1]['field_id'] == rec['field_id']
+            and segments[-1].get('framerate') == rec.get('framerate')
+        ):
             continue
         segments.append(rec)
+    return segments
 
-    # Emit the delimited, CSV-formatted schedule block.
-    print("=== SCHEDULE BEGIN ===")
-    print("name,ra_deg,dec_deg,start_jd,alt,az,ha,airmass,score,nstars")
-    for rec in segments:
+
+def format_schedule_row(rec, framerate_column=False) -> str:
+    """Format one segment as a schedule CSV row (the RunColibri.js contract).
+
+    `framerate_column` appends the segment's framerate (``--framerate-column``).
+    """
+    row = (
+        f"{rec['name']},"
+        f"{rec['ra_deg']:.6f},"
+        f"{rec['dec_deg']:.6f},"
+        f"{rec['start_jd']:.6f},"
+        f"{rec['alt']:.2f},"
+        f"{rec['az']:.2f},"
+        f"{rec['ha']:.3f},"
+        f"{rec['airmass']:.2f},"
+        f"{rec['score']:.2f},"
+        f"{rec['nstars']}"
+    )
+    if framerate_column:
+        row += f",{rec['framerate']}"
+    return row
+
+
+def format_schedule(segments, framerate_column=False) -> str:
+    """Return the delimited, CSV-formatted schedule block exactly as the CLI prints it."""
+    header = SCHEDULE_HEADER + (f",{SCHEDULE_FRAMERATE_COLUMN}" if framerate_column else "")
+    lines = [SCHEDULE_BEGIN, header]
+    lines += [format_schedule_row(rec, framerate_column) for rec in segments]
+    lines.append(SCHEDULE_END)
+    return "\n".join(lines) + "\n"
+
+
+# Per-process state of a season run: the Observatory and catalog are loaded once
+# per worker (`_init_season_worker`) and reused for every night it schedules.
+_SEASON_STATE = None
+
+
+def _init_season_worker(fields_loc, models_loc, framerate, extinction, out_dir, config_options=None, nights=()):
+    global _SEASON_STATE
+    from astropy.time import Time
+
+    modules = _scheduler_modules()
+    config = modules.SchedulerConfig(fps=framerate, sensitivity_model_loc=models_loc, **(config_options or {}))
+    obs = modules.Observatory(config)
+    if nights:
+        # Solve the whole season's twilight in one vectorized call; nights are then cache lookups.
+        obs.twilight_bounds(Time(list(nights)))
+    _SEASON_STATE = SimpleNamespace(
+        obs=obs,
+        sky=modules.sky.load_fields(fields_loc),
+        framerate=framerate,
+        extinction=extinction,
+        out_dir=out_dir,
+    )
+
+
+def _schedule_season_night(night: str):
+    """Schedule the night starting on local date `night`; write its CSV and return its summary row."""
+    from astropy.time import Time
+
+    state = _SEASON_STATE
+    row = dict.fromkeys(_SEASON_SUMMARY_COLUMNS, "")
+    row['night'] = night
+
+    try:
+        hours, sunset_time, sunrise_time = state.obs.get_observable_hours(Time(night))
+    except ValueError as exc:
+        row['status'] = f"error: {exc}"
+        return row
+    blocks = _build_blocks(sunset_time, sunrise_time)
+    row.update(sunset_jd=f"{sunset_time.jd:.6f}", sunrise_jd=f"{sunrise_time.jd:.6f}", hours=f"{hours:.3f}", blocks=len(blocks))
+
+    try:
+        records = schedule_blocks(state.obs, state.sky, blocks, state.extinction, state.framerate)
+    except SchedulingError as exc:
+        row['status'] = f"error: {exc}"
+        return row
+    _save_score_cache([state.obs])
+
+    segments = collapse_segments(records)
+    schedule_file = os.path.join(state.out_dir, f"schedule_{night}.csv")
+    with open(schedule_file, "w") as f:
+        f.write(SCHEDULE_HEADER + "\n")
+        for rec in segments:
+            f.write(format_schedule_row(rec) + "\n")
+
+    row.update(
+        scheduled_blocks=len(records),
+        segments=len(segments),
+        unique_fields=len({rec['field_id'] for rec in records}),
+        mean_score=f"{math.fsum(rec['score'] for rec in records) / len(records):.2f}" if records else "",
+        status="ok" if records else "empty",
+        schedule_file=os.path.basename(schedule_file),
+    )
+    return row
+
+
+def run_season(args) -> int:
+    """Season batch mode: schedule every night from --start-date to --end-date (inclusive)."""
+    try:
+        first = datetime.date.fromisoformat(args.start_date)
+        last = datetime.date.fromisoformat(args.end_date or args.start_date)
+    except ValueError as exc:
+        print(f"ERROR: could not parse season dates: {exc}", file=sys.stderr)
+        return 2
+    if last < first:
+        print(f"ERROR: end-date ({last}) must not precede start-date ({first}).", file=sys.stderr)
+        return 2
+
+    nights = [(first + datetime.timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(nights)))
+    os.makedirs(args.out_dir, exist_ok=True)
+    initargs = (args.fields, args.models, args.framerate, args.extinction, args.out_dir, _config_options(args), nights)
+
+    try:
+        if workers == 1:
+            _init_season_worker(*initargs)
+            rows = [_schedule_season_night(night) for night in nights]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_season_worker, initargs=initargs) as pool:
+                rows = list(pool.map(_schedule_season_night, nights))
+    except Exception as exc:
+        print(f"ERROR: season run failed: {exc}", file=sys.stderr)
+        return 1
+
+    summary_file = os.path.join(args.out_dir, "summary.csv")
+    with open(summary_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=_SEASON_SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    failed = [row['night'] for row in rows if str(row['status']).startswith("error")]
+    print(f"Scheduled {len(nights) - len(failed)}/{len(nights)} nights with {workers} worker(s); summary: {summary_file}")
+    for night in failed:
+        print(f"ERROR: night {night} failed; see {summary_file}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_array(args, out=None, err=None) -> int:
+    """Array mode: co-point the telescopes for one night and write the shared schedule file."""
+    from scheduler import array
+
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    timings = _Timings(enabled=args.timings)
+    started = time.perf_counter()
+
+    telescopes = [name.strip().upper() for name in args.telescopes.split(",") if name.strip()]
+    unknown = [name for name in telescopes if name not in array.TELESCOPE_NAMES]
+    if unknown or not telescopes:
+        print(f"ERROR: --telescopes must name some of {', '.join(array.TELESCOPE_NAMES)}; got {args.telescopes!r}.", file=err)
+        return 2
+    if args.telescope is not None and args.telescope not in telescopes:
+        print(f"ERROR: --telescope {args.telescope} is not one of the scheduled telescopes {telescopes}.", file=err)
+        return 2
+    if args.sunset_jd >= args.sunrise_jd:
+        print(f"ERROR: sunset-jd ({args.sunset_jd}) must be < sunrise-jd ({args.sunrise_jd}).", file=err)
+        return 2
+    try:
+        overrides = array.load_overrides(args.array_config)
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: could not read array config: {exc}", file=err)
+        return 2
+
+    with timings.phase("import"):
+        modules = _scheduler_modules()
+        from astropy.time import Time
+
+    sunset_time = Time(args.sunset_jd, format='jd')
+    sunrise_time = Time(args.sunrise_jd, format='jd')
+    try:
+        with timings.phase("catalog-load"):
+            sky = modules.sky.load_fields(args.fields)
+    except Exception as exc:
+        print(f"ERROR: could not load fields from {args.fields}: {exc}", file=err)
+        return 2
+    try:
+        with timings.phase("model-load"):
+            config = modules.SchedulerConfig(
+                fps=args.framerate, sensitivity_model_loc=args.models, **_config_options(args)
+            )
+            telescope_array = array.TelescopeArray(config, telescopes, overrides)
+    except Exception as exc:
+        print(f"ERROR: could not initialize the array observatories: {exc}", file=err)
+        return 2
+
+    blocks = _build_blocks(sunset_time, sunrise_time)
+    try:
+        with timings.phase("schedule"):
+            records = telescope_array.schedule(sky, blocks, args.extinction, args.framerate, log=err)
+    except Exception as exc:
+        print(f"ERROR: array scheduling failed: {exc}", file=err)
+        return 1
+    _report_score_cache(telescope_array.observatories, timings, err)
+
+    segments = {name: collapse_segments(rows) for name, rows in records.items()}
+    night = {
+        'sunset_jd': args.sunset_jd, 'sunrise_jd': args.sunrise_jd, 'framerate': args.framerate,
+        'extinction': args.extinction, 'fields': os.path.abspath(args.fields),
+    }
+    try:
+        array.write_schedule(args.array_file, segments, night)
+    except OSError as exc:
+        print(f"ERROR: could not write array schedule {args.array_file}: {exc}", file=err)
+        return 1
+    print(
+        f"Wrote co-pointed schedules for {', '.join(telescopes)} "
+        f"({len(telescope_array.observatories)} distinct config(s)) to {args.array_file}",
+        file=err,
+    )
+    if args.telescope is not None:
+        out.write(format_schedule(segments[args.telescope]))
+
+    timings.phases.append(("total", time.perf_counter() - started))
+    timings.report(err)
+    return 0
+
+
+def print_array_schedule(args, out=None, err=None) -> int:
+    """`--telescope NAME`: print that telescope's block from the shared array schedule file."""
+    from scheduler import array
+
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    try:
+        segments = array.read_schedule(args.array_file, args.telescope, args.sunset_jd, args.sunrise_jd)
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: could not read array schedule: {exc}", file=err)
+        return 2
+    out.write(format_schedule(segments))
+    return 0
+
+
+def _config_options(args):
+    """`SchedulerConfig` keyword arguments set from the command line (besides fps and models)."""
+    return {
+        'coordinate_backend': args.coordinate_backend,
+        'score_backend': args.score_backend,
+        'score_cache_size': args.score_cache_size,
+        'score_cache_airmass_step': args.score_cache_airmass_step,
+        'score_cache_path': args.score_cache_file or "",
+        'scoring_memory_mb': args.scoring_memory_mb,
+        'ephemeris_path': args.ephemeris or "",
+    }
+
+
+def _save_score_cache(observatories, err=None) -> None:
+    """Persist the observatories' score caches to their `score_cache_path`, merged into one file."""
+    caches = [obs.engine.score_cache for obs in observatories if obs.engine.score_cache is not None]
+    if not caches or not caches[0].path:
+        return
+    for other in caches[1:]:
+        caches[0].merge(other)
+    try:
+        caches[0].save()
+    except OSError as exc:
+        if err is not None:
+            print(f"WARNING: could not save score cache {caches[0].path}: {exc}", file=err)
+
+
+def _report_score_cache(observatories, timings, err) -> None:
+    """Add the score caches' hit rates to the timing report and save them."""
+    for obs in observatories:
+        if obs.engine.score_cache is not None:
+            timings.notes.append(("score-cache", obs.engine.score_cache.describe()))
+    _save_score_cache(observatories, err)
+
+
+def _load_resources(args, err, timings=None):
+    """Build the Observatory and load the catalog for `args`; None (after an ERROR) on failure."""
+    timings = _Timings() if timings is None else timings
+    with timings.phase("import"):
+        modules = _scheduler_modules()
+
+    try:
+        config = modules.SchedulerConfig(
+            fps=args.framerate, sensitivity_model_loc=args.models, **_config_options(args)
+        )
+    except Exception as exc:
+        print(f"ERROR: could not build SchedulerConfig: {exc}", file=err)
+        return None
+
+    try:
+        with timings.phase("catalog-load"):
+            sky = modules.sky.load_fields(args.fields)
+    except Exception as exc:
+        print(f"ERROR: could not load fields from {args.fields}: {exc}", file=err)
+        return None
+
+    try:
+        with timings.phase("model-load"):
+            obs = modules.Observatory(config)
+    except Exception as exc:
+        print(f"ERROR: could not initialize Observatory (missing model?): {exc}", file=err)
+        return None
+
+    return obs, sky
+
+
+def _file_stamp(path):
+    """(size, mtime_ns) of `path`, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _ResidentResources:
+    """`_load_resources` for the warm service: the Observatory/catalog of the latest (fields, models, framerate, backend).
+
+    Keys include the size and mtime of the fields file (and its compiled
+    catalog), the noise model and the ephemeris table, so editing or
+    recompiling any of them reloads on the next request. Only the latest
+    key's resources and night cache are kept.
+    """
+
+    def __init__(self):
+        self._loaded = None
+        self._night = None
+
+    @staticmethod
+    def _key(args):
+        fields = os.path.abspath(args.fields)
+        models = os.path.abspath(args.models)
+        model_file = models if models.lower().endswith(".h5") else os.path.join(models, "temporal_snr_models.h5")
+        stamps = (
+            _file_stamp(fields),
+            _file_stamp(os.path.splitext(fields)[0] + ".npz"),
+            _file_stamp(model_file),
+            _file_stamp(args.ephemeris) if args.ephemeris else None,
+        )
+        return (fields, models, args.framerate) + tuple(sorted(_config_options(args).items())) + stamps
+
+    def night_cache(self, args):
+        """Per-block (and per-step) results of the latest night requested for these resources.
+
+        Requests for the same night, e.g. `--resume-from-jd` re-plans, share
+        one dict; a request for another night or other resources starts a
+        fresh one.
+        """
+        key = (self._key(args), args.sunset_jd, args.sunrise_jd)
+        if self._night is None or self._night[0] != key:
+            self._night = (key, {})
+        return self._night[1]
+
+    def __call__(self, args, err, timings=None):
+        key = self._key(args)
+        if self._loaded is None or self._loaded[0] != key:
+            self._loaded = None
+            loaded = _load_resources(args, err, timings)
+            if loaded is None:
+                return None
+            self._loaded = (key, loaded)
+        return self._loaded[1]
+
+
+def run_night(args, out=None, err=None, resources=_load_resources) -> int:
+    """Single-night mode: schedule [--sunset-jd, --sunrise-jd] and print the schedule block to `out`."""
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    timings = _Timings(enabled=getattr(args, 'timings', False))
+    started = time.perf_counter()
+    exit_code = _run_night(args, out, err, resources, timings)
+    timings.phases.append(("total", time.perf_counter() - started))
+    timings.report(err)
+    return exit_code
+
+
+def _run_night(args, out, err, resources, timings) -> int:
+    if args.sunset_jd >= args.sunrise_jd:
+        print(f"ERROR: sunset-jd ({args.sunset_jd}) must be < sunrise-jd ({args.sunrise_jd}).", file=err)
+        return 2
+
+    with timings.phase("import"):
+        from astropy.time import Time
+
+    if args.robustness < 0 or args.extinction_jitter < 0:
+        print("ERROR: --robustness and --extinction-jitter must not be negative.", file=err)
+        return 2
+    if args.robustness and args.score_backend != "count":
+        print("ERROR: --robustness samples the count score; it cannot be combined with --score-backend event_rate.", file=err)
+        return 2
+    if args.robustness and args.optimizer == "dp":
+        print("ERROR: --robustness evaluates the greedy hour blocks; it cannot be combined with --optimizer dp.", file=err)
+        return 2
+    if args.framerate_sweep and (args.optimizer == "dp" or args.robustness):
+        print("ERROR: --framerate-sweep picks per greedy hour block; it cannot be combined with --optimizer dp or --robustness.", file=err)
+        return 2
+    if args.resume_from_jd is not None and not args.sunset_jd <= args.resume_from_jd < args.sunrise_jd:
         print(
-            f"{rec['name']},"
-            f"{rec['ra_deg']:.6f},"
-            f"{rec['dec_deg']:.6f},"
-            f"{rec['start_jd']:.6f},"
-            f"{rec['alt']:.2f},"
-            f"{rec['az']:.2f},"
-            f"{rec['ha']:.3f},"
-            f"{rec['airmass']:.2f},"
-            f"{rec['score']:.2f},"
-            f"{rec['nstars']}"
+            f"ERROR: resume-from-jd ({args.resume_from_jd}) must lie in [sunset-jd, sunrise-jd).", file=err
         )
-    print("=== SCHEDULE END ===")
+        return 2
+
+    try:
+        sunset_time = Time(args.sunset_jd, format='jd')
+        sunrise_time = Time(args.sunrise_jd, format='jd')
+        resume_time = None if args.resume_from_jd is None else Time(args.resume_from_jd, format='jd')
+    except Exception as exc:
+        print(f"ERROR: could not parse JD values: {exc}", file=err)
+        return 2
+
+    loaded = resources(args, err, timings)
+    if loaded is None:
+        return 2
+    obs, sky = loaded
+    cache = resources.night_cache(args) if isinstance(resources, _ResidentResources) else None
+    try:
+        return _schedule_night(args, out, err, obs, sky, cache, timings, sunset_time, sunrise_time, resume_time)
+    finally:
+        _report_score_cache([obs], timings, err)
+
 
+def _schedule_night(args, out, err, obs, sky, cache, timings, sunset_time, sunrise_time, resume_time) -> int:
+
+    if args.optimizer == "dp":
+        try:
+            records = plan_night_dp(obs, sky, sunset_time, sunrise_time, args, timings, resume_time, cache)
+        except SchedulingError as exc:
+            print(f"ERROR: {exc}", file=err)
+            return 1
+        if not records:
+            print("WARNING: no field is eligible at any step of the night.", file=err)
+        for rec in records:
+            rec.setdefault('framerate', args.framerate)
+        out.write(format_schedule(records, args.framerate_column))
+        return 0
+
+    blocks = _build_blocks(sunset_time, sunrise_time)
+    if not blocks:
+        print("ERROR: empty observing window; no blocks to schedule.", file=err)
+        return 2
+    if resume_time is not None:
+        blocks = remaining_blocks(blocks, resume_time)
+
+    framerates = sorted(obs._SUPPORTED_SCHEDULING_FRAMERATES) if args.framerate_sweep else None
+    try:
+        records = schedule_blocks(
+            obs, sky, blocks, extinction=args.extinction, framerate=args.framerate, log=err, timings=timings,
+            cache=cache, framerates=framerates,
+        )
+    except SchedulingError as exc:
+        print(f"ERROR: {exc}", file=err)
+        return 1
+
+    # Emit the delimited, CSV-formatted schedule block.
+    segments = collapse_segments(records)
+    if resume_time is not None:
+        segments = start_at(obs, sky, segments, resume_time, blocks[0][1])
+    out.write(format_schedule(segments, args.framerate_column))
+
+    if args.robustness:
+        try:
+            with timings.phase("robustness"):
+                rows = robustness_rows(obs, sky, blocks, args, log=err)
+        except SchedulingError as exc:
+            print(f"ERROR: {exc}", file=err)
+            return 1
+        out.write(format_robustness(rows))
     return 0
 
 
+def _serve(parser, args) -> int:
+    """`--serve`: keep the scheduler warm and answer single-night and --telescope requests from `service` clients."""
+    resources = _ResidentResources()
+    if resources(args, sys.stderr) is None:
+        return 2
+
+    def handle(request):
+        out, err = io.StringIO(), io.StringIO()
+        # A fresh warnings scope per request: a resident process would otherwise
+        # show each repeated warning only to the first client, unlike the CLI.
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err), warnings.catch_warnings():
+            warnings.simplefilter('default')
+            try:
+                request_args = parser.parse_args(request.get('argv', []))
+                if request_args.serve or request_args.start_date is not None or request_args.array:
+                    parser.error("the scheduler service only answers single-night requests")
+                foreign = _foreign_paths(args, request_args)
+                if foreign:
+                    parser.error(
+                        f"{', '.join(foreign)} must match the service's own; it does not open other paths"
+                    )
+                _check_mode_options(parser, request_args)
+                if request_args.telescope is not None:
+                    # As in `main`: a telescope's block comes from the shared array file.
+                    exit_code = print_array_schedule(request_args, out, err)
+                else:
+                    exit_code = run_night(request_args, out, err, resources)
+            except SystemExit as exc:
+                exit_code = exc.code if isinstance(exc.code, int) else 2
+        return {'exit_code': exit_code, 'stdout': out.getvalue(), 'stderr': err.getvalue()}
+
+    def ready(host, port):
+        print(f"Scheduler service listening on {host}:{port}", file=sys.stderr, flush=True)
+
+    service.serve(handle, args.host, args.port, ready=ready)
+    return 0
+
+
+# Options naming files the scheduler reads or writes; service requests may
+# not point them anywhere but where the service itself was started with.
+_SERVICE_PATH_OPTIONS = (
+    ('fields', "--fields"),
+    ('models', "--models"),
+    ('ephemeris', "--ephemeris"),
+    ('score_cache_file', "--score-cache-file"),
+    ('array_file', "--array-file"),
+)
+
+
+def _foreign_paths(service_args, request_args):
+    """Flags of the path options on which `request_args` differs from the service's `service_args`."""
+    def resolved(value):
+        return os.path.abspath(value) if value else None
+
+    return [
+        flag for attr, flag in _SERVICE_PATH_OPTIONS
+        if resolved(getattr(request_args, attr)) != resolved(getattr(service_args, attr))
+    ]
+
+
+def _check_mode_options(parser, args):
+    """Reject (via `parser.error`) options that the mode `args` selects would ignore.
+
+    Modes: season (--start-date), array (--array), reading the shared array
+    file (--telescope alone) and single-telescope nights (the rest).
+    """
+    dp_options = _changed_options(parser, args, _DP_OPTIONS)
+    if args.resume_from_jd is not None and (args.start_date is not None or args.array or args.telescope is not None):
+        parser.error("--resume-from-jd re-plans single-telescope night runs; it cannot be combined with "
+                     "--start-date, --array or --telescope")
+    if args.start_date is not None:
+        if args.framerate_sweep or args.framerate_column:
+            parser.error("--framerate-sweep and --framerate-column apply to single-night runs, not --start-date")
+        if dp_options:
+            parser.error(f"dp planner options ({', '.join(dp_options)}) apply to single-telescope night runs, not --start-date")
+        return
+    if args.telescope is not None and not args.array:
+        if dp_options:
+            parser.error(f"dp planner options ({', '.join(dp_options)}) apply to single-telescope night runs, not --telescope")
+        return
+    _require_night_window(parser, args)
+    if args.robustness and args.array:
+        parser.error("--robustness applies to single-telescope night runs, not --array")
+    if (args.framerate_sweep or args.framerate_column) and args.array:
+        parser.error("--framerate-sweep and --framerate-column apply to single-telescope night runs, not --array")
+    if dp_options and args.array:
+        parser.error(f"dp planner options ({', '.join(dp_options)}) apply to single-telescope night runs, not --array")
+
+
+# The slew-aware planner's options (`optimizer.plan_night`); only single-telescope night runs plan with it.
+_DP_OPTIONS = ('optimizer', 'step_minutes', 'switch_minutes', 'min_dwell_minutes')
+
+
+def _changed_options(parser, args, dests):
+    """Flags among `dests` that `args` sets to something other than their default."""
+    return ["--" + dest.replace('_', '-') for dest in dests if getattr(args, dest) != parser.get_default(dest)]
+
+
+def _require_night_window(parser, args):
+    if args.sunset_jd is None or args.sunrise_jd is None:
+        parser.error("--sunset-jd and --sunrise-jd are required unless --start-date is given")
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(description="Colibri full-night field scheduler.")
+    parser.add_argument("--sunset-jd", type=float, help="Sunset (start) time as Julian Date.")
+    parser.add_argument("--sunrise-jd", type=float, help="Sunrise (end) time as Julian Date.")
+    parser.add_argument("--framerate", type=int, default=40, help="Camera framerate in Hz (default 40).")
+    parser.add_argument("--extinction", type=float, default=0.0, help="Nominal atmospheric extinction (mag/airmass).")
+    parser.add_argument("--fields", default=_DEFAULT_FIELDS, help="Path to the fields JSON or a compiled .npz catalog (python -m scheduler.sky).")
+    parser.add_argument("--models", default=_DEFAULT_MODELS, help="Path to the sensitivity_models folder.")
+    parser.add_argument(
+        "--coordinate-backend", choices=("astropy", "fast"), default="astropy",
+        help="Field alt/az and hour angles: astropy transforms (default) or the closed-form fast path.",
+    )
+    parser.add_argument(
+        "--ephemeris", default=None,
+        help="Sun/Moon ephemeris table (.npy from python -m scheduler.ephemeris; default: none, astropy).",
+    )
+    planner = parser.add_argument_group("field selection")
+    planner.add_argument(
+        "--optimizer", choices=("greedy", "dp"), default="greedy",
+        help="greedy: best field per hour block (default); dp: slew-aware whole-night plan on a fine grid.",
+    )
+    planner.add_argument("--step-minutes", type=float, default=10.0, help="dp: scoring grid step in minutes (default 10).")
+    planner.add_argument("--switch-minutes", type=float, default=5.0, help="dp: dead time per field switch in minutes (default 5).")
+    planner.add_argument("--min-dwell-minutes", type=float, default=30.0, help="dp: minimum visit length in minutes (default 30).")
+    planner.add_argument(
+        "--score-backend", choices=("count", "event_rate"), default="count",
+        help="Field score: star count x velocity factor (default) or summed per-star occultation event rates.",
+    )
+    planner.add_argument(
+        "--framerate-sweep", action="store_true",
+        help="Pick the best (field, framerate) per block over every supported framerate in one pass.",
+    )
+    planner.add_argument(
+        "--framerate-column", action="store_true",
+        help="Append each row's framerate as a last 'framerate' column to the schedule CSV.",
+    )
+    planner.add_argument(
+        "--score-cache-size", type=int, default=0,
+        help="Cache per-field star counts for up to this many (field, airmass, extinction, framerate) entries (default 0: off).",
+    )
+    planner.add_argument(
+        "--score-cache-airmass-step", type=float, default=0.0,
+        help="Round airmasses to this step for scoring and cache keys (default 0: exact).",
+    )
+    planner.add_argument("--score-cache-file", default=None, help="Load the score cache from and save it to this .npz.")
+    planner.add_argument(
+        "--scoring-memory-mb", type=float, default=0.0,
+        help="Score blocks in star chunks within this many MB (default 0: one pass); best with a compiled .npz catalog.",
+    )
+    noise = parser.add_argument_group("robustness (Monte-Carlo)")
+    noise.add_argument(
+        "--robustness", type=int, default=0, metavar="N",
+        help="Also score every block under N noise realizations and report win probabilities (default 0: off).",
+    )
+    noise.add_argument(
+        "--extinction-jitter", type=float, default=0.0,
+        help="Std dev (mag/airmass) of the per-realization extinction jitter for --robustness (default 0).",
+    )
+    noise.add_argument("--robustness-seed", type=int, default=None, help="Random seed for --robustness (default: fresh).")
+    parser.add_argument(
+        "--resume-from-jd", type=float, default=None,
+        help="Re-plan only the rest of the night from this JD (e.g. after a weather hold).",
+    )
+    season = parser.add_argument_group("season batch mode")
+    season.add_argument("--start-date", help="Schedule every night from this local date (YYYY-MM-DD) instead of one JD window.")
+    season.add_argument("--end-date", help="Last night of the season, inclusive (default: --start-date).")
+    season.add_argument("--out-dir", default=_DEFAULT_SEASON_DIR, help="Directory for per-night CSVs and summary.csv.")
+    season.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    array_mode = parser.add_argument_group("telescope array")
+    array_mode.add_argument("--array", action="store_true", help="Co-point the array's telescopes and write --array-file.")
+    array_mode.add_argument(
+        "--telescopes", default="REDBIRD,GREENBIRD,BLUEBIRD",
+        help="Comma-separated telescopes scheduled by --array (default all three).",
+    )
+    array_mode.add_argument("--array-config", help="JSON of per-telescope SchedulerConfig overrides.")
+    array_mode.add_argument(
+        "--array-file", default=_DEFAULT_ARRAY_FILE, help=f"Shared array schedule (default {_DEFAULT_ARRAY_FILE})."
+    )
+    array_mode.add_argument(
+        "--telescope", type=str.upper,
+        help="Print this telescope's schedule block from --array-file (after scheduling it with --array).",
+    )
+    server = parser.add_argument_group("warm service (clients: scheduler/service.py)")
+    server.add_argument("--serve", action="store_true", help="Keep the scheduler loaded and answer requests on a localhost socket.")
+    server.add_argument("--host", default=service.DEFAULT_HOST, help=f"Address to listen on (default {service.DEFAULT_HOST}).")
+    server.add_argument("--port", type=int, default=service.DEFAULT_PORT, help=f"Port to listen on (default {service.DEFAULT_PORT}).")
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="Report import, catalog-load, model-load and per-block times on stderr.",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        return _serve(parser, args)
+    _check_mode_options(parser, args)
+    if args.start_date is not None:
+        return run_season(args)
+    if args.telescope is not None and not args.array:
+        return print_array_schedule(args)
+    if args.array:
+        return run_array(args)
+    return run_night(args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -12,8 +12,8 @@ this module so it imports with no `src.` package on the path.
 
 from __future__ import annotations
 
-import copy
 import math
+import warnings
 from pathlib import Path
 from typing import Any, Dict, Mapping, MutableMapping, Optional, Tuple
 
@@ -28,9 +28,13 @@ from astropy.coordinates import (
     get_body,
     get_sun,
 )
+from astropy.time import Time
 
-from . import constants, helpers
+from . import constants, ephemeris, event_rate, helpers, horizon, spatial, twilight
+from .catalog import FieldCatalog
 from .noise_model import ColibriNoiseModel
+from .scoring import ScoringEngine
+from .visibility import VisibilityGrid
 
 
 class Observatory:
@@ -49,6 +53,25 @@ class Observatory:
         self.location = EarthLocation(lat=config.latitude, lon=config.longitude, height=config.height)
         self.utc_offset = -5 * u.hour
         self.telescope = self.Telescope(self.config)
+        self.engine = ScoringEngine(self)
+        self._visibility_grid: Optional[VisibilityGrid] = None
+        ephemeris_path = getattr(config, 'ephemeris_path', "")
+        self.ephemeris = ephemeris.load_table(ephemeris_path, self.location)
+        if ephemeris_path and self.ephemeris is None:
+            warnings.warn(
+                f"Ephemeris table {ephemeris_path} is missing or was built for another site; using astropy.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+        backend = getattr(config, 'coordinate_backend', "astropy")
+        if backend not in horizon.BACKENDS:
+            raise ValueError(f"Unknown coordinate backend {backend!r} (expected one of {horizon.BACKENDS}).")
+        self.horizon = horizon.HorizonModel(self.location) if backend == "fast" else None
+
+        score_backend = getattr(config, 'score_backend', "count")
+        if score_backend not in event_rate.BACKENDS:
+            raise ValueError(f"Unknown score backend {score_backend!r} (expected one of {event_rate.BACKENDS}).")
 
     @staticmethod
     def _filter_dict_arrays_inplace(table: MutableMapping[Any, Any], mask: np.ndarray) -> None:
@@ -57,8 +80,30 @@ class Observatory:
             if isinstance(value, np.ndarray):
                 table[key] = value[mask]
 
-    def _field_hour_angle(self, obstime, ecl_lon_deg: float, ecl_lat_deg: float) -> float:
-        """Compute hour angle (hours) for a field centroid at `obstime`."""
+    def _field_hour_angle(
+        self,
+        obstime,
+        ecl_lon_deg: float,
+        ecl_lat_deg: float,
+        catalog: Optional[FieldCatalog] = None,
+        field_position: Optional[int] = None,
+    ) -> float:
+        """Compute hour angle (hours) for a field centroid at `obstime`.
+
+        When `catalog` and `field_position` (the field's position in it) are
+        given, the value is read from the cached visibility grid if that grid
+        was built for `catalog` and has `obstime`; otherwise, with the fast
+        coordinate backend, it is evaluated in closed form.
+        """
+        if catalog is not None and field_position is not None:
+            grid = self._visibility_grid
+            if grid is not None and grid.covers(catalog, obstime):
+                value = grid.hour_angle[grid.row(obstime), field_position]
+                if np.isfinite(value):
+                    return round(float(value), 3)
+            if self.horizon is not None:
+                return round(float(self.horizon.hour_angle(catalog, obstime)[0, field_position]), 3)
+
         lst_hours = obstime.sidereal_time('mean', self.location.lon).value
         top_ecliptic = SkyCoord(ecl_lon_deg, ecl_lat_deg, frame='geocentrictrueecliptic', unit=(u.deg, u.deg))
         top_fk5 = top_ecliptic.transform_to(FK5)
@@ -112,23 +157,117 @@ class Observatory:
         velocity_factor = min(1.0, (target_velocity / field_velocity) ** 2) # detection efficiency factor given the field velocity and the Nyquist velocity for the framerate
         return float(nstars) * field_velocity * velocity_factor
 
+    def _consolidated_scheduling_scores(self, nstars: np.ndarray, solar_elongation_deg: np.ndarray, framerate: float) -> np.ndarray:
+        """Array version of `_consolidated_scheduling_score` (same model, elementwise)."""
+        nstars = np.asarray(nstars)
+        opposition_distance = np.abs(np.asarray(solar_elongation_deg, dtype=float) - 180.0)
+        effective_elongation = 180.0 - np.abs(opposition_distance)
+
+        field_velocity = np.abs(helpers.get_transverse_velocities(40, effective_elongation))
+        target_velocity = self._target_velocity_for_framerate(framerate)
+
+        scored = (nstars > 0) & (field_velocity > 0.0)
+        safe_velocity = np.where(scored, field_velocity, 1.0)
+        velocity_factor = np.minimum(1.0, (target_velocity / safe_velocity) ** 2)
+        return np.where(scored, nstars * field_velocity * velocity_factor, 0.0)
+
+    @staticmethod
+    def _field_catalog(sky) -> FieldCatalog:
+        """Return the packed `FieldCatalog` for `sky`, building and caching it on first use."""
+        catalog = getattr(sky, 'catalog', None)
+        if catalog is None or not catalog.describes(sky.fields):
+            catalog = FieldCatalog.from_fields(sky.fields)
+            try:
+                sky.catalog = catalog
+            except AttributeError:
+                pass
+        return catalog
+
+    def visibility_grid(self, sky, times) -> VisibilityGrid:
+        """Return (and cache) the `VisibilityGrid` of `sky`'s fields over `times`.
+
+        Block times that lie on the cached grid are then served by lookup in
+        `_visible_field_mask`, `_field_hour_angle` and `run_scheduler`. A new
+        call replaces the cache unless the cached grid already covers `times`.
+        """
+        catalog = self._field_catalog(sky)
+        times = Time(list(times)) if not isinstance(times, Time) else times.reshape(-1)
+        grid = self._visibility_grid
+        if grid is not None and grid.covers(catalog, *times):
+            return grid
+        grid = VisibilityGrid.compute(
+            self.location, catalog, times, ephemeris=self.ephemeris, horizon=self.horizon,
+            positions=self._altitude_candidates(catalog, times),
+        )
+        self._visibility_grid = grid
+        return grid
+
+    def _visibility_rows(self, sky, *times) -> Tuple[VisibilityGrid, Tuple[int, ...]]:
+        """Return a grid holding `times` and their rows: the cached one if it covers them."""
+        catalog = self._field_catalog(sky)
+        grid = self._visibility_grid
+        if grid is None or not grid.covers(catalog, *times):
+            grid = VisibilityGrid.compute(
+                self.location, catalog, times, ephemeris=self.ephemeris, horizon=self.horizon,
+                positions=self._altitude_candidates(catalog, Time(list(times))),
+            )
+        return grid, tuple(grid.row(time) for time in times)
+
+    def _altitude_candidates(self, catalog: FieldCatalog, times) -> np.ndarray:
+        """Catalog positions of the fields that may clear the altitude cut at any of `times`."""
+        return self.fields_above_altitude(catalog, times, float(self.config.altitude_threshold))
+
+    def fields_above_altitude(self, sky, times, altitude_deg: float) -> np.ndarray:
+        """Catalog positions of the fields within the cap above `altitude_deg` at any of `times`.
+
+        A cone query around the zenith on the catalog's `spatial.FieldIndex`,
+        padded by `spatial.FRAME_ERROR_DEG`, so it returns a superset of the
+        fields an exact AltAz transform puts above `altitude_deg`. `sky` may
+        also be a `FieldCatalog`.
+        """
+        catalog = sky if isinstance(sky, FieldCatalog) else self._field_catalog(sky)
+        times = Time(times).reshape(-1)
+        lon, lat = spatial.zenith_ecliptic(
+            times.utc.jd, self.location.lat.deg, self.location.lon.deg
+        )
+        radius = 90.0 - float(altitude_deg) + spatial.FRAME_ERROR_DEG
+        return catalog.spatial_index().cones(lon, lat, radius)
+
+    def fields_near_moon(self, sky, time, radius_deg: float) -> np.ndarray:
+        """Catalog positions of the fields within `radius_deg` of the (geocentric) Moon at `time`.
+
+        The Moon's topocentric place differs by up to ~1 deg; pad `radius_deg`
+        for a superset of an AltAz-frame cut such as the Moon exclusion.
+        """
+        catalog = self._field_catalog(sky)
+        time = Time(time)
+        if self.ephemeris is not None and self.ephemeris.covers(time):
+            ra, dec = self.ephemeris.interpolate('moon_ra', time), self.ephemeris.interpolate('moon_dec', time)
+        else:
+            moon = get_body('moon', time)
+            ra, dec = moon.ra.deg, moon.dec.deg
+        lon, lat = spatial.equatorial_to_ecliptic(ra, dec)
+        return catalog.spatial_index().cone(float(lon), float(lat), radius_deg)
+
+    def fields_near_opposition(self, sky, time, radius_deg: float) -> np.ndarray:
+        """Catalog positions of the fields within `radius_deg` of the anti-solar point at `time`."""
+        catalog = self._field_catalog(sky)
+        lon, lat = spatial.opposition_ecliptic(Time(time).utc.jd)
+        return catalog.spatial_index().cone(float(lon), float(lat), radius_deg)
+
     def _visible_field_mask(self, observation_start, observation_end, sky) -> Tuple[np.ndarray, np.ndarray]:
         """Return (mask, mean_altitudes_deg) for fields visible over an interval."""
-        fields_altaz_start = self.get_field_altaz(observation_start, sky)
-        fields_altaz_end = self.get_field_altaz(observation_end, sky)
+        grid, (start_row, end_row) = self._visibility_rows(sky, observation_start, observation_end)
 
-        altitudes_start = fields_altaz_start.alt.deg
-        altitudes_end = fields_altaz_end.alt.deg
+        altitudes_start = grid.alt[start_row]
+        altitudes_end = grid.alt[end_row]
         mean_altitudes = (altitudes_start + altitudes_end) / 2.0
 
         above_horizon_start = altitudes_start > self.config.altitude_threshold
         above_horizon_end = altitudes_end > self.config.altitude_threshold
         above_horizon = above_horizon_start & above_horizon_end
 
-        moon_coord = get_body('moon', observation_start, location=self.location)
-        moon_altaz = moon_coord.transform_to(AltAz(obstime=observation_start, location=self.location))
-        moon_sep = fields_altaz_start.separation(moon_altaz).deg
-        moon_distances = moon_sep > self._MOON_EXCLUSION_DEG
+        moon_distances = grid.moon_separation[start_row] > self._MOON_EXCLUSION_DEG
 
         return above_horizon & moon_distances, mean_altitudes
 
@@ -253,63 +392,78 @@ class Observatory:
 
         Selects among visible fields (altitude cut + Moon exclusion), applies
         atmospheric corrections, predicts SNR, computes heuristic scores, and
-        returns the top field plus diagnostic stats.
+        returns the top field plus diagnostic stats. All visible fields are
+        scored together by `scoring.ScoringEngine`; the result matches running
+        `correct_field` + `_score_field` on each field.
         """
+        top_field, top_field_stats, _framerate = self._schedule_best(
+            sky, observation_start, observation_end, weather, [framerate]
+        )
+        return top_field, top_field_stats
 
-        fields = copy.deepcopy(sky.fields)
+    def schedule_observation_sweep(self, sky, observation_start, observation_end, weather, framerates=None):
+        """`schedule_observation` over several framerates at once: the best (field, framerate).
 
-        visible_mask, mean_altitudes = self._visible_field_mask(observation_start, observation_end, sky)
-        visible_fields = {key: fields[key] for key in fields if visible_mask[key]}
+        `framerates` defaults to every supported scheduling framerate. The
+        framerate-independent work is shared (`ScoringEngine.score_block_sweep`),
+        and the pick is the highest score over all framerates (ties go to the
+        lower framerate). The stats gain a 'Framerate' entry.
+        """
+        if framerates is None:
+            framerates = sorted(self._SUPPORTED_SCHEDULING_FRAMERATES)
+        top_field, top_field_stats, framerate = self._schedule_best(
+            sky, observation_start, observation_end, weather, list(framerates)
+        )
+        top_field_stats['Framerate'] = framerate
+        return top_field, top_field_stats
 
-        if not visible_fields:
-            raise ValueError("No visible fields found for this time window (altitude cut + Moon exclusion).")
+    def _schedule_best(self, sky, observation_start, observation_end, weather, framerates):
+        """The top (field, stats, framerate) over `framerates` (see `schedule_observation`)."""
+        catalog = self._field_catalog(sky)
 
-        for key in visible_fields.keys():
-            visible_fields[key][constants.FieldDataKeys.ALTITUDE_REG] = mean_altitudes[key]
+        visible_mask, mean_altitudes = self._visible_field_mask(observation_start, observation_end, sky)
+        visible_positions = np.flatnonzero(visible_mask)
 
-        corrected_visible_fields: Dict[Any, MutableMapping[Any, Any]] = {}
-        for field_key in visible_fields:
-            corrected_visible_fields[field_key] = self.correct_field(
-                visible_fields[field_key], weather, mean_altitudes[field_key]
-            )
+        if visible_positions.size == 0:
+            raise ValueError("No visible fields found for this time window (altitude cut + Moon exclusion).")
 
-        for field_key in corrected_visible_fields:
-            self._score_field(corrected_visible_fields[field_key], observation_start=observation_start, framerate=framerate)
+        framerate_values = [self._validate_scheduling_framerate(framerate) for framerate in framerates]
+        blocks = self.engine.score_block_sweep(
+            catalog,
+            visible_positions,
+            mean_altitudes[visible_positions],
+            weather,
+            observation_start,
+            framerate_values,
+        )
 
         # Find the field with the maximum OBSERVATION_SCORE, treating score==0 as excluded.
-        eligible_keys = [
-            k
-            for k, f in corrected_visible_fields.items()
-            if float(f.get('OBSERVATION_SCORE', 0.0)) > 0.0
-        ]
-
-        if not eligible_keys:
+        # np.argmax keeps the first maximum, matching max() over fields in catalog order;
+        # across framerates the first (lowest) one keeps a tied maximum.
+        best = None
+        for framerate_value, block in zip(framerate_values, blocks):
+            eligible = block.score > 0.0
+            if np.any(eligible):
+                index = int(np.argmax(np.where(eligible, block.score, -np.inf)))
+                if best is None or block.score[index] > best[1].score[best[2]]:
+                    best = (framerate_value, block, index)
+
+        if best is None:
+            framerate = framerates[0] if len(framerates) == 1 else framerates
+            block = blocks[0]
             # Failure diagnostics: show stats for the *visible* fields (altitude cut + Moon exclusion).
-            visible_keys = list(corrected_visible_fields.keys())
+            visible_keys = [catalog.field_keys[p] for p in visible_positions]
             max_fields_to_print = 60
 
-            def _safe_float(value: Any) -> float:
-                try:
-                    return float(value)
-                except Exception:
-                    return float('nan')
-
             def _min_med_max(arr: np.ndarray) -> str:
                 finite = arr[np.isfinite(arr)]
                 if finite.size == 0:
                     return 'n/a'
                 return f"{np.min(finite):.2f}/{np.median(finite):.2f}/{np.max(finite):.2f}"
 
-            scores = np.array([
-                _safe_float(corrected_visible_fields[k].get('OBSERVATION_SCORE', 0.0)) for k in visible_keys
-            ])
-            elongs = np.array([
-                _safe_float(corrected_visible_fields[k].get('SOLAR_ELONGATION', float('nan'))) for k in visible_keys
-            ])
-            alts = np.array([
-                _safe_float(corrected_visible_fields[k].get(constants.FieldDataKeys.ALTITUDE_REG, float('nan')))
-                for k in visible_keys
-            ])
+            scores = np.asarray(block.score, dtype=float)
+            elongs = np.asarray(block.solar_elongation, dtype=float)
+            alts = np.asarray(block.altitude, dtype=float)
 
             header = (
                 "[schedule_observation] No eligible fields (OBSERVATION_SCORE > 0). "
@@ -327,25 +481,19 @@ class Observatory:
             print("  Visible fields (post-correction/scoring):")
             print("    key  alt_deg  solar_elong_deg  score  Nmag<thresh  N>SNR5  N>optimal")
 
-            sorted_keys = sorted(
-                visible_keys,
-                key=lambda k: _safe_float(corrected_visible_fields[k].get('SOLAR_ELONGATION', float('nan'))),
-            )
+            order = sorted(range(len(visible_keys)), key=lambda i: elongs[i])
 
             truncated = False
-            if len(sorted_keys) > max_fields_to_print:
+            if len(order) > max_fields_to_print:
                 truncated = True
-                sorted_keys = sorted_keys[:max_fields_to_print]
-
-            for k in sorted_keys:
-                f = corrected_visible_fields[k]
-                alt = _safe_float(f.get(constants.FieldDataKeys.ALTITUDE_REG, float('nan')))
-                elong = _safe_float(f.get('SOLAR_ELONGATION', float('nan')))
-                score = _safe_float(f.get('OBSERVATION_SCORE', 0.0))
-                nmag = f.get('COUNT_BELOW_MAG_THRESHOLD', 'n/a')
-                n5 = f.get('COUNT_ABOVE_5', 'n/a')
-                nopt = f.get('COUNT_ABOVE_OPTIMAL', 'n/a')
-                print(f"    {k:>3}  {alt:>7.2f}  {elong:>14.2f}  {score:>5.2f}  {str(nmag):>10}  {str(n5):>6}  {str(nopt):>9}")
+                order = order[:max_fields_to_print]
+
+            for i in order:
+                k = visible_keys[i]
+                nmag = int(block.count_below_mag_threshold[i])
+                n5 = int(block.count_above_5[i])
+                nopt = int(block.count_above_optimal[i])
+                print(f"    {k:>3}  {alts[i]:>7.2f}  {elongs[i]:>14.2f}  {scores[i]:>5.2f}  {str(nmag):>10}  {str(n5):>6}  {str(nopt):>9}")
 
             if truncated:
                 print(f"    ... (truncated; printed first {max_fields_to_print} of {len(visible_keys)} visible fields)")
@@ -355,15 +503,35 @@ class Observatory:
                 "See printed visible-field diagnostics above."
             )
 
-        top_field_key = max(eligible_keys, key=lambda k: corrected_visible_fields[k]['OBSERVATION_SCORE'])
-        top_field = corrected_visible_fields[top_field_key]
+        framerate_value, block, top_index = best
+        top_position = int(visible_positions[top_index])
+        top_field_key = catalog.field_keys[top_position]
+        if block.snr is None:
+            # Counts came from the score cache or chunks; re-score the winner for its star arrays.
+            top = slice(top_index, top_index + 1)
+            block = self.engine.score_block(
+                catalog,
+                visible_positions[top],
+                block.altitude[top],
+                weather,
+                observation_start,
+                framerate_value,
+                solar_elongation=block.solar_elongation[top],
+                airmass=block.airmass[top],
+                use_cache=False,
+                chunked=False,
+            )
+            top_index = 0
+        top_field = self.engine.field_table(catalog, block, top_index, sky.fields[top_field_key])
 
         visible_stars_mask = top_field[constants.FieldDataKeys.SNR] > self._SNR_VISIBILITY_THRESHOLD
         self._filter_dict_arrays_inplace(top_field, visible_stars_mask)
 
         top_ecl_lon = float(top_field[constants.FieldDataKeys.ELON_REG])
         top_ecl_lat = float(top_field[constants.FieldDataKeys.ELAT_REG])
-        top_ha = self._field_hour_angle(observation_start, top_ecl_lon, top_ecl_lat)
+        top_ha = self._field_hour_angle(
+            observation_start, top_ecl_lon, top_ecl_lat, catalog=catalog, field_position=top_position
+        )
 
         top_field_stats = {
             'Time': observation_start,
@@ -380,25 +548,38 @@ class Observatory:
             'AIRMASS': top_field.get(constants.FieldDataKeys.AIRMASS_REG),
         }
 
-        return top_field, top_field_stats
+        return top_field, top_field_stats, framerate_value
 
     def get_observable_hours(self, date):
-        """Return the observable hours and (sunset, sunrise) for a given date."""
-        delta_midnight = np.linspace(-12, 12, 1000) * u.hour
-        times = date + delta_midnight - self.utc_offset + 1
-        frame = AltAz(obstime=times, location=self.location)
-
-        sun_altaz = get_sun(times).transform_to(frame)
-        sun_altitudes = sun_altaz.alt
-
-        twilight_altitude = self.config.twilight_alt * u.deg
-        sunset_idx = np.where(sun_altitudes < twilight_altitude)[0][0]
-        sunrise_idx = np.where(sun_altitudes < twilight_altitude)[0][-1]
-        sunset_time = times[sunset_idx]
-        sunrise_time = times[sunrise_idx]
-        hours_per_night = (sunrise_time - sunset_time).to(u.hour).value
+        """Return the observable hours and (sunset, sunrise) for a given date.
+
+        `date` is the local date of the evening. The twilight crossings are
+        solved analytically (`twilight.night_bounds`). Raises ValueError if the
+        Sun never gets below the twilight altitude that night.
+        """
+        sunset_jd, sunrise_jd = self.twilight_bounds(date)
+        if not np.isfinite(sunset_jd):
+            raise ValueError(
+                f"The Sun stays above {self.config.twilight_alt} deg on the night of {getattr(date, 'iso', date)}."
+            )
+        sunset_time = Time(float(sunset_jd), format='jd', scale='utc')
+        sunrise_time = Time(float(sunrise_jd), format='jd', scale='utc')
+        hours_per_night = (float(sunrise_jd) - float(sunset_jd)) * 24.0
         return hours_per_night, sunset_time, sunrise_time
 
+    def twilight_bounds(self, dates):
+        """(sunset, sunrise) UTC JDs at the twilight altitude for the evenings of `dates`.
+
+        `dates` is a `Time` (scalar or array) of local dates; results have its
+        shape and are NaN on nights without twilight darkness. Solved nights
+        are cached, so a season can be solved in one call up front.
+        """
+        dates = Time(dates)
+        midnight_jd = (dates - self.utc_offset + 1).utc.jd
+        return twilight.night_bounds(
+            midnight_jd, self.location.lat.deg, self.location.lon.deg, float(self.config.twilight_alt)
+        )
+
     def get_observation_periods(self, date):
         """Split the night into observation periods (hour chunks + remainder)."""
         hours_per_night, sunset_time, sunrise_time = self.get_observable_hours(date)
@@ -415,8 +596,45 @@ class Observatory:
 
         return observation_periods
 
+    def field_geometry(self, sky, field_id: int, start, end) -> Dict[str, float]:
+        """Schedule-row geometry of one field observed over [`start`, `end`], on or off the grid.
+
+        Returns `alt` (mean of the start and end altitudes, as for a block),
+        `airmass` at that altitude, and `az` and `ha` at `start`. Used for a
+        visit that resumes part-way through a block or step.
+        """
+        catalog = self._field_catalog(sky)
+        position = catalog.position(field_id)
+        times = Time([start, end])
+        if self.horizon is not None:
+            alt, az = self.horizon.altaz(catalog, times, positions=np.array([position]))
+            alt, az = alt[:, 0], az[:, 0]
+        else:
+            centroid = SkyCoord(
+                float(catalog.elon[position]), float(catalog.elat[position]),
+                frame='geocentrictrueecliptic', unit=(u.deg, u.deg),
+            )
+            altaz = centroid.transform_to(AltAz(obstime=times, location=self.location))
+            alt, az = altaz.alt.deg, altaz.az.deg
+        mean_alt = float(np.mean(alt))
+        zenith_cos = math.cos(math.radians(90.0 - mean_alt))
+        return {
+            'alt': mean_alt,
+            'az': float(az[0]),
+            'ha': float(self._field_hour_angle(
+                start, float(catalog.elon[position]), float(catalog.elat[position]),
+                catalog=catalog, field_position=position,
+            )),
+            'airmass': 1.0 / zenith_cos if zenith_cos > 0 else float('nan'),
+        }
+
     def get_field_altaz(self, time, sky):
         """Return AltAz coordinates for each field centroid at `time`."""
+        if self.horizon is not None:
+            alt, az = self.horizon.altaz(self._field_catalog(sky), time)
+            frame = AltAz(obstime=time, location=self.location)
+            return SkyCoord(alt=alt[0] * u.deg, az=az[0] * u.deg, frame=frame)
+
         elons = [sky.fields[key][constants.FieldDataKeys.ELON_REG] for key in sky.fields]
         elats = [sky.fields[key][constants.FieldDataKeys.ELAT_REG] for key in sky.fields]
         coords = SkyCoord(elons, elats, frame='geocentrictrueecliptic', unit=(u.deg, u.deg))
@@ -425,7 +643,10 @@ class Observatory:
         return altaz
 
     def correct_field(self, field, weather, altitude):
-        """Correct field magnitudes for atmospheric extinction and distortion."""
+        """Correct field magnitudes for atmospheric extinction and distortion.
+
+        Returns a new field dict; `field` and its arrays are left untouched.
+        """
         corrected_field = field.copy()
 
         # zenith angle
@@ -433,7 +654,10 @@ class Observatory:
 
         # airmass and atmospheric extinction
         corrected_field[constants.FieldDataKeys.AIRMASS_REG] = 1 / np.cos(np.radians(corrected_field[constants.FieldDataKeys.ZENITH_REG]))
-        corrected_field[constants.GaiaDR3Keys.MAG] += weather * corrected_field[constants.FieldDataKeys.AIRMASS_REG]
+        # Rebind rather than `+=`: the input's MAG array may be a read-only catalog view.
+        corrected_field[constants.GaiaDR3Keys.MAG] = (
+            corrected_field[constants.GaiaDR3Keys.MAG] + weather * corrected_field[constants.FieldDataKeys.AIRMASS_REG]
+        )
 
         # distortion extinction
         field_centroid_lon = corrected_field[constants.FieldDataKeys.ELON_REG]
@@ -454,6 +678,6 @@ class Observatory:
         for j in range(len(radii) - 1):
             stellar_extinctions[star_total_distances > radii[j]] += radius_extinctions_differences[j]
 
-        corrected_field[constants.GaiaDR3Keys.MAG] += stellar_extinctions
+        corrected_field[constants.GaiaDR3Keys.MAG] = corrected_field[constants.GaiaDR3Keys.MAG] + stellar_extinctions
 
         return corrected_field
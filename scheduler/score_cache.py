@@ -0,0 +1,145 @@
+"""Bounded LRU cache of per-field star counts for `scoring.ScoringEngine`.
+
+A field's threshold counts (stars brighter than the magnitude threshold,
+above SNR 5, and above the optimal SNR within the angular-size limit) depend
+only on the field, its airmass, the extinction and the framerate. Consecutive
+blocks, re-plans and repeated runs of the same night (as when tuning)
+evaluate the same conditions again and again. `ScoreCache` keeps those counts,
+not the star arrays, keyed by
+
+    (context, catalog position, airmass, extinction, framerate)
+
+where `context` fingerprints everything else the counts depend on: the
+catalog's star columns, the distortion and threshold settings and the noise
+model file. The solar elongation only enters the closed-form scheduling score,
+which is recomputed from the cached counts at the exact elongation, so it
+needs no key and no quantization.
+
+With ``airmass_step > 0`` airmasses are rounded to multiples of the step and
+counts are evaluated at the rounded airmass, whether or not the entry was
+cached, so results are reproducible across cache states; with the default
+step of 0 keys are exact and a cached run matches an uncached one exactly.
+The least recently used entries are evicted beyond `max_entries`. With a
+`path`, entries are loaded from and saved to an ``.npz`` between runs.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+_FORMAT_VERSION = 1
+
+Key = Tuple[str, int, float, float, float]
+Counts = Tuple[int, int, int]
+
+
+class ScoreCache:
+    """LRU map from (context, position, airmass, extinction, framerate) to per-field counts."""
+
+    def __init__(self, max_entries: int, airmass_step: float = 0.0, path: str = ""):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got {max_entries}.")
+        if airmass_step < 0:
+            raise ValueError(f"airmass_step must not be negative, got {airmass_step}.")
+        self.max_entries = int(max_entries)
+        self.airmass_step = float(airmass_step)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Key, Counts]" = OrderedDict()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @classmethod
+    def from_config(cls, config) -> Optional["ScoreCache"]:
+        """The cache configured by `score_cache_size` etc., or None when the size is 0."""
+        size = int(getattr(config, 'score_cache_size', 0) or 0)
+        if size <= 0:
+            return None
+        return cls(
+            size,
+            airmass_step=float(getattr(config, 'score_cache_airmass_step', 0.0) or 0.0),
+            path=str(getattr(config, 'score_cache_path', "") or ""),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def quantize(self, airmass: np.ndarray) -> np.ndarray:
+        """The airmass at which counts are evaluated and keyed."""
+        if self.airmass_step <= 0.0:
+            return airmass
+        return np.round(airmass / self.airmass_step) * self.airmass_step
+
+    def get(self, key: Key) -> Optional[Counts]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Key, value: Counts) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def merge(self, other: "ScoreCache") -> None:
+        """Add `other`'s entries, as most recently used."""
+        for key, value in other._entries.items():
+            self.put(key, value)
+
+    def describe(self) -> str:
+        """One-line hit/miss summary for the timing report."""
+        lookups = self.hits + self.misses
+        rate = f"{100.0 * self.hits / lookups:.0f}%" if lookups else "n/a"
+        return f"{self.hits} hits / {self.misses} misses ({rate} hit rate), {len(self)} entries"
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the entries (oldest first) to an ``.npz`` at `path` (default: `self.path`), atomically."""
+        path = path or self.path
+        if not path:
+            return
+        keys = list(self._entries)
+        contexts = sorted({key[0] for key in keys})
+        context_index = {context: i for i, context in enumerate(contexts)}
+        arrays = {
+            'index': np.asarray(json.dumps({'format_version': _FORMAT_VERSION, 'contexts': contexts})),
+            'context': np.array([context_index[key[0]] for key in keys], dtype=np.int32),
+            'position': np.array([key[1] for key in keys], dtype=np.int64),
+            'airmass': np.array([key[2] for key in keys], dtype=float),
+            'extinction': np.array([key[3] for key in keys], dtype=float),
+            'framerate': np.array([key[4] for key in keys], dtype=float),
+            'counts': np.array([self._entries[key] for key in keys], dtype=np.int64).reshape(-1, 3),
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        """Add the entries saved at `path`; an unreadable or foreign file is ignored."""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                arrays = {name: saved[name] for name in saved.files}
+            index = json.loads(str(arrays['index'][()]))
+        except (OSError, KeyError, ValueError):
+            return
+        if index.get('format_version') != _FORMAT_VERSION:
+            return
+        contexts = index['contexts']
+        for context, position, airmass, extinction, framerate, counts in zip(
+            arrays['context'], arrays['position'], arrays['airmass'], arrays['extinction'], arrays['framerate'],
+            arrays['counts'],
+        ):
+            key = (contexts[int(context)], int(position), float(airmass), float(extinction), float(framerate))
+            self.put(key, tuple(int(count) for count in counts))
@@ -0,0 +1,579 @@
+"""Vectorized whole-sky scoring engine for `Observatory.schedule_observation`.
+
+The per-field path (`Observatory.correct_field` + `Observatory._score_field`)
+is kept as the reference implementation. This engine evaluates the same model
+for every visible field of a `catalog.FieldCatalog` at once: extinction and
+distortion correction, noise-free SNR prediction, the threshold counts, solar
+elongation and the consolidated scheduling score. Each step is a NumPy pass
+over the flat star columns, so per-block cost scales with the number of stars
+in visible fields rather than with Python-level field iteration. Results match
+the per-field path value for value.
+
+With ``SchedulerConfig(score_cache_size=N)`` the per-field counts are kept in
+a `score_cache.ScoreCache` across blocks and runs, and `score_block` only
+corrects and predicts the fields whose conditions it has not seen before.
+With ``SchedulerConfig(score_backend="event_rate")`` the consolidated score
+is replaced by the per-star event-rate integral of `event_rate`.
+
+With ``SchedulerConfig(scoring_memory_mb=M)`` a block whose visible stars
+would need a larger working set than M MB is scored in chunks of
+``M / _BYTES_PER_STAR`` stars. Per-field counts (and event rates) are reduced
+incrementally across chunks, a field may span several, and the distortion
+zones are computed per chunk rather than cached for the whole catalog. After
+each chunk the pages of a memory-mapped (compiled) catalog are released, so
+the scoring working set stays near M MB however deep the catalog is. Chunked
+counts match the one-pass counts exactly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import GeocentricTrueEcliptic, SkyCoord, angular_separation, get_sun
+
+from . import constants, event_rate
+from .catalog import STAR_COLUMNS, FieldCatalog, segment_sums
+from .noise_model import _file_stamp
+from .score_cache import ScoreCache
+
+# Peak scoring working set per visible star (bytes): the star index and field
+# columns, corrected magnitudes, zones, SNR with the noise model's per-star
+# parameters and temporaries, and the threshold masks.
+_BYTES_PER_STAR = 160
+
+# Smallest chunk, however low the memory ceiling.
+_MIN_CHUNK_STARS = 1 << 14
+
+
+class _Workspace:
+    """Grow-only scratch buffers reused from block to block.
+
+    `get(name, size)` returns a length-`size` view of a named buffer,
+    reallocating only when a block needs more room than any before it, so a
+    night allocates one working set sized by its largest block.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, size: int, dtype=float) -> np.ndarray:
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != np.dtype(dtype):
+            buffer = np.empty(max(int(size), 1), dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:size]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+class ScoringEngine:
+    """Scores every visible field of a `FieldCatalog` in a few NumPy passes.
+
+    Per-star arrays returned by `correct_magnitudes`/`score_block` are views
+    into scratch buffers that the next call overwrites; `field_table` copies
+    out what it keeps.
+    """
+
+    def __init__(self, observatory):
+        """Bind the engine to an `Observatory` (config, telescope, score model)."""
+        self.observatory = observatory
+        self.config = observatory.config
+        self._workspace = _Workspace()
+        self._zone_extinctions = None
+        self.score_cache = ScoreCache.from_config(self.config)
+        self._cache_contexts: Dict[int, Tuple[FieldCatalog, str]] = {}
+
+    def correct_magnitudes(
+        self,
+        catalog: FieldCatalog,
+        positions: np.ndarray,
+        altitudes: np.ndarray,
+        weather: float,
+        airmass: Optional[np.ndarray] = None,
+    ) -> SimpleNamespace:
+        """Vectorized `Observatory.correct_field` for the fields at `positions`.
+
+        Returns a namespace with per-field `zenith`/`airmass`, the catalog
+        indices of the selected stars (`star_index`, grouped by field), the
+        per-field `offsets` into those stars, and their corrected `mag`.
+        `airmass` overrides the per-field airmass derived from `altitudes`.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        altitudes = np.asarray(altitudes, dtype=float)
+        ws = self._workspace
+
+        zenith = 90. - altitudes
+        if airmass is None:
+            airmass = 1 / np.cos(np.radians(zenith))
+        else:
+            airmass = np.asarray(airmass, dtype=float)
+
+        counts = catalog.counts[positions]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        nstars = int(offsets[-1])
+        star_index = catalog.star_indices(positions)
+        star_field = np.repeat(np.arange(len(positions)), counts)
+
+        # Indices are in range by construction; mode='clip' lets np.take write `out` unbuffered.
+        mag = np.take(catalog.columns[constants.GaiaDR3Keys.MAG], star_index, out=ws.get('mag', nstars), mode='clip')
+        mag += np.take(weather * airmass, star_field, out=ws.get('per_star', nstars), mode='clip')
+
+        # distortion extinction: a gather from the per-star zones (fixed per
+        # catalog) through the per-config zone lookup table
+        zones = np.take(catalog.radial_zones(self.config.max_radius), star_index, out=ws.get('zone', nstars, dtype=np.int8), mode='clip')
+        stellar_extinctions = np.take(self.zone_extinctions(), zones, out=ws.get('per_star', nstars), mode='clip')
+        mag += stellar_extinctions
+
+        return SimpleNamespace(
+            positions=positions,
+            altitude=altitudes,
+            zenith=zenith,
+            airmass=airmass,
+            star_index=star_index,
+            star_field=star_field,
+            offsets=offsets,
+            mag=mag,
+        )
+
+    def zone_extinctions(self) -> np.ndarray:
+        """Distortion extinction (mag) of each radial zone for the configured `radius_extinctions`.
+
+        Entry `k` is the sum of the first `k` (rounded) steps between
+        consecutive radius extinctions, added in the same order as the
+        per-field loop of `Observatory.correct_field`. Cached per config value.
+        """
+        key = tuple(self.config.radius_extinctions)
+        if self._zone_extinctions is None or self._zone_extinctions[0] != key:
+            steps = [round(key[x] - key[x - 1], 2) for x in range(1, 10)]
+            table = [0.0]
+            for step in steps:
+                table.append(table[-1] + step)
+            self._zone_extinctions = (key, np.array(table))
+        return self._zone_extinctions[1]
+
+    def predict_snr(self, mag: np.ndarray, airmass: np.ndarray, star_field: np.ndarray, framerate: float) -> np.ndarray:
+        """Noise-free SNR for stars with per-field `airmass` (gathered via `star_field`)."""
+        telescope = self.observatory.telescope
+        if telescope._noise_model is None:
+            raise RuntimeError('HDF5 noise-model backend not initialized')
+
+        cadence_ms = telescope._cadence_ms(framerate=framerate)
+        out = telescope._noise_model.predict_many(mag, airmass, cadence_ms, star_field=star_field)
+        return out['temporal_snr']
+
+    def solar_elongations(self, catalog: FieldCatalog, positions: np.ndarray, observation_start) -> np.ndarray:
+        """Solar elongation (0-180 deg) of the field centres at `positions`.
+
+        Uses the observatory's ephemeris table for the Sun when it covers
+        `observation_start`, else astropy's `get_sun`.
+        """
+        table = self.observatory.ephemeris
+        if table is not None and table.covers(observation_start):
+            sun_lon, sun_lat = table.sun_ecliptic(observation_start)
+            elongation = angular_separation(
+                catalog.elon[positions] * u.deg, catalog.elat[positions] * u.deg, sun_lon * u.deg, sun_lat * u.deg
+            )
+            return np.atleast_1d(elongation.to_value(u.deg))
+
+        frame = GeocentricTrueEcliptic(obstime=observation_start)
+        field_ecl = SkyCoord(lon=catalog.elon[positions] * u.deg, lat=catalog.elat[positions] * u.deg, frame=frame)
+        sun_ecl = get_sun(observation_start).transform_to(frame)
+        return np.atleast_1d(field_ecl.separation(sun_ecl).deg)
+
+    def solar_elongation_grid(self, catalog: FieldCatalog, times) -> np.ndarray:
+        """Solar elongation (deg) of every field centre at each of `times`, shape (ntimes, nfields).
+
+        Batched `solar_elongations` (equal to it up to rounding): the Sun is
+        computed once for all times, from the ephemeris table when it covers them.
+        """
+        times = times.reshape(-1)
+        table = self.observatory.ephemeris
+        if table is not None and table.covers(times):
+            sun_lon, sun_lat = table.sun_ecliptic(times)
+            sun_lon, sun_lat = sun_lon * u.deg, sun_lat * u.deg
+        else:
+            sun_ecl = get_sun(times).transform_to(GeocentricTrueEcliptic(obstime=times))
+            sun_lon, sun_lat = sun_ecl.lon, sun_ecl.lat
+        elongation = angular_separation(
+            catalog.elon[np.newaxis, :] * u.deg, catalog.elat[np.newaxis, :] * u.deg,
+            sun_lon[:, np.newaxis], sun_lat[:, np.newaxis],
+        )
+        return elongation.to_value(u.deg)
+
+    def score_block(
+        self,
+        catalog: FieldCatalog,
+        positions: np.ndarray,
+        altitudes: np.ndarray,
+        weather: float,
+        observation_start,
+        framerate: float,
+        solar_elongation: Optional[np.ndarray] = None,
+        airmass: Optional[np.ndarray] = None,
+        use_cache: bool = True,
+        chunked: bool = True,
+    ) -> SimpleNamespace:
+        """Correct, predict and score every field at `positions` for one block.
+
+        `altitudes` are the per-field mean altitudes (deg) over the block.
+        `solar_elongation` (deg, per position) may be passed in when already
+        known, e.g. from `solar_elongation_grid`. Returns the
+        `correct_magnitudes` namespace extended with per-star `snr` and the
+        per-field counts, `solar_elongation`, `distance_from_opposition` and
+        `score` arrays.
+
+        The score is the consolidated count score, or the summed per-star
+        event rates with the ``"event_rate"`` backend. With a score cache (and
+        `use_cache`, for the count backend only) the counts come from the cache
+        where possible and the namespace has no per-star arrays: `star_index`,
+        `mag` and `snr` are None. The same holds for a block scored in chunks
+        under ``scoring_memory_mb`` (unless `chunked` is False). Score again
+        with ``use_cache=False, chunked=False`` (and the block's `airmass`) to
+        materialize a field with `field_table`.
+        """
+        rates = getattr(self.config, 'score_backend', "count") == "event_rate"
+        if self.score_cache is not None and use_cache and not rates:
+            block = self._cached_counts(catalog, positions, altitudes, weather, framerate)
+        elif chunked and self._needs_chunks(catalog, positions):
+            if rates and solar_elongation is None:
+                solar_elongation = self.solar_elongations(catalog, np.asarray(positions, dtype=np.int64), observation_start)
+            block = self._chunked_counts(catalog, positions, altitudes, weather, framerate, airmass, solar_elongation)
+        else:
+            block = self._star_counts(catalog, positions, altitudes, weather, framerate, airmass)
+        return self._finish_block(catalog, block, observation_start, framerate, solar_elongation)
+
+    def score_block_sweep(
+        self,
+        catalog: FieldCatalog,
+        positions: np.ndarray,
+        altitudes: np.ndarray,
+        weather: float,
+        observation_start,
+        framerates: Sequence[float],
+        solar_elongation: Optional[np.ndarray] = None,
+    ) -> List[SimpleNamespace]:
+        """`score_block` at each of `framerates`, sharing the framerate-independent work.
+
+        Magnitude correction, the magnitude-threshold and angular-size masks
+        and the solar elongations are computed once; only the cadence-dependent
+        SNR, the counts and the score are evaluated per framerate. Each block
+        matches `score_block` at its framerate. The blocks share one `mag`
+        array (a scratch view, as for `score_block`).
+        """
+        cached = self.score_cache is not None and getattr(self.config, 'score_backend', "count") == "count"
+        if len(framerates) == 1 or cached or self._needs_chunks(catalog, positions):
+            # Cached and chunked counts hold no star arrays to share; the cache does the reuse.
+            blocks = []
+            for framerate in framerates:
+                blocks.append(self.score_block(
+                    catalog, positions, altitudes, weather, observation_start, framerate, solar_elongation=solar_elongation
+                ))
+                solar_elongation = blocks[-1].solar_elongation
+            return blocks
+
+        base = self.correct_magnitudes(catalog, positions, altitudes, weather)
+        masks = self._star_masks(catalog, base)
+        blocks = []
+        for framerate in framerates:
+            block = SimpleNamespace(**vars(base))
+            self._count_stars(catalog, block, framerate, masks)
+            blocks.append(self._finish_block(catalog, block, observation_start, framerate, solar_elongation))
+            solar_elongation = block.solar_elongation
+        return blocks
+
+    def _finish_block(self, catalog, block, observation_start, framerate, solar_elongation) -> SimpleNamespace:
+        """Add `solar_elongation`, `distance_from_opposition` and `score` to a counted block."""
+        obs = self.observatory
+        if solar_elongation is None:
+            solar_elongation = self.solar_elongations(catalog, block.positions, observation_start)
+        block.solar_elongation = np.asarray(solar_elongation, dtype=float)
+        block.distance_from_opposition = np.abs(block.solar_elongation - 180.0)
+        if getattr(self.config, 'score_backend', "count") == "event_rate":
+            if block.snr is None:
+                block.score = block.rate_score
+            else:
+                block.score = event_rate.field_scores(obs, catalog, block, framerate)
+        else:
+            block.score = obs._consolidated_scheduling_scores(block.count_above_5, block.solar_elongation, framerate)
+        return block
+
+    def _star_counts(
+        self,
+        catalog: FieldCatalog,
+        positions: np.ndarray,
+        altitudes: np.ndarray,
+        weather: float,
+        framerate: float,
+        airmass: Optional[np.ndarray] = None,
+    ) -> SimpleNamespace:
+        """`correct_magnitudes` plus per-star `snr` and the per-field threshold counts."""
+        block = self.correct_magnitudes(catalog, positions, altitudes, weather, airmass=airmass)
+        self._count_stars(catalog, block, framerate, self._star_masks(catalog, block))
+        return block
+
+    def _star_masks(self, catalog: FieldCatalog, block: SimpleNamespace) -> SimpleNamespace:
+        """The framerate-independent parts of the counts of a corrected block."""
+        obs = self.observatory
+        degree_limit = self.config.mas_limit / 3600.0
+        return SimpleNamespace(
+            size_limited=catalog.columns[constants.FieldDataKeys.ANGSIZE][block.star_index] < degree_limit,
+            count_below_mag_threshold=segment_sums(block.mag < obs._MAG_THRESHOLD, block.offsets),
+        )
+
+    def _count_stars(self, catalog: FieldCatalog, block: SimpleNamespace, framerate: float, masks: SimpleNamespace) -> None:
+        """Add per-star `snr` at `framerate` and the per-field threshold counts to a corrected block."""
+        obs = self.observatory
+        block.snr = self.predict_snr(block.mag, block.airmass, block.star_field, framerate)
+        block.count_below_mag_threshold = masks.count_below_mag_threshold
+        block.count_above_5 = segment_sums(block.snr > obs._SNR_VISIBILITY_THRESHOLD, block.offsets)
+        block.predicted_count_above_5 = block.count_above_5
+        block.count_above_optimal = segment_sums(masks.size_limited & (block.snr > self.config.snr_threshold), block.offsets)
+        block.predicted_count_above_optimal = block.count_above_optimal
+
+    def chunk_stars(self) -> int:
+        """Stars per chunk under ``scoring_memory_mb``, or 0 when blocks are scored in one pass."""
+        memory_mb = float(getattr(self.config, 'scoring_memory_mb', 0.0) or 0.0)
+        if memory_mb <= 0.0:
+            return 0
+        return max(int(memory_mb * (1 << 20)) // _BYTES_PER_STAR, _MIN_CHUNK_STARS)
+
+    def _needs_chunks(self, catalog: FieldCatalog, positions: np.ndarray) -> bool:
+        chunk = self.chunk_stars()
+        return chunk > 0 and int(catalog.counts[np.asarray(positions, dtype=np.int64)].sum()) > chunk
+
+    def _chunked_counts(
+        self,
+        catalog: FieldCatalog,
+        positions: np.ndarray,
+        altitudes: np.ndarray,
+        weather: float,
+        framerate: float,
+        airmass: Optional[np.ndarray] = None,
+        solar_elongation: Optional[np.ndarray] = None,
+    ) -> SimpleNamespace:
+        """`_star_counts` over `chunk_stars` stars at a time, keeping only per-field totals.
+
+        The block's stars, grouped by field as in `correct_magnitudes`, are cut
+        into consecutive chunks; a field may span several. Each chunk is
+        corrected, predicted and counted as a block of the fields it overlaps,
+        and its counts are added to the fields' totals. With the event-rate
+        backend the fields' summed star rates (`rate_score`) are accumulated
+        too, which needs the `solar_elongation` of every position. The result
+        has no per-star arrays (`star_index`, `mag` and `snr` are None).
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        altitudes = np.asarray(altitudes, dtype=float)
+        zenith = 90. - altitudes
+        if airmass is None:
+            airmass = 1 / np.cos(np.radians(zenith))
+        else:
+            airmass = np.asarray(airmass, dtype=float)
+        rates = getattr(self.config, 'score_backend', "count") == "event_rate"
+
+        offsets = np.concatenate([[0], np.cumsum(catalog.counts[positions])]).astype(np.int64)
+        nstars = int(offsets[-1])
+        totals = {
+            name: np.zeros(len(positions), dtype=np.int64)
+            for name in ('count_below_mag_threshold', 'count_above_5', 'count_above_optimal')
+        }
+        rate_score = np.zeros(len(positions)) if rates else None
+        chunk_size = self.chunk_stars() or max(nstars, 1)
+        for start in range(0, nstars, chunk_size):
+            stop = min(start + chunk_size, nstars)
+            chunk = self._chunk(catalog, positions, altitudes, zenith, airmass, offsets, weather, start, stop)
+            self._count_stars(catalog, chunk, framerate, self._star_masks(catalog, chunk))
+            for name, total in totals.items():
+                total[chunk.fields] += getattr(chunk, name)
+            if rates:
+                chunk.solar_elongation = np.asarray(solar_elongation, dtype=float)[chunk.fields]
+                rate_score[chunk.fields] += event_rate.field_scores(self.observatory, catalog, chunk, framerate)
+            del chunk
+            catalog.release_pages()
+
+        return SimpleNamespace(
+            positions=positions,
+            altitude=altitudes,
+            zenith=zenith,
+            airmass=airmass,
+            star_index=None,
+            mag=None,
+            snr=None,
+            offsets=offsets,
+            count_below_mag_threshold=totals['count_below_mag_threshold'],
+            count_above_5=totals['count_above_5'],
+            predicted_count_above_5=totals['count_above_5'],
+            count_above_optimal=totals['count_above_optimal'],
+            predicted_count_above_optimal=totals['count_above_optimal'],
+            rate_score=rate_score,
+        )
+
+    def _chunk(self, catalog, positions, altitudes, zenith, airmass, offsets, weather, start, stop) -> SimpleNamespace:
+        """Corrected stars `start:stop` of a block, as a `correct_magnitudes` block of the fields they span.
+
+        `fields` indexes the spanned fields in `positions`; `offsets` are the
+        block's per-field star offsets.
+        """
+        first = int(np.searchsorted(offsets, start, side='right')) - 1
+        last = int(np.searchsorted(offsets, stop, side='left'))
+        fields = np.arange(first, last)
+        bounds = np.clip(offsets[first:last + 1], start, stop)
+        counts = np.diff(bounds)
+        chunk_offsets = (bounds - start).astype(np.int64)
+
+        star_field = np.repeat(np.arange(len(fields)), counts)
+        field_first_star = catalog.offsets[positions[fields]] + (bounds[:-1] - offsets[first:last])
+        star_index = np.repeat(field_first_star, counts) + (np.arange(stop - start) - np.repeat(chunk_offsets[:-1], counts))
+
+        ws = self._workspace
+        nstars = stop - start
+        field_airmass = airmass[fields]
+        mag = np.take(catalog.columns[constants.GaiaDR3Keys.MAG], star_index, out=ws.get('mag', nstars), mode='clip')
+        mag += np.take(weather * field_airmass, star_field, out=ws.get('per_star', nstars), mode='clip')
+        zones = catalog.radial_zones_of(star_index, positions[fields][star_field], self.config.max_radius)
+        mag += np.take(self.zone_extinctions(), zones, out=ws.get('per_star', nstars), mode='clip')
+
+        return SimpleNamespace(
+            fields=fields,
+            positions=positions[fields],
+            altitude=altitudes[fields],
+            zenith=zenith[fields],
+            airmass=field_airmass,
+            star_index=star_index,
+            star_field=star_field,
+            offsets=chunk_offsets,
+            mag=mag,
+        )
+
+    def _cached_counts(
+        self,
+        catalog: FieldCatalog,
+        positions: np.ndarray,
+        altitudes: np.ndarray,
+        weather: float,
+        framerate: float,
+    ) -> SimpleNamespace:
+        """Per-field counts from the score cache, computing (and caching) only the misses.
+
+        Counts are evaluated at the cache's quantized airmass, hit or miss.
+        """
+        cache = self.score_cache
+        positions = np.asarray(positions, dtype=np.int64)
+        altitudes = np.asarray(altitudes, dtype=float)
+        zenith = 90. - altitudes
+        airmass = cache.quantize(1 / np.cos(np.radians(zenith)))
+
+        context = self._cache_context(catalog)
+        keys = [
+            (context, int(position), float(field_airmass), float(weather), float(framerate))
+            for position, field_airmass in zip(positions, airmass)
+        ]
+        counts = np.empty((len(keys), 3), dtype=np.int64)
+        missing = []
+        for i, key in enumerate(keys):
+            value = cache.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                counts[i] = value
+        if missing:
+            missing = np.asarray(missing, dtype=np.int64)
+            if self._needs_chunks(catalog, positions[missing]):
+                fresh = self._chunked_counts(
+                    catalog, positions[missing], altitudes[missing], weather, framerate, airmass[missing]
+                )
+            else:
+                fresh = self._star_counts(
+                    catalog, positions[missing], altitudes[missing], weather, framerate, airmass=airmass[missing]
+                )
+            counts[missing, 0] = fresh.count_below_mag_threshold
+            counts[missing, 1] = fresh.count_above_5
+            counts[missing, 2] = fresh.count_above_optimal
+            for i in missing:
+                cache.put(keys[i], tuple(int(count) for count in counts[i]))
+
+        return SimpleNamespace(
+            positions=positions,
+            altitude=altitudes,
+            zenith=zenith,
+            airmass=airmass,
+            star_index=None,
+            mag=None,
+            snr=None,
+            count_below_mag_threshold=counts[:, 0],
+            count_above_5=counts[:, 1],
+            predicted_count_above_5=counts[:, 1],
+            count_above_optimal=counts[:, 2],
+            predicted_count_above_optimal=counts[:, 2],
+        )
+
+    def _cache_context(self, catalog: FieldCatalog) -> str:
+        """Fingerprint of everything besides the key that the cached counts depend on.
+
+        Covers the catalog's star columns and field centres, the distortion
+        and threshold settings and the noise-model file; computed once per catalog.
+        """
+        cached = self._cache_contexts.get(id(catalog))
+        if cached is not None and cached[0] is catalog:
+            return cached[1]
+
+        obs = self.observatory
+        digest = hashlib.sha256()
+        for array in (catalog.offsets, catalog.elon, catalog.elat):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        for key in STAR_COLUMNS:
+            digest.update(np.ascontiguousarray(catalog.columns[key]).tobytes())
+        noise_model = obs.telescope._noise_model
+        settings = {
+            'radius_extinctions': [float(value) for value in self.config.radius_extinctions],
+            'max_radius': float(self.config.max_radius),
+            'mas_limit': float(self.config.mas_limit),
+            'snr_threshold': float(self.config.snr_threshold),
+            'mag_threshold': float(obs._MAG_THRESHOLD),
+            'snr_visibility_threshold': float(obs._SNR_VISIBILITY_THRESHOLD),
+            'noise_model': _file_stamp(noise_model.snr_file) if noise_model is not None else None,
+        }
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+        context = digest.hexdigest()
+        self._cache_contexts[id(catalog)] = (catalog, context)
+        return context
+
+    def field_table(
+        self,
+        catalog: FieldCatalog,
+        block: SimpleNamespace,
+        index: int,
+        base_field: Mapping[Any, Any],
+    ) -> MutableMapping[Any, Any]:
+        """Materialize the scored field dict for entry `index` of `block`.
+
+        The result carries the same keys, in the same order, as a field run
+        through `correct_field` + `_score_field`.
+        """
+        stars = slice(int(block.offsets[index]), int(block.offsets[index + 1]))
+
+        field: Dict[Any, Any] = dict(base_field)
+        field[constants.GaiaDR3Keys.MAG] = block.mag[stars].copy()
+        field[constants.FieldDataKeys.ALTITUDE_REG] = block.altitude[index]
+        field[constants.FieldDataKeys.ZENITH_REG] = block.zenith[index]
+        # Report the field's own airmass; `block.airmass` may be the score cache's bucket.
+        field[constants.FieldDataKeys.AIRMASS_REG] = 1 / np.cos(np.radians(block.zenith[index]))
+
+        snr_pred = block.snr[stars].copy()
+        field[constants.FieldDataKeys.SNR] = snr_pred
+        field[constants.FieldDataKeys.PREDICTED_SNR] = snr_pred
+        field['COUNT_BELOW_MAG_THRESHOLD'] = int(block.count_below_mag_threshold[index])
+        field['COUNT_ABOVE_5'] = int(block.count_above_5[index])
+        field['PREDICTED_COUNT_ABOVE_5'] = int(block.predicted_count_above_5[index])
+        field['COUNT_ABOVE_OPTIMAL'] = int(block.count_above_optimal[index])
+        field['PREDICTED_COUNT_ABOVE_OPTIMAL'] = int(block.predicted_count_above_optimal[index])
+        field['SOLAR_ELONGATION'] = block.solar_elongation[index]
+        field['DISTANCE_FROM_OPPOSITION'] = block.distance_from_opposition[index]
+        field['OBSERVATION_SCORE'] = float(block.score[index])
+        return field
@@ -0,0 +1,166 @@
+"""Warm scheduler service: a localhost server and the thin client that talks to it.
+
+Every ``run_scheduler.py`` invocation pays interpreter start, the astropy
+import, catalog parse and model load before it schedules anything.
+``run_scheduler.py --serve`` instead keeps the `Observatory`, the loaded
+catalog and their caches resident and answers schedule requests over a
+localhost TCP socket. This client forwards the ordinary single-night CLI
+arguments to it and prints exactly what ``run_scheduler.py`` would print
+(the ``=== SCHEDULE BEGIN/END ===`` block on stdout, diagnostics on stderr)
+and exits with the same status::
+
+    python scheduler/run_scheduler.py --serve --port 8765          # once
+    python -u scheduler/service.py --port 8765 --sunset-jd ... --sunrise-jd ...
+
+If no server is listening the client falls back to running the scheduler
+in-process (after a WARNING on stderr), so callers can always use it.
+
+Protocol: one JSON line per connection each way. The request is
+``{"argv": [...]}`` (the `run_scheduler` arguments). The response is
+``{"exit_code": int, "stdout": str, "stderr": str}``.
+
+This module imports only the standard library so the client starts fast.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def serve(
+    handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    ready: Optional[Callable[[str, int], None]] = None,
+) -> None:
+    """Answer JSON-line requests with `handler` until interrupted.
+
+    Requests are handled one at a time, so `handler` may redirect the process's
+    stdout/stderr while it runs. `ready(host, port)` is called once listening.
+    """
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                response = handler(json.loads(line))
+            except Exception as exc:
+                response = {'exit_code': 1, 'stdout': "", 'stderr': f"ERROR: scheduler service failed: {exc}\n"}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+    class _Server(socketserver.TCPServer):
+        allow_reuse_address = True
+
+    with _Server((host, port), _Handler) as server:
+        if ready is not None:
+            ready(*server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class Transcript:
+    """What a computation wrote to stdout and stderr, kept so a resident cache can replay it.
+
+    The service keeps per-block and per-step results across requests. A cached
+    result is not recomputed, so its diagnostics and warnings would otherwise
+    reach only the first client; replaying its transcript on every hit prints
+    what a fresh ``run_scheduler.py`` run would.
+    """
+
+    def __init__(self):
+        self.stdout = ""
+        self.stderr = ""
+
+    @contextlib.contextmanager
+    def recording(self, echo: bool = True):
+        """Capture what the body writes to stdout and stderr; with `echo`, pass it on when the body exits."""
+        out, err = io.StringIO(), io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                yield self
+        finally:
+            self.stdout, self.stderr = out.getvalue(), err.getvalue()
+            if echo:
+                self.replay()
+
+    def replay(self) -> None:
+        sys.stdout.write(self.stdout)
+        sys.stderr.write(self.stderr)
+
+
+def request(
+    argv: Sequence[str],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Send one schedule request and return the decoded response.
+
+    Raises OSError if the server cannot be reached or closes the connection early.
+    """
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps({'argv': list(argv)}) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError(f"scheduler service at {host}:{port} closed the connection without a response")
+    return json.loads(line)
+
+
+def _run_locally(argv: List[str]) -> int:
+    this_dir = os.path.dirname(os.path.abspath(__file__))
+    parent_dir = os.path.dirname(this_dir)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    from scheduler import run_scheduler
+
+    return run_scheduler.main(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Thin client for `run_scheduler.py --serve`; other arguments are passed to run_scheduler.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Server host (default {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Server port (default {DEFAULT_PORT}).")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait for the server (default: no limit).")
+    parser.add_argument(
+        "--no-fallback", action="store_true", help="Fail instead of scheduling in-process when no server is reachable."
+    )
+    args, forward = parser.parse_known_args(argv)
+
+    try:
+        response = request(forward, args.host, args.port, timeout=args.timeout)
+    except OSError as exc:
+        if args.no_fallback:
+            print(f"ERROR: could not reach scheduler service at {args.host}:{args.port}: {exc}", file=sys.stderr)
+            return 2
+        print(
+            f"WARNING: scheduler service at {args.host}:{args.port} unavailable ({exc}); scheduling in-process.",
+            file=sys.stderr,
+        )
+        return _run_locally(forward)
+
+    sys.stderr.write(response.get('stderr', ""))
+    sys.stdout.write(response.get('stdout', ""))
+    sys.stdout.flush()
+    return int(response.get('exit_code', 1))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,36 +10,150 @@ field table shape the trimmed `Observatory` scheduler expects:
   coordinates derived from the CENTROID RA/Dec).
 - `.centroids`: the raw CENTROID list (RA, Dec in degrees) so callers can emit
   per-field pointing.
+- `.catalog`: the same stars packed into a read-only `catalog.FieldCatalog`.
+  The per-field arrays in `.fields` are views into its columns, so the star
+  data is held in memory exactly once.
+
+Parsing the JSON artifact is slow for large catalogs, so it can be compiled
+once into a binary catalog (an uncompressed ``.npz`` with the concatenated
+star columns, per-field offsets and precomputed centroid ecliptic
+coordinates)::
+
+    python -m scheduler.sky scheduler/fields/fields_13.3mag.json
+
+`load_fields` memory-maps a compiled catalog directly, and given a JSON path it
+prefers an up-to-date compiled catalog with the same stem next to it.
+
+When the JSON is parsed, all valid centroids are converted to ecliptic
+coordinates in a single SkyCoord transform, and the result is cached next to
+the JSON (``<stem>.ecliptic.npz``) keyed by the JSON's SHA-256.
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import math
+import os
 import warnings
 from types import SimpleNamespace
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import numpy as np
 
 from . import constants
+from .catalog import FieldCatalog, load_npz
+
+# Version of the compiled catalog layout written by `compile_fields`.
+_COMPILED_FORMAT_VERSION = 1
+_COMPILED_SUFFIX = ".npz"
+# Suffix of the centroid ecliptic-coordinate cache kept next to a fields JSON.
+_ECLIPTIC_CACHE_SUFFIX = ".ecliptic.npz"
 
 
 def _icrs_to_geocentric_ecliptic(ra_deg: float, dec_deg: float) -> Tuple[float, float]:
     """Convert ICRS (RA, Dec) to geocentric true ecliptic lon/lat in degrees."""
+    elon, elat = _icrs_to_geocentric_ecliptic_many(np.array([ra_deg]), np.array([dec_deg]))
+    return float(elon[0]), float(elat[0])
+
+
+def _icrs_to_geocentric_ecliptic_many(ra_deg: np.ndarray, dec_deg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized `_icrs_to_geocentric_ecliptic`: one SkyCoord transform for all centroids.
+
+    Element-wise identical to converting each centroid on its own.
+    """
     from astropy import units as u
     from astropy.coordinates import GeocentricTrueEcliptic, SkyCoord
 
+    ra_deg = np.asarray(ra_deg, dtype=float)
+    dec_deg = np.asarray(dec_deg, dtype=float)
+    if ra_deg.size == 0:
+        return np.empty(0), np.empty(0)
     coord = SkyCoord(ra=ra_deg * u.degree, dec=dec_deg * u.degree, frame="icrs")
     ecliptic_coord = coord.transform_to(GeocentricTrueEcliptic())
-    return float(ecliptic_coord.lon.degree), float(ecliptic_coord.lat.degree)
+    return np.asarray(ecliptic_coord.lon.degree, dtype=float), np.asarray(ecliptic_coord.lat.degree, dtype=float)
 
 
-def load_fields(fields_file_loc: str) -> SimpleNamespace:
-    """Load the fields JSON artifact into a scheduler-ready namespace.
+def ecliptic_cache_path(fields_file_loc: str) -> str:
+    """Return the centroid-ecliptic cache path that pairs with a fields JSON path."""
+    return os.path.splitext(fields_file_loc)[0] + _ECLIPTIC_CACHE_SUFFIX
 
-    Returns a `SimpleNamespace` with `.fields` (Dict[int, dict]) and
-    `.centroids` (the raw CENTROID list).
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cached_centroid_ecliptic(
+    fields_file_loc: str, ra_deg: np.ndarray, dec_deg: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Ecliptic lon/lat of the centroids, via a cache next to `fields_file_loc`.
+
+    The cache is keyed by the SHA-256 of the fields file and also stores the
+    centroids it was computed for, so it is only used when both still match.
+    It is rewritten after a miss; failing to write it is not an error.
+    """
+    cache_loc = ecliptic_cache_path(fields_file_loc)
+    source_hash = _file_sha256(fields_file_loc)
+    try:
+        with np.load(cache_loc, allow_pickle=False) as cached:
+            if (
+                str(cached['source_sha256']) == source_hash
+                and np.array_equal(cached['ra'], ra_deg)
+                and np.array_equal(cached['dec'], dec_deg)
+            ):
+                return np.array(cached['elon']), np.array(cached['elat'])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    elon, elat = _icrs_to_geocentric_ecliptic_many(ra_deg, dec_deg)
+    try:
+        with open(cache_loc, "wb") as f:
+            np.savez(f, source_sha256=np.asarray(source_hash), ra=ra_deg, dec=dec_deg, elon=elon, elat=elat)
+    except OSError:
+        pass
+    return elon, elat
+
+
+def load_fields(fields_file_loc: str, prefer_compiled: bool = True, mmap: bool = True) -> SimpleNamespace:
+    """Load the fields artifact into a scheduler-ready namespace.
+
+    `fields_file_loc` is the fields JSON or a compiled ``.npz`` catalog (see
+    `compile_fields`). For a JSON path, a compiled catalog with the same stem
+    is used instead when `prefer_compiled` is set and it is up to date with
+    the JSON. Compiled star columns are memory-mapped unless `mmap` is False.
+
+    Returns a `SimpleNamespace` with `.fields` (Dict[int, dict]),
+    `.centroids` (the raw CENTROID list) and `.catalog` (the packed, read-only
+    `FieldCatalog` backing the star arrays in `.fields`).
+    """
+    if fields_file_loc.endswith(_COMPILED_SUFFIX):
+        return _load_compiled_fields(fields_file_loc, mmap=mmap)
+
+    if prefer_compiled:
+        compiled_loc = compiled_fields_path(fields_file_loc)
+        if os.path.exists(compiled_loc):
+            if _compiled_is_current(compiled_loc, fields_file_loc):
+                return _load_compiled_fields(compiled_loc, mmap=mmap)
+            warnings.warn(
+                f"Ignoring stale compiled catalog {compiled_loc} (out of date with {fields_file_loc}); "
+                "rebuild it with `python -m scheduler.sky`.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+    return _load_fields_json(fields_file_loc)
+
+
+def _load_fields_json(fields_file_loc: str, use_cache: bool = True) -> SimpleNamespace:
+    """Parse the fields JSON artifact (see `load_fields`).
+
+    Centroids are converted to ecliptic coordinates in one batch, cached next
+    to the JSON (see `_cached_centroid_ecliptic`) unless `use_cache` is False.
     """
     with open(fields_file_loc, "r") as f:
         fields_dict = json.load(f)
@@ -56,6 +170,7 @@ def load_fields(fields_file_loc: str) -> SimpleNamespace:
     field_table_keys = [lon_key, lat_key, mag_key, angsize_key]
 
     fields: Dict[int, Dict[str, Any]] = {}
+    valid_radec = []
     for field_id, table in star_fields_data.items():
         field: Dict[str, Any] = {}
         for key in field_table_keys:
@@ -82,13 +197,115 @@ def load_fields(fields_file_loc: str) -> SimpleNamespace:
                 stacklevel=2,
             )
             continue
-        elon_reg, elat_reg = _icrs_to_geocentric_ecliptic(ra_deg, dec_deg)
+        fields[int(field_id)] = field
+        valid_radec.append((ra_deg, dec_deg))
+
+    radec = np.asarray(valid_radec, dtype=float).reshape(-1, 2)
+    if use_cache:
+        elon, elat = _cached_centroid_ecliptic(fields_file_loc, radec[:, 0], radec[:, 1])
+    else:
+        elon, elat = _icrs_to_geocentric_ecliptic_many(radec[:, 0], radec[:, 1])
+    for field, elon_reg, elat_reg in zip(fields.values(), elon.tolist(), elat.tolist()):
         field[constants.FieldDataKeys.ELON_REG] = elon_reg
         field[constants.FieldDataKeys.ELAT_REG] = elat_reg
 
-        fields[int(field_id)] = field
+    catalog = FieldCatalog.from_fields(fields)
+    catalog.freeze()
+    catalog.bind(fields)
+    return SimpleNamespace(fields=fields, centroids=centroids, catalog=catalog)
+
+
+def compiled_fields_path(fields_file_loc: str) -> str:
+    """Return the compiled-catalog path that pairs with a fields JSON path."""
+    return os.path.splitext(fields_file_loc)[0] + _COMPILED_SUFFIX
+
+
+def _source_stamp(fields_file_loc: str) -> Dict[str, Any]:
+    """Identify a JSON source by size and modification time."""
+    stat = os.stat(fields_file_loc)
+    return {'size': int(stat.st_size), 'mtime_ns': int(stat.st_mtime_ns)}
+
+
+def _compiled_is_current(compiled_loc: str, fields_file_loc: str) -> bool:
+    """Return True if `compiled_loc` was built from the current `fields_file_loc`."""
+    try:
+        arrays = load_npz(compiled_loc)
+        meta = json.loads(str(arrays['meta'][()]))
+    except (OSError, KeyError, ValueError):
+        return False
+    if int(meta.get('format_version', -1)) != _COMPILED_FORMAT_VERSION:
+        return False
+    return meta.get('source') == _source_stamp(fields_file_loc)
+
+
+def compile_fields(fields_file_loc: str, out_loc: Optional[str] = None) -> str:
+    """Compile the fields JSON into a memory-mappable ``.npz`` catalog and return its path.
+
+    The catalog holds the star columns concatenated in field order, per-field
+    offsets, the field-centre ecliptic coordinates and the raw centroids, for
+    the fields that `load_fields` keeps (invalid centroids are skipped with the
+    usual warnings).
+    """
+    if out_loc is None:
+        out_loc = compiled_fields_path(fields_file_loc)
+    if not out_loc.endswith(_COMPILED_SUFFIX):
+        raise ValueError(f"Compiled catalog path must end in {_COMPILED_SUFFIX}: {out_loc}")
+
+    sky = _load_fields_json(fields_file_loc)
+    arrays = sky.catalog.to_arrays()
+
+    centroids = sky.centroids
+    if isinstance(centroids, dict):
+        arrays['centroid_keys'] = np.asarray([str(key) for key in centroids])
+        centroids = list(centroids.values())
+    arrays['centroids'] = np.asarray([_centroid_pair(c) for c in centroids], dtype=float).reshape(-1, 2)
+
+    meta = {
+        'format_version': _COMPILED_FORMAT_VERSION,
+        'source': _source_stamp(fields_file_loc),
+        'source_name': os.path.basename(fields_file_loc),
+    }
+    arrays['meta'] = np.asarray(json.dumps(meta))
 
-    return SimpleNamespace(fields=fields, centroids=centroids)
+    np.savez(out_loc, **arrays)
+    return out_loc
+
+
+def _centroid_pair(centroid: Any) -> Tuple[float, float]:
+    """(ra, dec) of a raw centroid entry, NaN where it is unreadable."""
+    try:
+        return float(centroid[0]), float(centroid[1])
+    except (IndexError, TypeError, ValueError):
+        return float('nan'), float('nan')
+
+
+def _load_compiled_fields(compiled_loc: str, mmap: bool = True) -> SimpleNamespace:
+    """Load a compiled catalog written by `compile_fields` (see `load_fields`)."""
+    arrays = load_npz(compiled_loc, mmap=mmap)
+    meta = json.loads(str(arrays['meta'][()]))
+    if int(meta.get('format_version', -1)) != _COMPILED_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported compiled catalog version {meta.get('format_version')} in {compiled_loc} "
+            f"(expected {_COMPILED_FORMAT_VERSION}); rebuild it with `python -m scheduler.sky`."
+        )
+
+    catalog = FieldCatalog.from_arrays(arrays).freeze()
+    fields: Dict[int, Dict[str, Any]] = {}
+    for position, field_id in enumerate(catalog.field_keys):
+        field: Dict[str, Any] = {}
+        field.update(catalog.field_columns(position))
+        field[constants.FieldDataKeys.ELON_REG] = float(catalog.elon[position])
+        field[constants.FieldDataKeys.ELAT_REG] = float(catalog.elat[position])
+        fields[field_id] = field
+    catalog.bind(fields)
+
+    centroid_values = np.asarray(arrays['centroids']).tolist()
+    if 'centroid_keys' in arrays:
+        centroids: Any = dict(zip((str(key) for key in arrays['centroid_keys']), centroid_values))
+    else:
+        centroids = centroid_values
+
+    return SimpleNamespace(fields=fields, centroids=centroids, catalog=catalog)
 
 
 def _valid_radec(ra_deg: float, dec_deg: float) -> bool:
@@ -124,3 +341,18 @@ def _lookup_centroid(field_centroids: Any, field_id: int):
         f"Unsupported centroid container type: {type(field_centroids)!r}. "
         "Expected dict or list/tuple/ndarray."
     )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile a fields JSON into a binary scheduler catalog.")
+    parser.add_argument("fields", help="Path to the fields JSON.")
+    parser.add_argument("--out", default=None, help="Output .npz path (default: next to the JSON, same stem).")
+    args = parser.parse_args(argv)
+
+    out_loc = compile_fields(args.fields, args.out)
+    print(f"Wrote compiled catalog {out_loc}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
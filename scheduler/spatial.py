@@ -0,0 +1,177 @@
+"""Spatial index over field centroids for cone queries.
+
+`VisibilityGrid` transforms every field to AltAz at every time and measures
+every field's distance from the Moon, although at any time only a cap of the
+sky (the fields above the altitude cut) can be scheduled. With tilings of tens
+of thousands of fields those whole-catalog scans dominate. `FieldIndex` answers
+cone queries ("fields within r deg of a point") by touching only candidates:
+
+- field centres are bucketed into ecliptic-latitude zones of `zone_deg` and
+  sorted by longitude within each zone (the "zones" algorithm, pure NumPy, no
+  scipy/healpy dependency);
+- a cone visits only the zones it overlaps, and in each the longitude range
+  it spans (one vectorized `searchsorted` over all zones), then keeps the
+  candidates whose unit vector lies within the radius exactly.
+
+The index lives in the catalog's frame (geocentric true ecliptic, J2000
+equinox). `zenith_ecliptic`, `equatorial_to_ecliptic` and
+`opposition_ecliptic` place the usual query centres in that frame to well
+within `FRAME_ERROR_DEG`; callers that need an exact superset pad their radius
+by it. `FieldCatalog.spatial_index` builds the index once per catalog.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+from .horizon import mean_sidereal_time
+from .twilight import solar_longitude
+
+__all__ = [
+    "FieldIndex",
+    "FRAME_ERROR_DEG",
+    "equatorial_to_ecliptic",
+    "opposition_ecliptic",
+    "zenith_ecliptic",
+]
+
+# Bound on the error of the query centres below (precession approximated to
+# first order, nutation and aberration ignored; measured < 0.02 deg against
+# astropy for 2009-2036). Query radii are padded by it wherever a superset is
+# required.
+FRAME_ERROR_DEG = 0.25
+
+_J2000_JD = 2451545.0
+
+# Mean obliquity of the ecliptic at J2000 (deg) and general precession in
+# longitude (deg per Julian century).
+_OBLIQUITY_J2000_DEG = 23.4392911
+_PRECESSION_DEG_PER_CENTURY = 1.3969713
+
+# Zone height bounds (deg); the default targets about one field per zone cell.
+_MIN_ZONE_DEG = 0.25
+_MAX_ZONE_DEG = 10.0
+_SKY_SQUARE_DEG = 41252.96
+
+
+def _unit_vectors(lon_deg, lat_deg) -> np.ndarray:
+    lon, lat = np.radians(lon_deg), np.radians(lat_deg)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class FieldIndex:
+    """Zones index of field centres (ecliptic lon/lat in deg) for cone queries.
+
+    Query results are catalog positions, sorted ascending.
+    """
+
+    def __init__(self, lon_deg: np.ndarray, lat_deg: np.ndarray, zone_deg: float = 0.0):
+        lon_deg = np.mod(np.asarray(lon_deg, dtype=float), 360.0)
+        lon_deg[lon_deg >= 360.0] = 0.0
+        lat_deg = np.asarray(lat_deg, dtype=float)
+        if lon_deg.shape != lat_deg.shape or lon_deg.ndim != 1:
+            raise ValueError(f"lon/lat must be 1-d arrays of one length, got {lon_deg.shape} and {lat_deg.shape}.")
+        if zone_deg < 0:
+            raise ValueError(f"zone_deg must not be negative, got {zone_deg}.")
+        if zone_deg == 0.0:
+            spacing = math.sqrt(_SKY_SQUARE_DEG / max(len(lon_deg), 1))
+            zone_deg = min(max(spacing, _MIN_ZONE_DEG), _MAX_ZONE_DEG)
+        self.zone_deg = float(zone_deg)
+        self.nzones = int(math.ceil(180.0 / self.zone_deg))
+        self.vectors = _unit_vectors(lon_deg, lat_deg)
+
+        zone = self._zone(lat_deg)
+        # Fields ordered by (zone, longitude); zone z occupies order[starts[z]:starts[z + 1]],
+        # and `keys` (360 z + longitude) is ascending, so one searchsorted serves every zone.
+        self.order = np.lexsort((lon_deg, zone))
+        self.keys = zone[self.order] * 360.0 + lon_deg[self.order]
+        self.starts = np.searchsorted(zone[self.order], np.arange(self.nzones + 1))
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _zone(self, lat_deg) -> np.ndarray:
+        return np.clip(np.floor((np.asarray(lat_deg) + 90.0) / self.zone_deg).astype(np.int64), 0, self.nzones - 1)
+
+    def _candidates(self, lon_deg: float, lat_deg: float, radius_deg: float) -> np.ndarray:
+        """Positions of the fields in the zones and longitude span a cone overlaps (a superset)."""
+        lo_zone, hi_zone = self._zone([lat_deg - radius_deg, lat_deg + radius_deg])
+        if abs(lat_deg) + radius_deg >= 90.0 or radius_deg >= 90.0:
+            half_width = 180.0
+        else:
+            # Longitude half-width of a small circle (Gray et al. 2006, the zones algorithm).
+            cos_terms = abs(math.cos(math.radians(lat_deg - radius_deg)) * math.cos(math.radians(lat_deg + radius_deg)))
+            half_width = math.degrees(math.atan(math.sin(math.radians(radius_deg)) / math.sqrt(cos_terms)))
+
+        zones = np.arange(lo_zone, hi_zone + 1)
+        if half_width >= 180.0:
+            spans = [(self.starts[zones], self.starts[zones + 1])]
+        else:
+            lo, hi = (lon_deg - half_width) % 360.0, (lon_deg + half_width) % 360.0
+            first = np.searchsorted(self.keys, zones * 360.0 + lo, side='left')
+            last = np.searchsorted(self.keys, zones * 360.0 + hi, side='right')
+            if lo <= hi:
+                spans = [(first, last)]
+            else:
+                # The span wraps through longitude 0: [lo, 360) and [0, hi].
+                spans = [(first, self.starts[zones + 1]), (self.starts[zones], last)]
+        begin = np.concatenate([span[0] for span in spans])
+        lengths = np.concatenate([span[1] - span[0] for span in spans])
+        lengths = np.maximum(lengths, 0)
+        # Concatenate the ranges order[begin[k]:begin[k] + lengths[k]] without a Python loop.
+        steps = np.arange(lengths.sum()) + np.repeat(begin - np.cumsum(lengths) + lengths, lengths)
+        return self.order[steps]
+
+    def cone(self, lon_deg: float, lat_deg: float, radius_deg: float) -> np.ndarray:
+        """Positions of the fields within `radius_deg` of (`lon_deg`, `lat_deg`)."""
+        candidates = self._candidates(float(lon_deg) % 360.0, float(lat_deg), float(radius_deg))
+        centre = _unit_vectors(float(lon_deg), float(lat_deg))
+        inside = self.vectors[candidates] @ centre >= math.cos(math.radians(min(float(radius_deg), 180.0)))
+        return np.sort(candidates[inside])
+
+    def cones(self, lon_deg, lat_deg, radius_deg: float) -> np.ndarray:
+        """Positions of the fields within `radius_deg` of any of the points (`lon_deg`, `lat_deg`)."""
+        hits = [self.cone(lon, lat, radius_deg) for lon, lat in zip(np.ravel(lon_deg), np.ravel(lat_deg))]
+        return np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int64)
+
+    def separation(self, positions: np.ndarray, lon_deg: float, lat_deg: float) -> np.ndarray:
+        """Angular distance (deg) of the fields at `positions` from (`lon_deg`, `lat_deg`)."""
+        cos_sep = self.vectors[positions] @ _unit_vectors(float(lon_deg), float(lat_deg))
+        return np.degrees(np.arccos(np.clip(cos_sep, -1.0, 1.0)))
+
+
+def _precession_deg(jd) -> np.ndarray:
+    return _PRECESSION_DEG_PER_CENTURY * (np.asarray(jd, dtype=float) - _J2000_JD) / 36525.0
+
+
+def equatorial_to_ecliptic(ra_deg, dec_deg, jd=None) -> Tuple[np.ndarray, np.ndarray]:
+    """Ecliptic (lon, lat) in deg of equatorial (ra, dec).
+
+    With `jd`, (ra, dec) are of date and the longitude is precessed back to
+    the J2000 equinox; without, they are taken as J2000 (ICRS/GCRS).
+    """
+    ra, dec = np.radians(ra_deg), np.radians(dec_deg)
+    obliquity = math.radians(_OBLIQUITY_J2000_DEG)
+    sin_lat = np.sin(dec) * math.cos(obliquity) - np.cos(dec) * math.sin(obliquity) * np.sin(ra)
+    lon = np.degrees(np.arctan2(np.sin(ra) * math.cos(obliquity) + np.tan(dec) * math.sin(obliquity), np.cos(ra)))
+    if jd is not None:
+        lon = lon - _precession_deg(jd)
+    return np.mod(lon, 360.0), np.degrees(np.arcsin(np.clip(sin_lat, -1.0, 1.0)))
+
+
+def zenith_ecliptic(jd_utc, lat_deg: float, lon_deg: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Ecliptic (lon, lat) in deg of a site's zenith at UTC Julian dates."""
+    jd_utc = np.asarray(jd_utc, dtype=float)
+    ra_deg = mean_sidereal_time(jd_utc, lon_deg) * 15.0
+    return equatorial_to_ecliptic(ra_deg, np.full(jd_utc.shape, float(lat_deg)), jd_utc)
+
+
+def opposition_ecliptic(jd_utc) -> Tuple[np.ndarray, np.ndarray]:
+    """Ecliptic (lon, lat) in deg of the anti-solar point at UTC Julian dates."""
+    jd_utc = np.asarray(jd_utc, dtype=float)
+    lon = np.mod(solar_longitude(jd_utc) + 180.0 - _precession_deg(jd_utc), 360.0)
+    return lon, np.zeros(jd_utc.shape)
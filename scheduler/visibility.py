@@ -0,0 +1,181 @@
+"""Night-long field visibility grid.
+
+`Observatory._visible_field_mask` needs every field's altitude at both ends of
+a block plus its separation from the Moon, `_field_hour_angle` needs the top
+field's hour angle, and `run_scheduler` needs its azimuth. Computed per block,
+that is three SkyCoord builds and AltAz transforms every block. A
+`VisibilityGrid` instead transforms all field centroids against every time of
+a grid (e.g. the night's block boundaries) in one broadcast transform and keeps
+the resulting alt/az/airmass/hour-angle/Moon-separation matrices for lookup.
+
+Field centres are converted to ICRS once before the broadcast transform, so
+the Earth ephemeris is evaluated per time rather than per (time, field); grid
+values agree with the per-block transforms they replace to ~1e-12 deg. Times
+not on the grid fall back to computing on the fly. With an
+`ephemeris.EphemerisTable` covering the night, the Moon position is
+interpolated from the table instead (within its documented accuracy).
+
+With a `horizon.HorizonModel` (``SchedulerConfig(coordinate_backend="fast")``)
+the field alt/az and hour angles are evaluated in closed form instead of by
+astropy transforms, within `horizon.MAX_ERROR_DEG`, and so is the Moon (when
+no table covers the night), within `horizon.MAX_MOON_ERROR_DEG`.
+
+Given candidate `positions` (e.g. `Observatory` passes the fields the
+`spatial.FieldIndex` finds within the night's altitude caps), only those
+fields are transformed; the others are NaN throughout, so they never pass an
+altitude or Moon cut.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import (
+    FK5,
+    ICRS,
+    AltAz,
+    SkyCoord,
+    UnitSphericalRepresentation,
+    angular_separation,
+    get_body,
+)
+from astropy.time import Time
+
+from .catalog import FieldCatalog
+
+
+def _time_key(time) -> tuple:
+    """Exact lookup key for a scalar `Time`."""
+    return (time.scale, float(time.jd1), float(time.jd2))
+
+
+def _scatter(values: np.ndarray, positions: np.ndarray, nfields: int) -> np.ndarray:
+    """(ntimes, nfields) matrix holding `values` in the `positions` columns and NaN elsewhere."""
+    full = np.full((values.shape[0], nfields), np.nan)
+    full[:, positions] = values
+    return full
+
+
+class VisibilityGrid:
+    """Alt/az, airmass, hour angle and Moon separation of every field on a time grid.
+
+    Matrices have shape (ntimes, nfields) with fields in `FieldCatalog` order:
+    `alt`/`az`/`moon_separation` in degrees, `hour_angle` in hours (unrounded
+    LST - RA, as `Observatory._field_hour_angle` computes before rounding) and
+    `airmass` as plane-parallel 1/cos(zenith), NaN at or below the horizon.
+    `moon_alt`/`moon_az` have shape (ntimes,). Fields not among the grid's
+    candidate `positions` (None: all fields) are NaN.
+    """
+
+    def __init__(
+        self,
+        catalog: FieldCatalog,
+        times: Time,
+        alt: np.ndarray,
+        az: np.ndarray,
+        hour_angle: np.ndarray,
+        moon_alt: np.ndarray,
+        moon_az: np.ndarray,
+        moon_separation: np.ndarray,
+        positions: Optional[np.ndarray] = None,
+    ):
+        self.catalog = catalog
+        self.positions = positions
+        self.times = times
+        self.alt = alt
+        self.az = az
+        self.hour_angle = hour_angle
+        self.moon_alt = moon_alt
+        self.moon_az = moon_az
+        self.moon_separation = moon_separation
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.airmass = np.where(alt > 0.0, 1 / np.cos(np.radians(90. - alt)), np.nan)
+        self._rows = {
+            (times.scale, float(jd1), float(jd2)): row for row, (jd1, jd2) in enumerate(zip(times.jd1, times.jd2))
+        }
+
+    @classmethod
+    def compute(
+        cls, location, catalog: FieldCatalog, times: Sequence, ephemeris=None, horizon=None, positions=None,
+    ) -> "VisibilityGrid":
+        """Build the grid with one broadcast AltAz transform of all field centroids.
+
+        The Moon's alt/az come from `ephemeris` (an `ephemeris.EphemerisTable`)
+        when it covers `times`, else from `horizon` or astropy. With `horizon` (a
+        `horizon.HorizonModel`) the field alt/az and hour angles come from it.
+        With `positions`, only those fields are computed and the rest are NaN.
+        """
+        times = Time(list(times)) if not isinstance(times, Time) else times
+        times = times.reshape(-1)
+        subset = slice(None) if positions is None else np.asarray(positions, dtype=np.int64)
+
+        if horizon is not None:
+            alt, az = horizon.altaz(catalog, times, positions)
+            hour_angle = horizon.hour_angle(catalog, times, positions)
+            fields_lon, fields_lat = np.radians(az), np.radians(alt)
+        else:
+            coords = SkyCoord(
+                catalog.elon[subset], catalog.elat[subset], frame='geocentrictrueecliptic', unit=(u.deg, u.deg)
+            )
+            # Go through ICRS once per field: transforming the ecliptic coordinates
+            # straight to AltAz makes astropy evaluate the Earth ephemeris for every
+            # (time, field) pair, which dominates the cost of fine time grids.
+            fields_icrs = coords.transform_to(ICRS())
+            fields_altaz = fields_icrs[np.newaxis, :].transform_to(AltAz(obstime=times[:, np.newaxis], location=location))
+            fields_sph = fields_altaz.represent_as(UnitSphericalRepresentation)
+            alt, az = fields_sph.lat.to_value(u.deg), fields_sph.lon.to_value(u.deg)
+            fields_lon, fields_lat = fields_sph.lon, fields_sph.lat
+
+            lst_hours = times.sidereal_time('mean', location.lon).value
+            ra_hours = coords.transform_to(FK5).ra.deg / 15.0
+            hour_angle = lst_hours[:, np.newaxis] - ra_hours[np.newaxis, :]
+
+        if ephemeris is not None and ephemeris.covers(times):
+            moon_alt_deg, moon_az_deg = ephemeris.moon_altaz(times)
+            moon_lon, moon_lat = moon_az_deg * u.deg, moon_alt_deg * u.deg
+        elif horizon is not None:
+            moon_alt_deg, moon_az_deg = horizon.moon_altaz(times)
+            moon_lon, moon_lat = moon_az_deg * u.deg, moon_alt_deg * u.deg
+        else:
+            moon_altaz = get_body('moon', times, location=location).transform_to(AltAz(obstime=times, location=location))
+            moon_sph = moon_altaz.represent_as(UnitSphericalRepresentation)
+            moon_lon, moon_lat = moon_sph.lon, moon_sph.lat
+        if horizon is not None:
+            moon_separation = np.degrees(angular_separation(
+                fields_lon, fields_lat, moon_lon.to_value(u.rad)[:, np.newaxis], moon_lat.to_value(u.rad)[:, np.newaxis]
+            ))
+        else:
+            moon_separation = angular_separation(
+                fields_lon, fields_lat, moon_lon[:, np.newaxis], moon_lat[:, np.newaxis]
+            ).to_value(u.deg)
+
+        if positions is not None:
+            alt, az, hour_angle, moon_separation = (
+                _scatter(values, subset, catalog.nfields) for values in (alt, az, hour_angle, moon_separation)
+            )
+        return cls(
+            catalog,
+            times,
+            alt=alt,
+            az=az,
+            hour_angle=hour_angle,
+            moon_alt=moon_lat.to_value(u.deg),
+            moon_az=moon_lon.to_value(u.deg),
+            moon_separation=moon_separation,
+            positions=positions,
+        )
+
+    @property
+    def ntimes(self) -> int:
+        return len(self.times)
+
+    def row(self, time) -> Optional[int]:
+        """Return the grid row for exactly `time`, or None if it is not a grid time."""
+        return self._rows.get(_time_key(time))
+
+    def covers(self, catalog: FieldCatalog, *times) -> bool:
+        """Return True if the grid was built for `catalog` and contains every time in `times`."""
+        return self.catalog is catalog and all(self.row(time) is not None for time in times)